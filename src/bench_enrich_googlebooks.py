@@ -0,0 +1,138 @@
+"""
+Benchmark del enriquecimiento con Google Books contra el stub local
+(stub_googlebooks.GoogleBooksStub), sin red ni cuota de la API real.
+
+    python src/bench_enrich_googlebooks.py --rows 2000 --workers 1 8 32 --latency-ms 120
+    python src/bench_enrich_googlebooks.py --qps 20 --server-qps 10 --error-rate 0.02
+    python src/bench_enrich_googlebooks.py --rows 500 --projection
+
+Por defecto usa los libros del landing de Goodreads; con --rows N genera N
+ISBN-13 sintéticos (el stub inventa sus volúmenes). La caché SQLite del
+enriquecimiento se desactiva para medir siempre peticiones reales al stub.
+Con --projection compara, por volumen, bytes recibidos y tiempo de decodificar
+(json + volume_to_book) con la respuesta completa y con fields=GOOGLE_BOOKS_FIELDS.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+import requests
+
+import enrich_googlebooks
+from setting import GOOD_READS_JSON_URL, GOOD_READS_JSONL_URL, GOOD_READS_PARQUET_URL, GOOGLE_BOOKS_BACKOFF, GOOGLE_BOOKS_FIELDS, GOOGLE_BOOKS_MAX_RETRIES, GOOGLE_CACHE_URL
+from stub_googlebooks import GoogleBooksStub, load_recorded
+from utils.utils_http import RateLimiter, make_session
+from utils.utils_landing import goodreads_landing_path, read_goodreads_landing
+
+
+def isbn13_check_digit(first12: str) -> str:
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def synthetic_rows(n: int) -> List[Dict]:
+    rows = []
+    for i in range(n):
+        first12 = f"978{i:09d}"
+        rows.append({"isbn13": int(first12 + isbn13_check_digit(first12)),
+                     "title": f"Libro {i}", "authors": ["Autor Sintético"]})
+    return rows
+
+
+def landing_rows() -> List[Dict]:
+    cols = ["isbn13", "title", "authors", "publication_date", "pub_info"]
+    df = read_goodreads_landing(goodreads_landing_path(
+        GOOD_READS_JSONL_URL, GOOD_READS_JSON_URL, GOOD_READS_PARQUET_URL), columns=cols)
+    cols = [c for c in cols if c in df.columns]
+    return df[cols].astype(object).to_dict(orient="records")
+
+
+def measure_projection(url: str, queries: List[str]) -> None:
+    """Bytes y tiempo de decodificación por volumen, con y sin proyección fields."""
+    session = requests.Session()
+    print(f"{'respuesta':<12}{'bytes/vol':>11}{'µs/vol':>9}")
+    results = {}
+    for label, extra in (("completa", {}), ("fields", {"fields": GOOGLE_BOOKS_FIELDS})):
+        total_bytes, parse_s, volumes = 0, 0.0, 0
+        for q in queries:
+            r = session.get(url, params={"q": q, **extra}, timeout=15)
+            r.raise_for_status()
+            t0 = time.perf_counter()
+            items = json.loads(r.content).get("items") or []
+            for item in items:
+                enrich_googlebooks.volume_to_book(item, r.url)
+            parse_s += time.perf_counter() - t0
+            total_bytes += len(r.content)
+            volumes += max(1, len(items))
+        results[label] = (total_bytes / volumes, parse_s / volumes * 1e6)
+        print(f"{label:<12}{results[label][0]:>11.0f}{results[label][1]:>9.1f}")
+    full, part = results["completa"], results["fields"]
+    print(f"\nfields: {1 - part[0] / full[0]:.0%} menos bytes, "
+          f"{full[1] / part[1] if part[1] else 0:.1f}x más rápido al decodificar")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=0,
+                        help="ISBN sintéticos a enriquecer (0 = landing de Goodreads)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--qps", type=float, default=1000.0,
+                        help="Límite del cliente (GOOGLE_LIMITER) durante la prueba")
+    parser.add_argument("--server-qps", type=float, default=None,
+                        help="Límite del stub antes de responder 429")
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--recorded", type=Path, default=GOOGLE_CACHE_URL,
+                        help="Caché SQLite con las respuestas grabadas")
+    parser.add_argument("--projection", action="store_true",
+                        help="Solo mide bytes / decodificación con y sin fields")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows) if args.rows else landing_rows()
+    for row in rows:
+        row["_gr_key"] = enrich_googlebooks.goodreads_key(row)
+        row["_gr_hash"] = enrich_googlebooks.goodreads_hash(row)
+    responses = load_recorded(args.recorded)
+    enrich_googlebooks.GOOGLE_CACHE_ENABLED = False
+    if args.projection:
+        queries = [enrich_googlebooks.build_query(
+            None if pd.isna(r["isbn13"]) else int(r["isbn13"]), r["title"], r["authors"])
+            for r in rows]
+        with GoogleBooksStub(responses, synthesize=True) as stub:
+            enrich_googlebooks.GOOGLE_BOOKS_API_URL = stub.url
+            measure_projection(stub.url, queries)
+        return
+    print(f"{len(rows)} libros, {len(responses)} respuestas grabadas, "
+          f"latencia {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms\n")
+
+    results = []
+    for workers in args.workers:
+        with GoogleBooksStub(responses, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                             error_rate=args.error_rate, qps=args.server_qps,
+                             burst=max(1, int(args.server_qps or 1)),
+                             synthesize=True, seed=0) as stub:
+            enrich_googlebooks.GOOGLE_BOOKS_API_URL = stub.url
+            enrich_googlebooks.GOOGLE_LIMITER = RateLimiter(args.qps, burst=max(1, int(args.qps)))
+            enrich_googlebooks.GOOGLE_SESSION = make_session(
+                pool_size=workers, retries=GOOGLE_BOOKS_MAX_RETRIES, backoff=GOOGLE_BOOKS_BACKOFF,
+                limiter=enrich_googlebooks.GOOGLE_LIMITER)
+            t0 = time.perf_counter()
+            df = enrich_googlebooks.enrich_rows(rows, max_workers=workers)
+            elapsed = time.perf_counter() - t0
+            stats = dict(stub.stats)
+        results.append((workers, elapsed, int(df["id"].notna().sum()), stats))
+
+    print(f"\n{'hilos':>6}{'s':>9}{'búsq/s':>9}{'ok':>7}{'peticiones':>12}{'429':>6}{'5xx':>6}")
+    for workers, elapsed, ok, stats in results:
+        errors_5xx = stats.get("500", 0) + stats.get("503", 0)
+        print(f"{workers:>6}{elapsed:>9.2f}{len(rows) / elapsed:>9.1f}{ok:>7}"
+              f"{stats.get('requests', 0):>12}{stats.get('429', 0):>6}{errors_5xx:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Microbenchmark del parseo de páginas de libro de Goodreads guardadas en disco:
+parse_basic_soup (árbol BeautifulSoup + regex) frente a parse_basic_json
+(un único json.loads del __NEXT_DATA__).
+
+    python src/bench_parse_goodreads.py --download 51 52 53   # guarda fixtures
+    python src/bench_parse_goodreads.py --repeat 20
+
+Las fixtures son ficheros <book_id>.html en HTML_FIXTURES_DIR (o --fixtures).
+"""
+import argparse
+import statistics
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, List
+
+from scrape_goodreads import close_browsers, fetch_book_html, parse_basic_json, parse_basic_soup
+from setting import HTML_FIXTURES_DIR
+
+
+def time_parser(parser: Callable, html: str, book_id: int, repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        parser(html, book_id)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def download_fixtures(book_ids: List[int], fixtures_dir: Path) -> None:
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        for book_id in book_ids:
+            html = fetch_book_html(book_id)
+            if html:
+                (fixtures_dir / f"{book_id}.html").write_text(html, encoding="utf-8")
+                print(f"Guardado {book_id}.html")
+    finally:
+        close_browsers()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, default=HTML_FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--download", type=int, nargs="*", default=None,
+                        help="IDs de Goodreads a descargar como fixtures antes de medir")
+    args = parser.parse_args()
+
+    if args.download:
+        download_fixtures(args.download, args.fixtures)
+
+    files = sorted(args.fixtures.glob("*.html"))
+    if not files:
+        print(f"No hay fixtures en {args.fixtures}")
+        return
+
+    total_soup = 0.0
+    total_json = 0.0
+    print(f"{'fixture':<20}{'soup ms':>10}{'json ms':>10}{'x':>8}  campos distintos")
+    for path in files:
+        html = path.read_text(encoding="utf-8")
+        book_id = int("".join(c for c in path.stem if c.isdigit()) or 0)
+
+        soup_t = statistics.median(time_parser(parse_basic_soup, html, book_id, args.repeat))
+        bd_json = parse_basic_json(html, book_id)
+        if bd_json is None:
+            print(f"{path.name:<20}{soup_t * 1000:>10.2f}{'-':>10}{'-':>8}  sin __NEXT_DATA__")
+            continue
+        json_t = statistics.median(time_parser(parse_basic_json, html, book_id, args.repeat))
+        total_soup += soup_t
+        total_json += json_t
+
+        a = asdict(parse_basic_soup(html, book_id))
+        b = asdict(bd_json)
+        diff = [k for k in a if a[k] != b[k]]
+        print(f"{path.name:<20}{soup_t * 1000:>10.2f}{json_t * 1000:>10.2f}"
+              f"{soup_t / json_t if json_t else 0:>8.1f}  {', '.join(diff) or '-'}")
+
+    if total_json:
+        print(f"\nTotal: soup {total_soup * 1000:.1f} ms, json {total_json * 1000:.1f} ms "
+              f"({total_soup / total_json:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmark de descarga de páginas de Goodreads contra el servidor de réplica
+local (stub_goodreads.py), sin tocar goodreads.com. Para cada camino
+(http = Requests, playwright, selenium) mide páginas/s, latencia p50/p99
+por página y pico de RSS (este proceso + navegadores/drivers hijos).
+
+    python src/bench_scrape_goodreads.py --books 200 --workers 4
+    python src/bench_scrape_goodreads.py --paths http playwright --latency-ms 80
+
+El servidor se lanza en otro proceso (no cuenta en el RSS ni compite por el
+GIL) y sirve las fixtures / caché HTML con --cycle, así que --books puede
+ser mayor que el número de páginas capturadas. La caché HTML y el límite de
+peticiones del scraper se desactivan durante la prueba.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+import numpy as np
+import requests
+
+from setting import HTML_FIXTURES_DIR
+
+SRC_DIR = Path(__file__).resolve().parent
+
+
+def _proc_children() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat") as f:
+                # el nombre del proceso va entre paréntesis y puede llevar espacios
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry.name))
+    return children
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def tree_rss_mb(root: int, exclude: Set[int]) -> float:
+    """RSS sumado de root y sus descendientes (sin los de exclude), en MB."""
+    children = _proc_children()
+    total, stack = 0, [root]
+    while stack:
+        pid = stack.pop()
+        if pid in exclude:
+            continue
+        total += _rss_kb(pid)
+        stack.extend(children.get(pid, []))
+    return total / 1024
+
+
+class RssSampler:
+    """Muestrea en segundo plano el RSS del árbol de procesos y guarda el pico."""
+
+    def __init__(self, exclude: Set[int], interval: float = 0.05):
+        self.exclude = exclude
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss_mb(os.getpid(), self.exclude))
+            self._stop.wait(self.interval)
+
+    def start(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> float:
+        self._stop.set()
+        self._thread.join()
+        return self.peak
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_replay(port: int, fixtures: Path, latency_ms: float) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, str(SRC_DIR / "stub_goodreads.py"), "--port", str(port),
+         "--fixtures", str(fixtures), "--cycle", "--latency-ms", str(latency_ms)],
+        cwd=SRC_DIR, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("El servidor de réplica no arrancó")
+
+
+def check_replay(base_url: str, book_id: int, fixtures: Path) -> None:
+    """
+    Sale con error si la réplica no tiene páginas capturadas: sin fixtures ni
+    caché HTML responde 404 a todo y las medidas no valdrían nada.
+    """
+    r = requests.get(f"{base_url}{book_id}", timeout=10)
+    if r.status_code == 404:
+        raise SystemExit(
+            f"La réplica no tiene páginas capturadas (ni fixtures en {fixtures} ni caché HTML).\n"
+            "Descárgalas antes con: python src/bench_parse_goodreads.py --download 51 52 53")
+    r.raise_for_status()
+
+
+def run_path(fetch: Callable[[int], Optional[str]], check: Callable[[Optional[str]], bool],
+             book_ids: List[int], workers: int, cleanup: Callable[[], None],
+             exclude: Set[int]) -> Dict:
+    def timed(book_id: int):
+        t0 = time.perf_counter()
+        try:
+            ok = check(fetch(book_id))
+        except Exception:
+            ok = False
+        return time.perf_counter() - t0, ok
+
+    sampler = RssSampler(exclude).start()
+    t0 = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            timings = list(ex.map(timed, book_ids))
+        wall = time.perf_counter() - t0
+    finally:
+        cleanup()
+        peak = sampler.stop()
+
+    latencies = np.array([t for t, _ in timings]) * 1000
+    return {
+        "pages_s": len(book_ids) / wall,
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+        "ok": sum(ok for _, ok in timings),
+        "peak_rss": peak,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", nargs="+", choices=["http", "playwright", "selenium"],
+                        default=["http", "playwright", "selenium"])
+    parser.add_argument("--books", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Retardo del servidor por respuesta")
+    parser.add_argument("--fixtures", type=Path, default=HTML_FIXTURES_DIR)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = start_replay(port, args.fixtures, args.latency_ms)
+    base_url = f"http://127.0.0.1:{port}/book/show/"
+    import scrape_goodreads as scrape
+    from utils.utils_http import RateLimiter
+
+    # El scraper apunta a la réplica (GOOD_READS_BASE_URL ya se leyó de setting)
+    scrape.GOOD_READS_BASE_URL = base_url
+    scrape.configure_cache(enabled=False)
+    scrape.GOODREADS_LIMITER = RateLimiter(1e6, burst=10 ** 6)
+    fetchers = {
+        "http": scrape.fetch_book_html_requests,
+        "playwright": scrape.fetch_book_html_playwright,
+        "selenium": scrape.fetch_book_html_selenium,
+    }
+    book_ids = list(range(1, args.books + 1))
+    try:
+        check_replay(base_url, book_ids[0], args.fixtures)
+    except BaseException:
+        server.terminate()
+        server.wait()
+        raise
+    print(f"Réplica en {base_url} | {args.books} libros, "
+          f"{args.workers} hilos\n")
+
+    results = {}
+    try:
+        for name in args.paths:
+            print(f"-> {name}")
+            results[name] = run_path(fetchers[name], scrape.has_book_data, book_ids,
+                                     args.workers, scrape.close_browsers, {server.pid})
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\n{'camino':<12}{'págs/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'ok':>7}{'RSS MB':>9}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['pages_s']:>9.1f}{r['p50']:>9.1f}{r['p99']:>9.1f}"
+              f"{r['ok']:>7}{r['peak_rss']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
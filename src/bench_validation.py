@@ -0,0 +1,140 @@
+"""
+Benchmark de las validaciones de calidad (utils_quality) sobre un dataset
+sintético: filas/s de validate_goodreads_df y validate_googlebooks_df con las
+reglas vectorizadas y con las funciones por fila (VECTORIZED_RULES = False).
+
+    python src/bench_validation.py                 # 1M filas, ambos modos
+    python src/bench_validation.py --rows 200000 --no-row-mode
+
+Las columnas mezclan valores válidos, inválidos, nulos y tipos inesperados
+(listas vacías, strings en blanco, ratings fuera de rango, ISBN con el
+dígito de control mal...). Con los dos modos se comprueba además que los flags
+q_* y las métricas salen idénticos.
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import utils.utils_quality as quality
+
+
+def isbn13_check_digit(first12: str) -> str:
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def _pick(rng: np.random.Generator, values: List[Any], n: int) -> np.ndarray:
+    pool = np.empty(len(values), dtype=object)
+    pool[:] = values
+    return pool[rng.integers(0, len(values), n)]
+
+
+def _isbn13_pool(rng: np.random.Generator, size: int = 5000) -> List[int]:
+    pool = []
+    for i in range(size):
+        first12 = f"978{rng.integers(0, 10 ** 9):09d}"
+        check = isbn13_check_digit(first12)
+        if i % 10 == 0:  # uno de cada diez con el dígito de control mal
+            check = str((int(check) + 1) % 10)
+        pool.append(int(first12 + check))
+    return pool
+
+
+def synthetic_books(n: int, seed: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(goodreads, googlebooks) con n filas cada uno y los tipos de bronze."""
+    rng = np.random.default_rng(seed)
+    titles = ["Hatchet", "El hacha", "The Known World", "  ", "", None, np.nan]
+    urls = ["https://www.goodreads.com/book/show/50", "HTTP://books.google.com/x",
+            "ftp://example.org", "www.goodreads.com", None]
+    authors = [["Gary Paulsen"], ["Anne McCaffrey", "Elizabeth Ann Scarborough"],
+               ("Delia Sherman",), [], ["Autor", " "], None, "Gary Paulsen"]
+    languages = ["English", "en", "es", "en-US", "pt-BR", "", None, "123", "English (US)"]
+    review_langs = [{"en": 3}, {"en": 19464, "es": 10}, {}, None, {"": 1}, {"es": -1}]
+    genres = [["Fiction", "Classics"], ["Young Adult"], [], ["", "Fiction"], None, "Fiction"]
+    isbns = _isbn13_pool(rng)
+    # columna isbn: ISBN10 (con X de control o no), ISBN13 y basura
+    isbn_texts = ["0618510826", "080442957X", "0-8044-2957-x", "0618510827", "X618510826",
+                  "9780618510825", "978-0618510825", "ISBN 0618510826", "", None]
+
+    def numbers(low: float, high: float, null_rate: float = 0.1) -> np.ndarray:
+        values = rng.uniform(low, high, n).round(2)
+        values[rng.random(n) < null_rate] = np.nan
+        return values
+
+    isbn13 = pd.array(np.array(isbns)[rng.integers(0, len(isbns), n)], dtype="Int64")
+    isbn13[rng.random(n) < 0.05] = pd.NA
+    num_pages = pd.array(rng.integers(-5, 900, n), dtype="Int64")
+    num_pages[rng.random(n) < 0.1] = pd.NA
+
+    goodreads = pd.DataFrame({
+        "url": _pick(rng, urls, n),
+        "title": _pick(rng, titles, n),
+        "authors": _pick(rng, authors, n),
+        "rating_value": numbers(-0.5, 5.5),
+        "num_pages": num_pages,
+        "isbn13": isbn13,
+        "isbn": _pick(rng, isbn_texts, n),
+        "language": _pick(rng, languages, n),
+        "review_count_by_lang": _pick(rng, review_langs, n),
+        "genres": _pick(rng, genres, n),
+        "rating_count": numbers(-10, 50000).round(),
+        "review_count": numbers(-10, 5000).round(),
+        "price": numbers(-1, 40, null_rate=0.7),
+    })
+    google = pd.DataFrame({
+        "url": _pick(rng, urls, n),
+        "title": _pick(rng, titles, n),
+        "authors": _pick(rng, authors, n),
+        "num_pages": numbers(-5, 900).round(),
+        "isbn13": isbn13.astype("float64"),
+        "isbn": _pick(rng, isbn_texts, n),
+        "language": _pick(rng, languages, n),
+        "price": numbers(-1, 40, null_rate=0.7),
+    })
+    return goodreads, google
+
+
+def run(validate: Callable[[pd.DataFrame], Tuple[pd.DataFrame, Dict]], df: pd.DataFrame,
+        vectorized: bool) -> Tuple[float, pd.DataFrame, Dict]:
+    quality.VECTORIZED_RULES = vectorized
+    t0 = time.perf_counter()
+    out, metrics = validate(df)
+    return time.perf_counter() - t0, out, metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-row-mode", action="store_true",
+                        help="No medir las funciones por fila (lento con 1M filas)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    goodreads, google = synthetic_books(args.rows, args.seed)
+    print(f"{args.rows} filas sintéticas por fuente en {time.perf_counter() - t0:.1f} s\n")
+
+    print(f"{'validador':<26}{'modo':<14}{'segundos':>10}{'filas/s':>14}")
+    for name, validate, df in (("validate_goodreads_df", quality.validate_goodreads_df, goodreads),
+                               ("validate_googlebooks_df", quality.validate_googlebooks_df, google)):
+        elapsed, vec_df, vec_metrics = run(validate, df, vectorized=True)
+        print(f"{name:<26}{'vectorizado':<14}{elapsed:>10.2f}{len(df) / elapsed:>14,.0f}")
+        if args.no_row_mode:
+            continue
+        row_elapsed, row_df, row_metrics = run(validate, df, vectorized=False)
+        print(f"{name:<26}{'por fila':<14}{row_elapsed:>10.2f}{len(df) / row_elapsed:>14,.0f}"
+              f"   x{row_elapsed / elapsed:.1f}")
+        flags = [c for c in row_df.columns if c.startswith("q_")]
+        different = [c for c in flags
+                     if not np.array_equal(vec_df[c].to_numpy(bool), row_df[c].to_numpy(bool))]
+        if different or vec_metrics != row_metrics:
+            raise SystemExit(f"{name}: los modos no coinciden en {different or 'las métricas'}")
+    quality.VECTORIZED_RULES = True
+
+
+if __name__ == "__main__":
+    main()
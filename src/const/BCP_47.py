@@ -227,4 +227,108 @@ LANG_MAP_GOODREADS = {
     "basque": "eu",
     "euskera": "eu",
     "eu": "eu",
+
+    # Nombres compuestos de Goodreads (nombres ISO 639-2 en inglés)
+    "spanish; castilian": "es",
+    "dutch; flemish": "nl",
+    "flemish": "nl",
+    "catalan; valencian": "ca",
+    "valencian": "ca",
+    "greek, modern (1453-)": "el",
+    "modern greek": "el",
+    "norwegian bokmål": "nb",
+    "bokmål": "nb",
+    "norwegian nynorsk": "nn",
+    "nynorsk": "nn",
+    "persian; farsi": "fa",
+    "panjabi; punjabi": "pa",
+    "punjabi": "pa",
+    "romanian; moldavian; moldovan": "ro",
+    "sinhala; sinhalese": "si",
+    "chinese, mandarin": "zh",
+
+    # Códigos ISO 639-2 (bibliográficos y terminológicos)
+    "spa": "es", "fre": "fr", "fra": "fr", "ger": "de", "deu": "de",
+    "por": "pt", "ita": "it", "dut": "nl", "nld": "nl", "rus": "ru",
+    "chi": "zh", "zho": "zh", "jpn": "ja", "kor": "ko", "ara": "ar",
+    "hin": "hi", "ben": "bn", "urd": "ur", "tur": "tr", "swe": "sv",
+    "dan": "da", "nor": "no", "pol": "pl", "cze": "cs", "ces": "cs",
+    "gre": "el", "ell": "el", "heb": "he", "hun": "hu", "fin": "fi",
+    "rum": "ro", "ron": "ro", "slo": "sk", "slk": "sk", "slv": "sl",
+    "hrv": "hr", "srp": "sr", "ukr": "uk", "ind": "id", "may": "ms",
+    "msa": "ms", "tha": "th", "vie": "vi", "tgl": "fil", "per": "fa",
+    "fas": "fa", "ice": "is", "isl": "is", "cat": "ca", "glg": "gl",
+    "baq": "eu", "eus": "eu",
+}
+
+# Variantes regionales / de escritura -> etiqueta BCP-47 con las mayúsculas
+# canónicas (idioma en minúsculas, escritura capitalizada, región en mayúsculas)
+LANG_REGION_TAGS = {
+    "en-us": "en-US",
+    "american english": "en-US",
+    "english (us)": "en-US",
+    "english (united states)": "en-US",
+    "en-gb": "en-GB",
+    "british english": "en-GB",
+    "english (uk)": "en-GB",
+    "english (united kingdom)": "en-GB",
+    "en-ca": "en-CA",
+    "en-au": "en-AU",
+    "en-in": "en-IN",
+
+    "es-es": "es-ES",
+    "spanish (spain)": "es-ES",
+    "es-mx": "es-MX",
+    "spanish (mexico)": "es-MX",
+    "es-ar": "es-AR",
+    "es-419": "es-419",
+    "spanish (latin america)": "es-419",
+    "latin american spanish": "es-419",
+
+    "pt-br": "pt-BR",
+    "brazilian portuguese": "pt-BR",
+    "portuguese (brazil)": "pt-BR",
+    "pt-pt": "pt-PT",
+    "european portuguese": "pt-PT",
+    "portuguese (portugal)": "pt-PT",
+
+    "fr-fr": "fr-FR",
+    "fr-ca": "fr-CA",
+    "canadian french": "fr-CA",
+    "french (canada)": "fr-CA",
+    "fr-be": "fr-BE",
+    "fr-ch": "fr-CH",
+
+    "de-de": "de-DE",
+    "de-at": "de-AT",
+    "de-ch": "de-CH",
+    "it-it": "it-IT",
+    "nl-nl": "nl-NL",
+    "nl-be": "nl-BE",
+
+    "zh-cn": "zh-CN",
+    "zh-tw": "zh-TW",
+    "zh-hk": "zh-HK",
+    "zh-hans": "zh-Hans",
+    "simplified chinese": "zh-Hans",
+    "chinese (simplified)": "zh-Hans",
+    "zh-hant": "zh-Hant",
+    "traditional chinese": "zh-Hant",
+    "chinese (traditional)": "zh-Hant",
+
+    "sr-latn": "sr-Latn",
+    "sr-cyrl": "sr-Cyrl",
 }
+
+
+def _build_lang_lookup() -> dict:
+    # Nombre o código (en minúsculas) -> etiqueta final. Las etiquetas de
+    # salida se incluyen también, así que normalizar dos veces no cambia nada
+    lookup = dict(LANG_MAP_GOODREADS)
+    lookup.update(LANG_REGION_TAGS)
+    for tag in list(lookup.values()):
+        lookup.setdefault(tag.lower(), tag)
+    return lookup
+
+
+LANG_LOOKUP = _build_lang_lookup()
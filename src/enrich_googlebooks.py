@@ -1,50 +1,229 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
 import time
 import pandas as pd
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
-from typing import List, Optional
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from models.Book import BookData
 # o desde donde tengas tu dataclass
-from setting import GOOD_READS_JSON_URL, GOOGLE_BOOKS_API_URL, GOOGLE_CSV_URL
+from setting import GOOD_READS_JSON_URL, GOOD_READS_JSONL_URL, GOOD_READS_PARQUET_URL, GOOGLE_BOOKS_API_URL, GOOGLE_BOOKS_BACKOFF, GOOGLE_BOOKS_BURST, GOOGLE_BOOKS_FIELDS, GOOGLE_BOOKS_MAX_RETRIES, GOOGLE_BOOKS_MIN_MATCH_SCORE, GOOGLE_BOOKS_PARTIAL_RESPONSE, GOOGLE_BOOKS_QPS, GOOGLE_BOOKS_TITLE_CANDIDATES, GOOGLE_BOOKS_WORKERS, GOOGLE_CACHE_NEGATIVE_TTL_DAYS, GOOGLE_CACHE_TTL_DAYS, GOOGLE_CACHE_URL, GOOGLE_CSV_URL, GOOGLE_PARQUET_URL, LANDING_PARQUET
+from utils.utils_cache import ResponseCache
+from utils.utils_http import RateLimiter, make_session
+from utils.utils_landing import BOOK_COLUMNS, GOOGLE_SCHEMA, goodreads_landing_path, google_landing_path, read_goodreads_landing, read_google_landing, read_landing_parquet, write_landing_parquet
+from utils.utils_normalization import _first_author_norm, _norm_text, to_list
+
+
+# Límite global de peticiones a Google Books (la cuota de la API)
+GOOGLE_LIMITER = RateLimiter(GOOGLE_BOOKS_QPS, burst=GOOGLE_BOOKS_BURST)
+
+# Sesión compartida por todos los hilos: reutiliza conexiones y reintenta
+# 429/5xx con backoff exponencial; cada reintento pasa también por el limiter
+GOOGLE_SESSION = make_session(pool_size=GOOGLE_BOOKS_WORKERS,
+                              retries=GOOGLE_BOOKS_MAX_RETRIES,
+                              backoff=GOOGLE_BOOKS_BACKOFF,
+                              limiter=GOOGLE_LIMITER)
+
+# Caché SQLite de respuestas crudas por consulta q (se abre al primer uso;
+# con --no-cache se desactiva)
+GOOGLE_CACHE_ENABLED = True
+_GOOGLE_CACHE: Optional[ResponseCache] = None
+_GOOGLE_CACHE_LOCK = threading.Lock()
+
+
+class BookNotFound(Exception):
+    """Google Books no tiene el libro (sin resultados o ningún candidato fiable)."""
+
+
+def get_google_cache() -> Optional[ResponseCache]:
+    global _GOOGLE_CACHE
+    if not GOOGLE_CACHE_ENABLED:
+        return None
+    with _GOOGLE_CACHE_LOCK:
+        if _GOOGLE_CACHE is None:
+            _GOOGLE_CACHE = ResponseCache(
+                GOOGLE_CACHE_URL,
+                ttl=GOOGLE_CACHE_TTL_DAYS * 86400,
+                negative_ttl=GOOGLE_CACHE_NEGATIVE_TTL_DAYS * 86400)
+        return _GOOGLE_CACHE
+
+
+def volumes_url(query: str) -> str:
+    """URL de la búsqueda (sin la proyección fields) que se guarda en BookData.url."""
+    return requests.Request("GET", GOOGLE_BOOKS_API_URL, params={"q": query}).prepare().url
+
+
+def fetch_volumes(query: str, max_results: Optional[int] = None) -> Tuple[Dict, str]:
+    """
+    Respuesta cruda de la API para q=query y la URL pedida.
+    - max_results: cuántos volúmenes pedir (maxResults); None = lo que dé la API.
+    Si GOOGLE_BOOKS_PARTIAL_RESPONSE, se pide solo GOOGLE_BOOKS_FIELDS
+    (respuesta parcial): menos bytes por la red, en la caché y al decodificar.
+    Si la consulta está en la caché y no ha caducado no se llama a la API. La
+    clave es q más maxResults y fields: al cambiar GOOGLE_BOOKS_TITLE_CANDIDATES
+    o la proyección no se sirven respuestas pedidas con los valores anteriores.
+    Se guardan también las respuestas sin resultados (caché negativa); los
+    errores HTTP no se guardan.
+    """
+    params = {"q": query}
+    if max_results:
+        params["maxResults"] = max_results
+    if GOOGLE_BOOKS_PARTIAL_RESPONSE:
+        params["fields"] = GOOGLE_BOOKS_FIELDS
+    variant = f"maxResults={max_results or ''};fields={params.get('fields', '')}"
+
+    cache = get_google_cache()
+    if cache is not None:
+        cached = cache.get(query, variant)
+        if cached is not None:
+            return cached
+
+    GOOGLE_LIMITER.acquire()
+    r = GOOGLE_SESSION.get(GOOGLE_BOOKS_API_URL, params=params, timeout=15)
+    r.raise_for_status()
+    data = r.json()
+    url = volumes_url(query)
+
+    if cache is not None:
+        cache.put(query, data, url, variant)
+    return data, url
+
+
+def build_query(isbn: Optional[str] = None, title: Optional[str] = None,
+                authors: Optional[List[str]] = None) -> str:
+    """
+    Si hay isbn -> isbn:<isbn>
+    Si no hay isbn -> intitle:<título>+inauthor:<autor principal>
+    """
+    if isbn:
+        return f"isbn:{isbn}"
+    if not title:
+        raise ValueError(
+            "Necesito al menos isbn o título para buscar en Google Books")
+    # Autor principal (si viene lista, cogemos el primero)
+    author_part = ""
+    if authors:
+        principal = authors[0] if isinstance(
+            authors, list) and authors else str(authors)
+        author_part = f"+inauthor:{principal}"
+    return f"intitle:{title}{author_part}"
+
+
+_YEAR_RE = re.compile(r"\b(\d{4})\b")
+# Sufijo de serie de Goodreads: "Hatchet (Brian's Saga, #1)"
+_SERIES_RE = re.compile(r"\s*\([^)]*#[^)]*\)\s*$")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def _match_text(x: Any) -> str:
+    """Texto para comparar títulos: sin serie, sin puntuación, minúsculas."""
+    if not isinstance(x, str):
+        return ""
+    x = _SERIES_RE.sub("", x)
+    return " ".join(_PUNCT_RE.sub(" ", _norm_text(x)).split())
+
+
+def _years(values: Iterable[Any]) -> Set[int]:
+    years = set()
+    for v in values:
+        if isinstance(v, str):
+            years.update(int(y) for y in _YEAR_RE.findall(v))
+        elif isinstance(v, (int, float)) and not pd.isna(v):
+            years.add(int(v))
+    return years
+
+
+def score_candidate(item: Dict, title: Optional[str], authors: Any,
+                    years: Set[int]) -> float:
+    """
+    Parecido (0..1) entre un volumen de Google Books y el libro de Goodreads:
+    0.6 título (con o sin subtítulo) + 0.3 primer autor + 0.1 año de publicación.
+    Si a Goodreads le falta el autor o el año, esa parte puntúa 0.5 (neutra).
+    """
+    info = item.get("volumeInfo", {}) or {}
+    want = _match_text(title)
+    candidates = [info.get("title")]
+    if info.get("subtitle"):
+        candidates.append(f"{info.get('title')} {info.get('subtitle')}")
+    title_score = max(SequenceMatcher(None, want, _match_text(c)).ratio()
+                      for c in candidates) if want else 0.0
+
+    author = _first_author_norm(authors)
+    gb_authors = [_norm_text(a) for a in info.get("authors") or []]
+    if not author:
+        author_score = 0.5
+    else:
+        author_score = max((SequenceMatcher(None, author, a).ratio()
+                            for a in gb_authors), default=0.0)
+
+    gb_years = _years([info.get("publishedDate")])
+    if not years or not gb_years:
+        year_score = 0.5
+    elif years & gb_years:
+        year_score = 1.0
+    elif any(abs(a - b) <= 1 for a in years for b in gb_years):
+        year_score = 0.5
+    else:
+        year_score = 0.0
+
+    return 0.6 * title_score + 0.3 * author_score + 0.1 * year_score
+
+
+def best_candidate(items: List[Dict], title: Optional[str], authors: Any,
+                   years: Set[int]) -> Tuple[Dict, float]:
+    """El volumen con mejor score_candidate (a igualdad, el que la API puso antes)."""
+    scored = [(score_candidate(item, title, authors, years), -i, item)
+              for i, item in enumerate(items)]
+    score, _, item = max(scored, key=lambda t: (t[0], t[1]))
+    return item, score
 
 
 def fetch_book_from_google(
     isbn: Optional[str] = None,
     title: Optional[str] = None,
     authors: Optional[List[str]] = None,
+    years: Optional[Set[int]] = None,
 ) -> BookData:
     """
-    Si hay isbn -> busca por isbn
-    Si no hay isbn -> busca por título + autor
+    Si hay isbn -> busca por isbn y coge el primer resultado
+    Si no hay isbn -> busca por título + autor, pide
+      GOOGLE_BOOKS_TITLE_CANDIDATES candidatos en la misma petición y se queda
+      con el que mejor casa con el libro de Goodreads (score_candidate; years
+      son los años de publicación conocidos). Si ninguno llega a
+      GOOGLE_BOOKS_MIN_MATCH_SCORE se trata como "sin resultados".
+    Sin resultados lanza BookNotFound; los errores de red o HTTP se propagan
+    tal cual.
     """
+    query = build_query(isbn, title, authors)
+    data, url = fetch_volumes(
+        query, max_results=None if isbn else GOOGLE_BOOKS_TITLE_CANDIDATES)
+
+    if "items" not in data or not data["items"]:
+        raise BookNotFound(f"Sin resultados en Google Books para query={query!r}")
 
     if isbn:
-        query = f"isbn:{isbn}"
+        # Cogemos el primer item
+        item = data["items"][0]
     else:
-        if not title:
-            raise ValueError(
-                "Necesito al menos isbn o título para buscar en Google Books")
-        # Autor principal (si viene lista, cogemos el primero)
-        author_part = ""
-        if authors:
-            principal = authors[0] if isinstance(
-                authors, list) and authors else str(authors)
-            author_part = f"+inauthor:{principal}"
-        query = f"intitle:{title}{author_part}"
-
-    params = {"q": query}
-
-    r = requests.get(GOOGLE_BOOKS_API_URL, params=params, timeout=15)
-    r.raise_for_status()
-
-    data = r.json()
+        item, score = best_candidate(data["items"], title, authors, years or set())
+        if score < GOOGLE_BOOKS_MIN_MATCH_SCORE:
+            raise BookNotFound(
+                f"Ningún candidato fiable en Google Books para query={query!r} "
+                f"(mejor puntuación {score:.2f})")
+    return volume_to_book(item, url, isbn=isbn, fallback_id=title)
 
-    if "items" not in data or not data["items"]:
-        raise Exception(f"Sin resultados en Google Books para query={query!r}")
 
-    # Cogemos el primer item
-    item = data["items"][0]
-    volume_id = item.get("id", isbn or title or "unknown")
+def volume_to_book(item: Dict, url: str, isbn: Optional[str] = None,
+                   fallback_id: Optional[str] = None) -> BookData:
+    """Convierte un volumen de la API (un elemento de items) en BookData."""
+    volume_id = item.get("id", isbn or fallback_id or "unknown")
     info = item.get("volumeInfo", {})
 
     title_gb = info.get("title")
@@ -81,7 +260,7 @@ def fetch_book_from_google(
 
     bd = BookData(
         id=volume_id,
-        url=r.url,
+        url=url,
         title=title_gb,
         authors=authors_gb,
         rating_value=rating_value,
@@ -107,38 +286,194 @@ def fetch_book_from_google(
     return bd
 
 
-def process_isbns_to_csv(json_path: str, csv_output: str) -> None:
-    json_df = pd.read_json(json_path)
+def lookup_row(row: Dict) -> Tuple[Optional[BookData], bool]:
+    """
+    Busca en Google Books un libro del landing de Goodreads.
+    Devuelve (libro o None, ok): (None, True) si Google Books no lo tiene y
+    (None, False), imprimiéndolo, si la búsqueda falla (red, HTTP o sin datos
+    con los que construir la consulta).
+    """
+    isbn13 = row.get("isbn13")
+    title = row.get("title")
+    authors = row.get("authors")
+
+    # normalizar isbn13 a string o None
+    if pd.isna(isbn13):
+        isbn13_str = None
+    else:
+        isbn13_str = int(isbn13)
+
+    try:
+        return fetch_book_from_google(
+            isbn=isbn13_str if isbn13_str else None,
+            title=title,
+            authors=authors,
+            years=_years([row.get("publication_date"), row.get("pub_info")]),
+        ), True
+    except BookNotFound:
+        return None, True
+    except Exception as e:
+        print(
+            f"Error buscando libro (isbn={isbn13_str}, title={title!r}): {e}")
+        return None, False
 
-    books: list[BookData] = []
 
-    for _, row in json_df.iterrows():
-        isbn13 = row.get("isbn13")
-        title = row.get("title")
-        authors = row.get("authors")
+def goodreads_key(row: Dict) -> str:
+    """
+    Clave estable de un libro del landing de Goodreads para el modo incremental:
+    isbn13 si lo tiene; si no, título + primer autor normalizados.
+    """
+    isbn13 = row.get("isbn13")
+    if not pd.isna(isbn13):
+        return f"isbn:{int(isbn13)}"
+    return f"ta:{_norm_text(row.get('title'))}|{_first_author_norm(row.get('authors'))}"
 
-        # normalizar isbn13 a string o None
-        if pd.isna(isbn13):
-            isbn13_str = None
-        else:
-            isbn13_str = int(isbn13)
 
-        try:
-            bd = fetch_book_from_google(
-                isbn=isbn13_str if isbn13_str else None,
-                title=title,
-                authors=authors,
-            )
-            time.sleep(0.5)  # para no saturar la API
-            books.append(bd)
-        except Exception as e:
-            print(
-                f"Error buscando libro (isbn={isbn13_str}, title={title!r}): {e}")
+def goodreads_hash(row: Dict) -> str:
+    """Huella de los campos con los que se busca en Google Books (si cambian, se vuelve a buscar)."""
+    isbn13 = row.get("isbn13")
+    title = row.get("title")
+    payload = [
+        None if pd.isna(isbn13) else int(isbn13),
+        title if isinstance(title, str) else None,
+        to_list(row.get("authors")),
+    ]
+    return hashlib.sha1(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
 
-    df = pd.DataFrame([asdict(b) for b in books])
-    df.to_csv(csv_output, index=False, encoding="utf-8")
+
+def read_enrichment(path: str, typed: bool = False) -> Optional[pd.DataFrame]:
+    """
+    Enriquecimiento existente (Parquet tipado, o CSV todo como texto para
+    reescribirlo tal cual; con typed, el CSV se tipa como en bronze para
+    pasarlo a Parquet). None si no existe o es de antes del modo
+    incremental (sin _gr_key).
+    """
+    if not os.path.exists(path):
+        return None
+    if str(path).endswith(".parquet"):
+        df = read_landing_parquet(path)
+    elif typed:
+        df = read_google_landing(path)
+    else:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    if "_gr_key" not in df.columns or "_gr_hash" not in df.columns:
+        return None
+    return df
+
+
+def enrich_rows(rows: List[Dict], max_workers: int = GOOGLE_BOOKS_WORKERS) -> pd.DataFrame:
+    """
+    Busca rows en Google Books en paralelo (max_workers hilos; el ritmo lo
+    marca GOOGLE_LIMITER, no la latencia de cada petición). Solo hay unas
+    pocas búsquedas en vuelo por hilo y se recogen en orden, así que el
+    resultado sale en el mismo orden que rows. Cada fila lleva _gr_key /
+    _gr_hash de su fila de Goodreads; los libros que no se encuentran quedan
+    como lápida (id y campos del libro nulos) para no buscarlos otra vez, y
+    los que fallan llevan _gr_hash vacío para reintentarlos la próxima vez.
+    """
+    records: List[Dict] = []
+    found = 0
+    start = time.perf_counter()
+
+    def collect(row: Dict, result: Tuple[Optional[BookData], bool]) -> None:
+        nonlocal found
+        bd, ok = result
+        record = dict.fromkeys(BOOK_COLUMNS) if bd is None else asdict(bd)
+        records.append({**record, "_gr_key": row["_gr_key"],
+                        "_gr_hash": row["_gr_hash"] if ok else ""})
+        found += bd is not None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        pending = deque()
+        for row in rows:
+            pending.append((row, ex.submit(lookup_row, row)))
+            if len(pending) >= max_workers * 4:
+                done_row, fut = pending.popleft()
+                collect(done_row, fut.result())
+        while pending:
+            done_row, fut = pending.popleft()
+            collect(done_row, fut.result())
+
+    elapsed = time.perf_counter() - start
+    print(f"Google Books: {found}/{len(rows)} libros en {elapsed:.1f} s "
+          f"({len(rows) / max(elapsed, 1e-9):.2f} búsquedas/s)")
+    return pd.DataFrame(records)
+
+
+def process_isbns_to_csv(json_path: str, csv_output: str,
+                         max_workers: int = GOOGLE_BOOKS_WORKERS,
+                         full: bool = False,
+                         previous: Optional[str] = None) -> None:
+    """
+    Enriquece el landing de Goodreads con Google Books y lo guarda en CSV
+    (o en Parquet tipado si csv_output acaba en .parquet), de forma incremental:
+    1) Cada libro de Goodreads tiene una clave (goodreads_key) y una huella
+       de sus campos de búsqueda (goodreads_hash).
+    2) Solo se buscan los libros cuya clave no está en el CSV o cuya huella
+       ha cambiado.
+    3) Se hace upsert: las filas de esos libros se sustituyen y el resto se
+       reescribe tal cual, en el orden del landing (las claves que ya no
+       están en el landing se conservan al final). Los libros sin resultado
+       se guardan como lápidas (id nulo), que bronze descarta.
+    - full: ignora el CSV existente y lo rehace entero.
+    - previous: enriquecimiento del que partir (por defecto csv_output);
+      puede estar en el otro formato, así al cambiar entre CSV y Parquet
+      no se pierde lo ya buscado.
+    """
+    cols = ["isbn13", "title", "authors", "publication_date", "pub_info"]
+    json_df = read_goodreads_landing(json_path, columns=cols)
+    cols = [c for c in cols if c in json_df.columns]
+    rows = (json_df[cols]
+            .astype(object).to_dict(orient="records"))
+    # Una fila por clave (si se repite, gana la última, como en el landing)
+    latest: Dict[str, Dict] = {}
+    for row in rows:
+        row["_gr_key"] = goodreads_key(row)
+        row["_gr_hash"] = goodreads_hash(row)
+        latest.pop(row["_gr_key"], None)
+        latest[row["_gr_key"]] = row
+
+    as_parquet = str(csv_output).endswith(".parquet")
+    existing = None if full else read_enrichment(previous or csv_output, typed=as_parquet)
+    known = {} if existing is None else dict(zip(existing["_gr_key"], existing["_gr_hash"]))
+    todo = [row for key, row in latest.items() if known.get(key) != row["_gr_hash"]]
+    print(f"Enriquecimiento incremental: {len(todo)} de {len(latest)} libros nuevos o cambiados")
+
+    df = enrich_rows(todo, max_workers=max_workers)
+    cache = get_google_cache()
+    if cache is not None:
+        print("Caché Google Books:", cache.report())
+
+    if existing is not None:
+        changed = {row["_gr_key"] for row in todo}
+        df = pd.concat([existing[~existing["_gr_key"].isin(changed)], df],
+                       ignore_index=True)
+    if df.empty:
+        print("Google Books: no hay libros que escribir")
+        return
+    order = {key: i for i, key in enumerate(latest)}
+    df = (df.assign(_order=df["_gr_key"].map(order).fillna(len(order)))
+          .sort_values("_order", kind="stable")
+          .drop(columns="_order"))
+    if as_parquet:
+        write_landing_parquet(df.to_dict(orient="records"), csv_output, GOOGLE_SCHEMA)
+    else:
+        df.to_csv(csv_output, index=False, encoding="utf-8")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Enriquecimiento con Google Books -> landing/")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="No leer ni escribir la caché SQLite de respuestas")
+    parser.add_argument("--full", action="store_true",
+                        help="Rehace el CSV entero en vez de enriquecer solo lo nuevo o cambiado")
+    parser.add_argument("--no-parquet", action="store_true", default=not LANDING_PARQUET,
+                        help="Escribir el CSV clásico en vez de landing/googlebooks_books.parquet")
+    args = parser.parse_args()
+    GOOGLE_CACHE_ENABLED = not args.no_cache
 
-    process_isbns_to_csv(GOOD_READS_JSON_URL, GOOGLE_CSV_URL)
+    process_isbns_to_csv(goodreads_landing_path(
+        GOOD_READS_JSONL_URL, GOOD_READS_JSON_URL, GOOD_READS_PARQUET_URL),
+        GOOGLE_CSV_URL if args.no_parquet else GOOGLE_PARQUET_URL, full=args.full,
+        previous=google_landing_path(GOOGLE_PARQUET_URL, GOOGLE_CSV_URL))
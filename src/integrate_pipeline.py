@@ -1,5 +1,19 @@
-from pipeline.gold import gold
+import argparse
+
+from pipeline.gold import gold, gold_streaming
+from setting import GOLD_STREAM_BATCH_SIZE
 
 
 if __name__ == "__main__":
-    gold()
+    parser = argparse.ArgumentParser(
+        description="Integración landing/ -> standard/ (bronze -> silver -> gold)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Procesa el landing por lotes con memoria acotada")
+    parser.add_argument("--batch-size", type=int, default=GOLD_STREAM_BATCH_SIZE,
+                        help="Filas por lote con --stream")
+    args = parser.parse_args()
+
+    if args.stream:
+        gold_streaming(args.batch_size)
+    else:
+        gold()
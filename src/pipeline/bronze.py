@@ -1,46 +1,94 @@
 import os
-from typing import Any, Dict, Tuple
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
 
 import pandas as pd
 
-from setting import GOOD_READS_JSON_URL, GOOGLE_CSV_URL
+from setting import GOOD_READS_JSON_URL, GOOD_READS_JSONL_URL, GOOD_READS_PARQUET_URL, GOOGLE_CSV_URL, GOOGLE_PARQUET_URL
+from utils.utils_landing import BOOK_COLUMNS, goodreads_landing_path, google_landing_path, iter_landing_batches, read_goodreads_landing, read_google_landing
+
+
+def _landing_paths() -> Tuple[Path, Path]:
+    # Parquet si existe (ya tipado); si no, JSONL/JSON de Goodreads y CSV de Google
+    goodreads_path = goodreads_landing_path(
+        GOOD_READS_JSONL_URL, GOOD_READS_JSON_URL, GOOD_READS_PARQUET_URL)
+    google_path = google_landing_path(GOOGLE_PARQUET_URL, GOOGLE_CSV_URL)
+    return google_path, goodreads_path
+
+
+def _prepare_google(df: pd.DataFrame, path: Path, ts: pd.Timestamp) -> pd.DataFrame:
+    # Las lápidas del enriquecimiento (libros no encontrados) no tienen id
+    df = df[df["id"].notna()].reset_index(drop=True)
+    df["_source"] = path.name
+    df["_ingest_ts"] = ts
+    return df
+
+
+def _prepare_goodreads(df: pd.DataFrame, path: Path, ts: pd.Timestamp) -> pd.DataFrame:
+    df["isbn13"] = df["isbn13"].astype("Int64")
+    df["num_pages"] = df["num_pages"].astype("Int64")
+    df["_source"] = path.name
+    df["_ingest_ts"] = ts
+    return df
+
+
+def _file_metadata(path: Path, ts: pd.Timestamp, rows: int, num_columns: int) -> Dict[str, Any]:
+    return {
+        "file": path.name,
+        "ingest_ts": str(ts),
+        "rows": rows,
+        "num_columns": num_columns,
+        "file_size_bytes": os.path.getsize(path),
+    }
 
 
 def bronze() -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
-    # Leer archivos
-    google_dataset = pd.read_csv(GOOGLE_CSV_URL)
-    good_read_dataset = pd.read_json(GOOD_READS_JSON_URL)
+    # Leer archivos: solo las columnas de BookData (_gr_key / _gr_hash solo
+    # sirven al enriquecimiento incremental)
+    google_path, goodreads_path = _landing_paths()
+    google_dataset = read_google_landing(google_path, columns=BOOK_COLUMNS)
+    good_read_dataset = read_goodreads_landing(goodreads_path, columns=BOOK_COLUMNS)
 
     ts_now = pd.Timestamp.now(tz="UTC")
-    good_read_dataset["isbn13"] = good_read_dataset["isbn13"].astype("Int64")
-    good_read_dataset["num_pages"] = good_read_dataset["num_pages"].astype(
-        "Int64")
     # Añadir columnas de metadatos a los dataframes
-    google_dataset["_source"] = "googlebooks_books.csv"
-    google_dataset["_ingest_ts"] = ts_now
-
-    good_read_dataset["_source"] = "goodreads_books.json"
-    good_read_dataset["_ingest_ts"] = ts_now
+    google_dataset = _prepare_google(google_dataset, google_path, ts_now)
+    good_read_dataset = _prepare_goodreads(good_read_dataset, goodreads_path, ts_now)
 
     # ---------------------------
     # 📌 METADATOS (3.2)
     # ---------------------------
 
     metadata: Dict[str, Any] = {
-        "google_books": {
-            "file": "google_books_data.csv",
-            "ingest_ts": str(ts_now),
-            "rows": int(len(google_dataset)),
-            "num_columns": len(google_dataset.columns),
-            "file_size_bytes": os.path.getsize(GOOGLE_CSV_URL),
-        },
-        "goodreads": {
-            "file": "goodreads_books.json",
-            "ingest_ts": str(ts_now),
-            "rows": int(len(good_read_dataset)),
-            "num_columns": len(good_read_dataset.columns),
-            "file_size_bytes": os.path.getsize(GOOD_READS_JSON_URL),
-        },
+        "google_books": _file_metadata(
+            google_path, ts_now, int(len(google_dataset)), len(google_dataset.columns)),
+        "goodreads": _file_metadata(
+            goodreads_path, ts_now, int(len(good_read_dataset)), len(good_read_dataset.columns)),
     }
 
     return google_dataset, good_read_dataset, metadata
+
+
+def bronze_batches(batch_size: int) -> Tuple[Iterator[pd.DataFrame], Iterator[pd.DataFrame], Dict[str, Any]]:
+    """
+    Capa BRONZE por lotes (modo streaming): devuelve dos iteradores de lotes
+    (Google Books y Goodreads) de como mucho batch_size filas, con las mismas
+    columnas y tipos que bronze(). rows / num_columns de los metadatos se
+    van completando a medida que se consumen los lotes.
+    """
+    google_path, goodreads_path = _landing_paths()
+    ts_now = pd.Timestamp.now(tz="UTC")
+    metadata: Dict[str, Any] = {
+        "google_books": _file_metadata(google_path, ts_now, 0, 0),
+        "goodreads": _file_metadata(goodreads_path, ts_now, 0, 0),
+    }
+
+    def batches(path: Path, prepare, meta: Dict[str, Any]) -> Iterator[pd.DataFrame]:
+        for df in iter_landing_batches(path, batch_size, columns=BOOK_COLUMNS):
+            df = prepare(df, path, ts_now)
+            meta["rows"] += int(len(df))
+            meta["num_columns"] = len(df.columns)
+            yield df
+
+    return (batches(google_path, _prepare_google, metadata["google_books"]),
+            batches(goodreads_path, _prepare_goodreads, metadata["goodreads"]),
+            metadata)
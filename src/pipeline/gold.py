@@ -1,14 +1,22 @@
 
 import json
+import os
+from collections import Counter
 from pathlib import Path
+from typing import Any, List, Set
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from const.prevenance import PROVENANCE
-from pipeline.silver import silver
-from setting import BOOKS_DETAIL_URL, DIM_BOOK_URL, DOCS_DIR, QUALITY_JSON_URL, STANDARD_DIR
-from utils.utils_merged import merge_books
-from utils.utils_normalization import generate_stable_book_id, normalize_columns_snake_case, safe_eval
+from pipeline.bronze import bronze_batches
+from pipeline.silver import check_quality, silver, silver_goodreads, silver_google
+from setting import BOOKS_DETAIL_URL, DIM_BOOK_URL, DOCS_DIR, GOLD_STREAM_BATCH_SIZE, QUALITY_JSON_URL, STANDARD_DIR
+from utils.utils_landing import COMMENT_TYPE, _table_to_frame, frame_to_table
+from utils.utils_merged import GoogleBooksIndex, merge_books
+from utils.utils_normalization import generate_stable_book_ids, normalize_columns_snake_case
+from utils.utils_quality import QualityAccumulator
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 
@@ -23,6 +31,7 @@ def gold() -> None:
         * standard/book_source_detail.parquet
         * docs/quality_metrics.json
         * docs/schema.md
+    Escribe lo mismo que gold_streaming(): mismos book_id y mismos esquemas.
     """
 
     google_silver, goodreads_silver, metadata = silver()
@@ -30,73 +39,235 @@ def gold() -> None:
     google = normalize_columns_snake_case(google_silver)
     goodreads = normalize_columns_snake_case(goodreads_silver)
 
-    list_cols = ["authors", "genres", "comments"]
-    dict_cols = ["review_count_by_lang"]
+    # authors / genres / comments / review_count_by_lang ya llegan como
+    # list/dict desde bronze (Parquet tipado o CSV decodificado al leerlo)
 
-    for col in list_cols + dict_cols:
-        if col in google.columns:
-            google[col] = google[col].apply(safe_eval)
-    # prioridad de fuentes (para supervivencia)
+    # book_source_detail: primero Google Books y después Goodreads
+    details = [_source_detail(google), _source_detail(goodreads)]
+    all_isbn13 = pd.concat([d["isbn13"] for d in details], ignore_index=True)
 
-    all_sources = pd.concat([google, goodreads], ignore_index=True)
-    cols_to_drop = [c for c in all_sources.columns if c.startswith("q_")]
-    all_sources = all_sources.drop(columns=cols_to_drop)
-    all_sources["book_id"] = all_sources.apply(
-        lambda r: generate_stable_book_id(
-            r["isbn13"],
-            r["title"],
-            r["publisher"],
-            r["publication_date"]
-        ),
-        axis=1,
-    )
-
-    completeness_cols = [
-        "title",
-        "authors",
-        "publisher",
-        "publication_date",
-        "isbn13",
-        "language",
-        "genres",
-        "num_pages",
-    ]
-    all_sources["completeness_score"] = all_sources[completeness_cols].notna().sum(
-        axis=1)
-
-    dim_book = merge_books(goodreads, google)
-    dim_book["current"] = dim_book["current"].astype("string")
-    dim_book["book_id"] = all_sources.apply(
-        lambda r: generate_stable_book_id(
-            r["isbn13"],
-            r["title"],
-            r["publisher"],
-            r["publication_date"]
-        ),
-        axis=1,
-    )
+    # prioridad de fuentes (para supervivencia)
+    dim_book = _dim_book_rows(merge_books(goodreads, google))
     dim_book = dim_book.drop_duplicates(
         subset=["isbn13"], keep="first")
 
     metadata["integration"] = {
         "dim_book_rows": int(len(dim_book)),
-        "book_source_detail_rows": int(len(all_sources)),
+        "book_source_detail_rows": int(sum(len(d) for d in details)),
         "distinct_book_ids": int(dim_book["isbn13"].nunique()),
         "duplicates_groups": int(
-            all_sources["isbn13"].value_counts().gt(1).sum()
+            all_isbn13.value_counts().gt(1).sum()
         ),
     }
-    dim_book["provenance"] = json.dumps(PROVENANCE)
     STANDARD_DIR.mkdir(exist_ok=True)
-    all_sources.drop(columns=["id"], inplace=True)
-    dim_book.drop(columns=["id"], inplace=True)
-    dim_book.to_parquet(DIM_BOOK_URL,
-                        index=False, engine="pyarrow")
+    for path, schema, frames in ((DIM_BOOK_URL, DIM_BOOK_SCHEMA, [dim_book]),
+                                 (BOOKS_DETAIL_URL, DETAIL_SCHEMA, details)):
+        output = _GoldOutput(path, schema)
+        for df in frames:
+            output.write(df)
+        output.close(commit=True)
+
+    DOCS_DIR.mkdir(exist_ok=True)
+    with open(QUALITY_JSON_URL, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+
+# ---------------------------------------------------------------------
+# Piezas comunes a gold() y gold_streaming(): las dos escriben lo mismo
+# ---------------------------------------------------------------------
+
+# Las salidas se escriben con un esquema fijo: inferirlo de cada DataFrame
+# daría tipos distintos según los datos (una columna toda nula, los
+# review_count_by_lang como structs con claves distintas...) y en streaming
+# distintos entre lotes
+_LIST_STR = pa.list_(pa.string())
+_LANG_COUNTS = pa.map_(pa.string(), pa.int64())
+_COMMENTS = pa.list_(COMMENT_TYPE)
+# Columnas con pocos valores repetidos: diccionario en Parquet, category en pandas
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+DETAIL_SCHEMA = pa.schema([
+    ("url", pa.string()), ("title", pa.string()), ("authors", _LIST_STR),
+    ("rating_value", pa.float64()), ("desc", pa.string()), ("pub_info", pa.string()),
+    ("cover", pa.string()), ("format", pa.string()), ("num_pages", pa.int64()),
+    ("publication_date", pa.string()), ("publisher", pa.string()), ("isbn", pa.string()),
+    ("isbn13", pa.int64()), ("language", _CATEGORY),
+    ("review_count_by_lang", _LANG_COUNTS), ("genres", _LIST_STR),
+    ("rating_count", pa.float64()), ("review_count", pa.float64()),
+    ("comments", _COMMENTS), ("price", pa.float64()), ("current", pa.string()),
+    ("source", pa.string()), ("ingest_ts", pa.timestamp("us", tz="UTC")),
+    ("book_id", pa.string()), ("completeness_score", pa.int64()),
+])
+
+DIM_BOOK_SCHEMA = pa.schema([
+    ("isbn13", pa.int64()), ("isbn", pa.string()), ("url", pa.string()),
+    ("title", pa.string()), ("authors", _LIST_STR), ("rating_value", pa.float64()),
+    ("desc", pa.string()), ("pub_info", pa.string()), ("publication_date", pa.string()),
+    ("cover", pa.string()), ("format", pa.string()), ("num_pages", pa.int64()),
+    ("publisher", pa.string()), ("language", _CATEGORY),
+    ("review_count_by_lang", _LANG_COUNTS), ("genres", _LIST_STR),
+    ("rating_count", pa.float64()), ("review_count", pa.float64()),
+    ("price", pa.float64()), ("current", pa.string()), ("comments", _COMMENTS),
+    ("source_winner", pa.string()), ("book_id", pa.string()), ("provenance", pa.string()),
+])
+
+COMPLETENESS_COLS = [
+    "title",
+    "authors",
+    "publisher",
+    "publication_date",
+    "isbn13",
+    "language",
+    "genres",
+    "num_pages",
+]
+
+
+class _GoldOutput:
+    """
+    Una salida de gold (Parquet + CSV) escrita lote a lote en ficheros
+    temporales. close(commit=True) los renombra a su sitio; si algo falla
+    antes (p. ej. una aserción de calidad) se borran y los artefactos
+    anteriores quedan intactos. El CSV se escribe desde la tabla Arrow ya
+    tipada, así sale igual venga el DataFrame de donde venga.
+    """
+
+    def __init__(self, parquet_path: Path, schema: pa.Schema):
+        self.schema = schema
+        self.parquet_path = Path(parquet_path)
+        self.csv_path = self.parquet_path.with_suffix(".csv")
+        self._parquet_tmp = self.parquet_path.with_name(self.parquet_path.name + ".tmp")
+        self._csv_tmp = self.csv_path.with_name(self.csv_path.name + ".tmp")
+        self._writer = pq.ParquetWriter(self._parquet_tmp, schema)
+        self._csv = open(self._csv_tmp, "w", encoding="utf-8", newline="")
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        table = frame_to_table(df.reindex(columns=self.schema.names), self.schema)
+        self._writer.write_table(table)
+        _csv_frame(table).to_csv(self._csv, header=self.rows == 0, index=False)
+        self.rows += table.num_rows
+
+    def close(self, commit: bool) -> None:
+        if self.rows == 0:
+            pd.DataFrame(columns=self.schema.names).to_csv(self._csv, index=False)
+        self._writer.close()
+        self._csv.close()
+        if commit:
+            os.replace(self._parquet_tmp, self.parquet_path)
+            os.replace(self._csv_tmp, self.csv_path)
+        else:
+            os.remove(self._parquet_tmp)
+            os.remove(self._csv_tmp)
+
+
+def _csv_frame(table: pa.Table) -> pd.DataFrame:
+    # Enteros con nulos como Int64: en float el CSV los escribiría con ".0"
+    df = _table_to_frame(table)
+    for f in table.schema:
+        if pa.types.is_integer(f.type):
+            df[f.name] = df[f.name].astype("Int64")
+    return df
+
+
+def _book_ids(df: pd.DataFrame) -> List[str]:
+    """book_id de cada fila con sus propios datos (isbn13 válido o hash estable)."""
+    return generate_stable_book_ids(
+        df["isbn13"], df["title"], df["publisher"], df["publication_date"])
+
+
+def _source_detail(df: pd.DataFrame) -> pd.DataFrame:
+    """Lote silver de una fuente -> filas de book_source_detail."""
+    df = normalize_columns_snake_case(df)
+    df = df.drop(columns=[c for c in df.columns if c.startswith("q_")] + ["id"])
+    df["book_id"] = _book_ids(df)
+    df["completeness_score"] = df[COMPLETENESS_COLS].notna().sum(axis=1)
+    return df
+
+
+def _dim_book_rows(merged: pd.DataFrame) -> pd.DataFrame:
+    """Libros fusionados por merge_books -> filas de dim_book (sin deduplicar)."""
+    merged["current"] = merged["current"].astype("string")
+    merged["book_id"] = _book_ids(merged)
+    merged["provenance"] = json.dumps(PROVENANCE)
+    return merged.drop(columns=["id"])
+
+
+# ---------------------------------------------------------------------
+# Modo streaming: mismas capas, lote a lote
+# ---------------------------------------------------------------------
+
+def gold_streaming(batch_size: int = GOLD_STREAM_BATCH_SIZE) -> None:
+    """
+    Capa GOLD en modo streaming (memoria acotada): bronze -> silver -> gold
+    lote a lote (batch_size filas) con las mismas reglas que gold().
+
+    1) Lotes de Google Books: validación, filas de book_source_detail e
+       índice de merge (GoogleBooksIndex, lo único que se guarda en memoria).
+    2) Lotes de Goodreads: validación, filas de book_source_detail y merge
+       contra el índice para dim_book (deduplicado por isbn13 con un set).
+    3) Métricas agregadas de todos los lotes y aserciones de calidad; solo si
+       pasan se publican los artefactos.
+
+    Las salidas son idénticas a las de gold() (bench_gold.py lo comprueba).
+    """
+    google_batches, goodreads_batches, metadata = bronze_batches(batch_size)
+    STANDARD_DIR.mkdir(exist_ok=True)
+    detail = _GoldOutput(BOOKS_DETAIL_URL, DETAIL_SCHEMA)
+    dim_book = _GoldOutput(DIM_BOOK_URL, DIM_BOOK_SCHEMA)
+
+    index = GoogleBooksIndex()
+    quality_gb, quality_gr = QualityAccumulator(), QualityAccumulator()
+    isbn_counts: Counter = Counter()
+    seen_isbn13: Set[Any] = set()
+
+    def write_detail(df: pd.DataFrame) -> None:
+        rows = _source_detail(df)
+        isbn_counts.update(rows["isbn13"].dropna().tolist())
+        detail.write(rows)
 
-    all_sources.to_parquet(BOOKS_DETAIL_URL, index=False, engine="pyarrow")
-    dim_book.to_csv(STANDARD_DIR/"dim_book.csv",index=False, encoding="utf-8")
+    committed = False
+    try:
+        for batch in google_batches:
+            google_silver, metrics_gb = silver_google(batch)
+            quality_gb.add(metrics_gb, len(batch))
+            google = normalize_columns_snake_case(google_silver)
+            write_detail(google)
+            index.add(google.drop(columns=[c for c in google.columns if c.startswith("q_")]))
+        print(f"Índice Google Books: {len(index)} libros")
 
-    all_sources.to_csv(STANDARD_DIR/"book_source_detail.csv", index=False, encoding="utf-8")
+        for batch in goodreads_batches:
+            goodreads_silver, metrics_gr = silver_goodreads(batch)
+            quality_gr.add(metrics_gr, len(batch))
+            goodreads = normalize_columns_snake_case(goodreads_silver)
+            write_detail(goodreads)
+
+            merged = _dim_book_rows(merge_books(goodreads, index=index))
+            # drop_duplicates(subset=["isbn13"], keep="first") entre lotes
+            # (los isbn13 nulos cuentan como un mismo valor, igual que en pandas)
+            keep = []
+            for isbn in merged["isbn13"]:
+                key = None if pd.isna(isbn) else isbn
+                keep.append(key not in seen_isbn13)
+                seen_isbn13.add(key)
+            dim_book.write(merged[keep])
+            print(f"  lote: {len(batch)} filas de Goodreads, "
+                  f"{dim_book.rows} libros en dim_book")
+
+        metadata["google_books_quality"] = quality_gb.result()
+        metadata["goodreads_quality"] = quality_gr.result()
+        check_quality(metadata["google_books_quality"], metadata["goodreads_quality"])
+        committed = True
+    finally:
+        detail.close(commit=committed)
+        dim_book.close(commit=committed)
+
+    metadata["integration"] = {
+        "dim_book_rows": int(dim_book.rows),
+        "book_source_detail_rows": int(detail.rows),
+        "distinct_book_ids": len(seen_isbn13 - {None}),
+        "duplicates_groups": sum(1 for n in isbn_counts.values() if n > 1),
+    }
     DOCS_DIR.mkdir(exist_ok=True)
     with open(QUALITY_JSON_URL, "w", encoding="utf-8") as f:
         json.dump(metadata, f, ensure_ascii=False, indent=2)
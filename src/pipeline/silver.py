@@ -5,26 +5,34 @@ from pipeline.bronze import bronze
 from utils.utils_quality import normalize_dataframe, validate_goodreads_df, validate_googlebooks_df
 
 
-def silver() -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
-    """
-    Capa SILVER (3.3 Chequeos de calidad):
+def silver_google(google_bronze: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Normaliza y valida Google Books (un dataset entero o un lote)."""
+    google_normalize = normalize_dataframe(google_bronze)
+    google_silver, metrics_gb = validate_googlebooks_df(google_normalize)
+    google_silver["q_record_valid"] = (
+        google_silver["q_gb_title_valid"]
+        & google_silver["q_gb_isbn13_valid"]
+        & google_silver["q_gb_language_valid"]
+    )
+    metrics_gb["rows_valid"] = int(google_silver["q_record_valid"].sum())
+    return google_silver, metrics_gb
 
-    - Aplica validaciones de calidad a los datasets bronze.
-    - Añade columnas de flags (q_*) a cada dataframe.
-    - Calcula métricas agregadas y aserciones bloqueantes.
-    - Devuelve:
-      google_silver, goodreads_silver, metadata_actualizada
-    """
 
-    google_bronze, goodreads_bronze, metadata = bronze()
-    google_normalize = normalize_dataframe(google_bronze)
+def silver_goodreads(goodreads_bronze: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Normaliza y valida Goodreads (un dataset entero o un lote)."""
     goodreads_normalize = normalize_dataframe(goodreads_bronze)
-    google_silver, metrics_gb = validate_googlebooks_df(google_normalize)
     goodreads_silver, metrics_gr = validate_goodreads_df(goodreads_normalize)
+    goodreads_silver["q_record_valid"] = (
+        goodreads_silver["q_gr_title_valid"]
+        & goodreads_silver["q_gr_isbn13_valid"]
+        & goodreads_silver["q_gr_rating_valid"]
+    )
+    metrics_gr["rows_valid"] = int(goodreads_silver["q_record_valid"].sum())
+    return goodreads_silver, metrics_gr
 
-    metadata["google_books_quality"] = metrics_gb
-    metadata["goodreads_quality"] = metrics_gr
 
+def check_quality(metrics_gb: Dict[str, Any], metrics_gr: Dict[str, Any]) -> None:
+    """Aserciones bloqueantes sobre las métricas de calidad de ambas fuentes."""
     assert (
         metrics_gr["goodreads_pct_title_not_null"] >= 0.90
     ), f"Goodreads: solo {metrics_gr['goodreads_pct_title_not_null']:.2%} títulos no nulos"
@@ -44,23 +52,25 @@ def silver() -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
         f"({metrics_gb['googlebooks_pct_title_not_null']:.2%})"
     )
 
-    google_silver["q_record_valid"] = (
-        google_silver["q_gb_title_valid"]
-        & google_silver["q_gb_isbn13_valid"]
-        & google_silver["q_gb_language_valid"]
-    )
 
-    goodreads_silver["q_record_valid"] = (
-        goodreads_silver["q_gr_title_valid"]
-        & goodreads_silver["q_gr_isbn13_valid"]
-        & goodreads_silver["q_gr_rating_valid"]
-    )
+def silver() -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """
+    Capa SILVER (3.3 Chequeos de calidad):
 
-    metadata["google_books_quality"]["rows_valid"] = int(
-        google_silver["q_record_valid"].sum()
-    )
-    metadata["goodreads_quality"]["rows_valid"] = int(
-        goodreads_silver["q_record_valid"].sum()
-    )
+    - Aplica validaciones de calidad a los datasets bronze.
+    - Añade columnas de flags (q_*) a cada dataframe.
+    - Calcula métricas agregadas y aserciones bloqueantes.
+    - Devuelve:
+      google_silver, goodreads_silver, metadata_actualizada
+    """
+
+    google_bronze, goodreads_bronze, metadata = bronze()
+    google_silver, metrics_gb = silver_google(google_bronze)
+    goodreads_silver, metrics_gr = silver_goodreads(goodreads_bronze)
+
+    metadata["google_books_quality"] = metrics_gb
+    metadata["goodreads_quality"] = metrics_gr
+
+    check_quality(metrics_gb, metrics_gr)
 
     return google_silver, goodreads_silver, metadata
@@ -1,23 +1,42 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse
+import asyncio
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
 import json
+import multiprocessing
 import os
+import queue
 import re
-from typing import List, Dict, Optional
+from pathlib import Path
+from urllib.parse import urlparse
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple, Union
 
-from bs4 import BeautifulSoup
-import pandas as pd
+from bs4 import BeautifulSoup, SoupStrainer
+import httpx
 import requests
 import time
 from models.Book import BookData
 from selenium.webdriver.chrome.options import Options
 from selenium import webdriver
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from playwright.sync_api import sync_playwright
+from selenium.webdriver.remote.webdriver import WebDriver
+from playwright.async_api import BrowserContext as AsyncBrowserContext
+from playwright.async_api import Page as AsyncPage
+from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as AsyncPlaywrightTimeoutError
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+import threading
 
 
-from setting import BOOKS_IDS, GOOD_READS_BASE_URL, GOOD_READS_JSON_URL, LANDING_DIR, SELENIUM, USER_AGENT
+from setting import ASYNC_MAX_CONCURRENCY, BOOKS_IDS, CRAWL_BACKOFF_SECONDS, CRAWL_MANIFEST_URL, CRAWL_MAX_RETRIES, GOOD_READS_BASE_URL, GOOD_READS_JSONL_URL, GOOD_READS_PARQUET_URL, GOODREADS_RATE_BURST, GOODREADS_RATE_LIMIT, HTML_CACHE_DIR, HTML_CACHE_TTL_HOURS, LANDING_DIR, LANDING_PARQUET, PIPELINE_PARSE_WORKERS, PIPELINE_QUEUE_SIZE, PLAYWRIGHT_DETAILS_TIMEOUT_MS, PLAYWRIGHT_LIGHT_LOAD, PLAYWRIGHT_POOL_SIZE, PLAYWRIGHT_RECYCLE_PAGES, PLAYWRIGHT_SCRIPT_HOSTS, REVIEW_FETCH_WORKERS, SELENIUM, SELENIUM_RECYCLE_PAGES, USER_AGENT
+from utils.utils_browser import CHROMIUM_ARGS, PageTraffic, PlaywrightPool, SeleniumDriverCache, resolve_chromedriver_path, should_block
+from utils.utils_cache import CacheEntry, HtmlCache
+from utils.utils_http import RateLimiter
+from utils.utils_landing import JsonlWriter, book_to_record, jsonl_to_parquet
+from utils.utils_manifest import CrawlManifest
 
 
 # Creamos una sesión HTTP reutilizable (más eficiente que requests.get suelto)
@@ -30,6 +49,66 @@ SESSION.headers.update({
     )
 })
 
+# Marcas del JSON embebido que necesita parse_basic_soup. Si el HTML de Requests
+# ya las trae (o trae el __NEXT_DATA__ completo para parse_basic_json)
+# no hace falta lanzar un navegador.
+BOOK_DATA_MARKERS = ('"ratingCount"', '"bookGenres"')
+# El bloque .EditionDetails tiene que estar como elemento: el nombre suelto
+# también aparece en CSS, scripts o comentarios (p. ej. el del stub)
+EDITION_DETAILS_RE = re.compile(r"""class\s*=\s*["'][^"']*\bEditionDetails\b""")
+NEXT_DATA_MARKERS = ("__NEXT_DATA__", '"bookGenres"', '"ratingsCount"')
+
+# Contadores de qué nivel sirvió cada libro: requests / playwright / selenium / failed
+FETCH_STATS: Counter = Counter()
+_FETCH_STATS_LOCK = threading.Lock()
+
+# Carga ligera en Playwright (ver load_book_page); --full-page-load la desactiva.
+# PAGE_LOAD_STATS suma ms / bytes / peticiones / bloqueadas de cada carga.
+LIGHT_LOAD = PLAYWRIGHT_LIGHT_LOAD
+PAGE_LOAD_STATS: Counter = Counter()
+
+# Límite global de peticiones a Goodreads (token bucket) compartido por todos los hilos
+GOODREADS_LIMITER = RateLimiter(GOODREADS_RATE_LIMIT, burst=GOODREADS_RATE_BURST)
+
+# Hilos para descargar a la vez las páginas de reseñas de cada libro
+REVIEWS_EXECUTOR = ThreadPoolExecutor(
+    max_workers=REVIEW_FETCH_WORKERS, thread_name_prefix="reviews")
+
+# Caché en disco del HTML descargado (None si se desactiva con --no-cache).
+# Con CACHE_ONLY (--offline) no se hace ninguna petición: todo sale de la caché.
+HTML_CACHE: Optional[HtmlCache] = HtmlCache(
+    HTML_CACHE_DIR, ttl=HTML_CACHE_TTL_HOURS * 3600)
+CACHE_ONLY = False
+# Sufijo de la clave con la que se guarda el HTML renderizado por un navegador
+RENDERED_SUFFIX = "#rendered"
+
+# Pool de navegadores de Playwright compartido por todos los hilos (se crea al primer uso)
+_BROWSER_POOL: Optional[PlaywrightPool] = None
+_BROWSER_POOL_LOCK = threading.Lock()
+
+
+def get_browser_pool() -> PlaywrightPool:
+    """Devuelve el pool de navegadores compartido, creándolo si hace falta."""
+    global _BROWSER_POOL
+    with _BROWSER_POOL_LOCK:
+        if _BROWSER_POOL is None:
+            _BROWSER_POOL = PlaywrightPool(
+                size=PLAYWRIGHT_POOL_SIZE,
+                recycle_after=PLAYWRIGHT_RECYCLE_PAGES,
+                user_agent=USER_AGENT,
+            )
+        return _BROWSER_POOL
+
+
+def close_browsers() -> None:
+    """Cierra el pool de Playwright (si se llegó a crear) y los drivers de Selenium."""
+    global _BROWSER_POOL
+    with _BROWSER_POOL_LOCK:
+        pool, _BROWSER_POOL = _BROWSER_POOL, None
+    if pool is not None:
+        pool.close()
+    DRIVER_CACHE.close()
+
 
 def make_headless_chrome():
     """
@@ -44,7 +123,7 @@ def make_headless_chrome():
         opts.add_argument("--disable-gpu")
         opts.add_argument("--window-size=1920,1080")
 
-        service = Service(ChromeDriverManager().install())
+        service = Service(resolve_chromedriver_path())
         driver = webdriver.Chrome(
             service=service,
             options=opts
@@ -57,12 +136,233 @@ def make_headless_chrome():
         raise
 
 
-def parse_basic(html: str, book_id: int) -> BookData:
+# Un ChromeDriver por hilo de trabajo, reutilizado entre libros
+DRIVER_CACHE = SeleniumDriverCache(
+    make_headless_chrome, recycle_after=SELENIUM_RECYCLE_PAGES)
+
+
+NEXT_DATA_START = '<script id="__NEXT_DATA__" type="application/json">'
+_PRICE_RE = re.compile(r'Button__labelItem">[^<$]*\$([\d.,]+)<')
+_TAG_RE = re.compile(r"<[^>]+>")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def extract_next_data(html: str) -> Optional[Dict]:
+    """
+    Localiza el JSON de estado que Next.js embebe en la página
+    (<script id="__NEXT_DATA__">) y lo decodifica con un único json.loads.
+    Devuelve None si no está o no es JSON válido.
+    """
+    start = html.find(NEXT_DATA_START)
+    if start == -1:
+        return None
+    start += len(NEXT_DATA_START)
+    end = html.find("</script>", start)
+    if end == -1:
+        return None
+    try:
+        return json.loads(html[start:end])
+    except ValueError:
+        return None
+
+
+# Bloques de reseña: probamos dos variantes comunes (mismo orden que los selectores)
+REVIEW_SELECTORS = ('[data-testid="review"]', ".ReviewCard")
+REVIEW_STRAINERS = (
+    SoupStrainer(attrs={"data-testid": "review"}),
+    SoupStrainer(class_=re.compile(r"(^|\s)ReviewCard(\s|$)")),
+)
+
+
+class ParsedPage:
+    """
+    HTML de una página de Goodreads que se parsea de forma perezosa y una sola vez,
+    para compartirlo entre parse_basic y parse_reviews_from_html:
+    - state: JSON __NEXT_DATA__ (parse_basic_json).
+    - soup: árbol BeautifulSoup completo (solo lo necesita parse_basic_soup).
+    - review_cards(): bloques de reseña. Si ya existe el árbol completo se
+      reutiliza; si no, solo se construyen los subárboles de reseñas (SoupStrainer).
+    """
+
+    def __init__(self, html: str):
+        if not html:
+            raise ValueError("No hay HTML que parsear")
+        self.html = html
+        self._state: Optional[Dict] = None
+        self._state_loaded = False
+        self._soup: Optional[BeautifulSoup] = None
+        self._review_cards: Optional[list] = None
+
+    @property
+    def state(self) -> Optional[Dict]:
+        if not self._state_loaded:
+            self._state = extract_next_data(self.html)
+            self._state_loaded = True
+        return self._state
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, "lxml")
+        return self._soup
+
+    def review_cards(self) -> list:
+        if self._review_cards is None:
+            cards = []
+            for strainer, selector in zip(REVIEW_STRAINERS, REVIEW_SELECTORS):
+                if self._soup is not None:
+                    cards = self._soup.select(selector)
+                else:
+                    cards = BeautifulSoup(
+                        self.html, "lxml", parse_only=strainer).select(selector)
+                if cards:
+                    break
+            self._review_cards = cards
+        return self._review_cards
+
+
+def as_page(doc: Union[str, ParsedPage, None]) -> ParsedPage:
+    """Acepta HTML en texto o una ParsedPage ya creada."""
+    if isinstance(doc, ParsedPage):
+        return doc
+    return ParsedPage(doc)
+
+
+def _ms_to_date(ms: Optional[float]) -> Optional[datetime]:
+    if ms is None:
+        return None
+    try:
+        return _EPOCH + timedelta(milliseconds=ms)
+    except (TypeError, OverflowError):
+        return None
+
+
+def _find_book_state(apollo: Dict, book_id: int) -> Optional[Dict]:
+    """Busca en el apolloState el nodo Book del libro pedido."""
+    root = apollo.get("ROOT_QUERY", {})
+    for key, value in root.items():
+        if key.startswith("getBookByLegacyId") and isinstance(value, dict):
+            book = apollo.get(value.get("__ref", ""))
+            if book:
+                return book
+    books = [v for k, v in apollo.items() if k.startswith("Book:")]
+    for book in books:
+        if str(book.get("legacyId")) == str(book_id):
+            return book
+    for book in books:
+        if book.get("details"):
+            return book
+    return None
+
+
+def parse_basic_json(doc: Union[str, ParsedPage], book_id: int) -> Optional[BookData]:
+    """
+    Extrae los campos básicos del JSON de estado embebido (__NEXT_DATA__),
+    sin construir el árbol de BeautifulSoup.
+    Devuelve None si la página no trae el JSON o no contiene el libro.
+    """
+    page = as_page(doc)
+    state = page.state
+    if not state:
+        return None
+    apollo = state.get("props", {}).get("pageProps", {}).get("apolloState")
+    if not apollo:
+        return None
+    book = _find_book_state(apollo, book_id)
+    if not book:
+        return None
+
+    def deref(node):
+        if isinstance(node, dict) and "__ref" in node:
+            return apollo.get(node["__ref"], {})
+        return node or {}
+
+    work = deref(book.get("work"))
+    stats = work.get("stats") or {}
+    details = book.get("details") or {}
+
+    authors = []
+    edges = [book.get("primaryContributorEdge")] + \
+        (book.get("secondaryContributorEdges") or [])
+    for edge in edges:
+        name = deref((edge or {}).get("node")).get("name")
+        if name:
+            authors.append(name)
+
+    desc = book.get('description({"stripped":true})')
+    if desc is None and book.get("description"):
+        desc = _TAG_RE.sub(" ", book["description"])
+    desc = " ".join(desc.split()) if desc else None
+
+    first_published = _ms_to_date((work.get("details") or {}).get("publicationTime"))
+    published = _ms_to_date(details.get("publicationTime"))
+    pub_info = None
+    if first_published:
+        pub_info = f"First published {first_published:%B} {first_published.day}, {first_published.year}"
+    elif published:
+        pub_info = f"Published {published:%B} {published.day}, {published.year}"
+
+    review_count_by_lang = {}
+    for item in stats.get("textReviewsLanguageCounts") or []:
+        lang = item.get("isoLanguageCode")
+        if isinstance(lang, str) and re.fullmatch(r"[a-z]{2}", lang):
+            review_count_by_lang[lang] = review_count_by_lang.get(
+                lang, 0) + int(item.get("count") or 0)
+
+    genres = [g["genre"]["name"]
+              for g in book.get("bookGenres") or [] if g.get("genre")]
+
+    num_pages = details.get("numPages")
+    book_format = details.get("format")
+    if num_pages and book_format:
+        format = f"{num_pages} pages, {book_format}"
+    elif num_pages:
+        format = f"{num_pages} pages"
+    else:
+        format = book_format or None
+
+    m = _PRICE_RE.search(page.html)
+    price = m.group(1) if m else None
+    current = "USD" if price else None
+
+    isbn13 = details.get("isbn13")
+    language = (details.get("language") or {}).get("name")
+
+    return BookData(
+        id=book_id, url=f"{GOOD_READS_BASE_URL}{book_id}", title=book.get("title"),
+        authors=set(authors), rating_value=stats.get("averageRating"), desc=desc,
+        pub_info=pub_info, cover=book.get("imageUrl"),
+        review_count_by_lang=review_count_by_lang, genres=genres,
+        publisher=details.get("publisher"), rating_count=stats.get("ratingsCount"),
+        review_count=stats.get("textReviewsCount"), isbn=details.get("isbn"),
+        format=format, language=language, num_pages=num_pages,
+        isbn13=int(isbn13) if isbn13 and str(isbn13).isdigit() else None,
+        price=price, current=current,
+        publication_date=str(published.year) if published else None
+    )
+
+
+def parse_basic(doc: Union[str, ParsedPage], book_id: int) -> BookData:
+    """
+    Extrae los campos básicos del libro.
+    Primero intenta el JSON de estado embebido (un solo json.loads) y solo si
+    la página no lo trae recorre el árbol con BeautifulSoup.
+    """
+    page = as_page(doc)
+    bd = parse_basic_json(page, book_id)
+    if bd is not None:
+        return bd
+    return parse_basic_soup(page, book_id)
+
+
+def parse_basic_soup(doc: Union[str, ParsedPage], book_id: int) -> BookData:
     """
     Extrae los campos básicos directamente del HTML usando BeautifulSoup.
     OJO: si Goodreads cambia sus clases/nodos, habrá que actualizar los selectores.
     """
-    soup = BeautifulSoup(html, "lxml")
+    page = as_page(doc)
+    html = page.html
+    soup = page.soup
 
     title_el = soup.find(class_="Text Text__title1")
     title = title_el.get_text(strip=True) if title_el else None
@@ -112,16 +412,22 @@ def parse_basic(html: str, book_id: int) -> BookData:
         class_="EditionDetails")
     sell_button = soup.find_all(
         class_="Button__container Button__container--block")
-    text_price = sell_button[1].find(class_="Button__labelItem")
     try:
+        text_price = sell_button[1].find(class_="Button__labelItem")
         price = text_price.text.split("$")[1]
         current = "USD"
     except Exception:
         price = None
         current = None
 
-    extra_data = edition_details.find_all(
-        class_="TruncatedContent__text TruncatedContent__text--small")
+    format = num_pages = publisher = publication_date = None
+    isbn13 = isbn = language = None
+    if edition_details is None:
+        print(f"{book_id}: sin bloque EditionDetails")
+        extra_data = []
+    else:
+        extra_data = edition_details.find_all(
+            class_="TruncatedContent__text TruncatedContent__text--small")
     new_extra_data = []
     for item in extra_data:
         texto = str(item.get_text())
@@ -163,97 +469,303 @@ def parse_basic(html: str, book_id: int) -> BookData:
     return bd
 
 
+def script_hosts() -> List[str]:
+    """Hosts de los que se aceptan scripts en modo ligero (incluye el de GOOD_READS_BASE_URL)."""
+    hosts = list(PLAYWRIGHT_SCRIPT_HOSTS)
+    base_host = urlparse(GOOD_READS_BASE_URL or "").hostname
+    if base_host:
+        hosts.append(base_host.lower())
+    return hosts
+
+
+def record_page_load(url: str, traffic: PageTraffic) -> None:
+    """Imprime el coste de una carga de página y lo suma a PAGE_LOAD_STATS."""
+    print(f"  {url}: {traffic.ms:.0f} ms, {traffic.bytes / 1024:.0f} KiB, "
+          f"{traffic.requests} peticiones, {traffic.blocked} bloqueadas")
+    with _FETCH_STATS_LOCK:
+        PAGE_LOAD_STATS.update(pages=1, ms=int(traffic.ms), bytes=traffic.bytes,
+                               requests=traffic.requests, blocked=traffic.blocked)
+
+
+def load_book_page(page: Page, url: str) -> str:
+    """
+    Navega con una página ya abierta del pool, pulsa el botón de detalles
+    y devuelve el HTML completo.
+    - Modo ligero (LIGHT_LOAD): aborta imágenes, fuentes, vídeo y scripts de
+      terceros (should_block), no espera a networkidle y, tras el clic,
+      espera a que aparezca .EditionDetails en vez de dormir 500 ms.
+    - Modo completo: carga todo, networkidle + 500 ms (comportamiento original).
+    """
+    traffic = PageTraffic()
+    hosts = script_hosts()
+
+    def route(r) -> None:
+        if should_block(r.request.resource_type, r.request.url, hosts):
+            traffic.blocked += 1
+            r.abort()
+        else:
+            r.continue_()
+
+    page.on("response", traffic.on_response)
+    if LIGHT_LOAD:
+        page.route("**/*", route)
+    traffic.start()
+
+    page.goto(url, wait_until="domcontentloaded" if LIGHT_LOAD else "networkidle")
+
+    # Esperamos y clicamos el botón de detalles (mismo XPATH que usabas)
+    boton = page.locator(
+        "//button[@aria-label='Book details and editions']")
+    boton.click()
+
+    if LIGHT_LOAD:
+        try:
+            page.wait_for_selector(".EditionDetails", state="attached",
+                                   timeout=PLAYWRIGHT_DETAILS_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            print(f"Sin .EditionDetails tras {PLAYWRIGHT_DETAILS_TIMEOUT_MS} ms: {url}")
+    else:
+        # Pequeña espera para que carguen los detalles
+        page.wait_for_timeout(500)
+
+    html = page.content()
+    traffic.stop()
+
+    # La página del pool se reutiliza: quitamos lo que hemos enganchado
+    page.remove_listener("response", traffic.on_response)
+    if LIGHT_LOAD:
+        page.unroute("**/*", route)
+    record_page_load(url, traffic)
+    return html
+
+
 def fetch_book_html_playwright(book_id: int) -> Optional[str]:
     """
     Carga la página con Playwright (más ligero que Selenium, también ejecuta JS)
     y devuelve el HTML completo tras pulsar el botón de detalles.
+    El navegador sale del pool compartido, así que solo se arranca
+    Chromium una vez por navegador del pool y no una vez por libro.
     """
     url = f"{GOOD_READS_BASE_URL}{book_id}"
     print(f"PlayWright Scrapeando: {url}")
+    GOODREADS_LIMITER.acquire()
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=[
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-gpu",
-                    "--window-size=1920,1080",
-                ]
-            )
-            context = browser.new_context(user_agent=USER_AGENT)
-            page = context.new_page()
-            page.goto(url, wait_until="networkidle")
-
-            # Esperamos y clicamos el botón de detalles (mismo XPATH que usabas)
-            boton = page.locator(
-                "//button[@aria-label='Book details and editions']")
-            boton.click()
-
-            # Pequeña espera para que carguen los detalles
-            page.wait_for_timeout(500)
-
-            html = page.content()
-
-            browser.close()
-            return html
+        return get_browser_pool().run(lambda page: load_book_page(page, url))
 
     except Exception as e:
         print(f"ERROR AL CARGAR LIBRO {book_id} CON PLAYWRIGHT:", e)
         return None
 
 
+def load_book_page_selenium(driver: WebDriver, url: str) -> str:
+    """
+    Navega con un driver ya abierto, pulsa el botón de detalles
+    y devuelve el HTML.
+    """
+    driver.get(url)
+    boton = driver.find_element(
+        By.XPATH,
+        "//button[@aria-label='Book details and editions']")
+    boton.click()
+    time.sleep(2.0)
+    return driver.page_source
+
+
 def fetch_book_html_selenium(book_id: int) -> Optional[str]:
     """
     Carga la página con Selenium (más lento, pero ejecuta JS) y devuelve el HTML.
     Usa Selenium solo si Requests no trae lo necesario.
+    El driver es el del hilo actual (DRIVER_CACHE): no se arranca Chrome por libro.
     """
+    url = f"{GOOD_READS_BASE_URL}{book_id}"
+    GOODREADS_LIMITER.acquire()
+    return DRIVER_CACHE.run(lambda driver: load_book_page_selenium(driver, url))
+
 
-    driver = make_headless_chrome()
+def has_book_data(html: Optional[str]) -> bool:
+    """True si el HTML ya trae todo lo que necesita parse_basic."""
+    if not html:
+        return False
+    return ((all(marker in html for marker in BOOK_DATA_MARKERS)
+             and EDITION_DETAILS_RE.search(html) is not None)
+            or all(marker in html for marker in NEXT_DATA_MARKERS))
+
+
+def configure_cache(enabled: bool = True, offline: bool = False) -> None:
+    """
+    - enabled: usar la caché en disco del HTML.
+    - offline: no salir a la red; lo que no esté en caché se da por fallido.
+    """
+    global HTML_CACHE, CACHE_ONLY
+    if offline and not enabled:
+        raise ValueError("El modo offline necesita la caché activada")
+    HTML_CACHE = HtmlCache(
+        HTML_CACHE_DIR, ttl=HTML_CACHE_TTL_HOURS * 3600) if enabled else None
+    CACHE_ONLY = offline
+
+
+def _cached_entry(url: str) -> Optional[CacheEntry]:
+    return HTML_CACHE.get(url) if HTML_CACHE is not None else None
+
+
+def _usable(entry: Optional[CacheEntry]) -> bool:
+    """Una entrada se usa sin red si está fresca (o si estamos en modo offline)."""
+    return entry is not None and (CACHE_ONLY or HTML_CACHE.is_fresh(entry))
+
+
+def _revalidation_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+    headers = {}
+    if entry is not None and entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry is not None and entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def _store_response(url: str, entry: Optional[CacheEntry], status_code: int,
+                    text: str, headers) -> Optional[str]:
+    """Actualiza la caché con la respuesta y devuelve el HTML a usar."""
+    if status_code == 304 and entry is not None:
+        HTML_CACHE.touch(entry)
+        return entry.html
+    if status_code != 200:
+        return None
+    if HTML_CACHE is not None:
+        HTML_CACHE.put(url, text, headers.get("ETag"),
+                       headers.get("Last-Modified"))
+    return text
+
+
+def cached_get(url: str) -> Optional[str]:
+    """
+    GET a Goodreads con caché en disco:
+    - entrada fresca -> se devuelve sin tocar la red.
+    - entrada caducada -> petición condicional (ETag / Last-Modified); con 304 se reutiliza.
+    - CACHE_ONLY -> solo caché, nunca red.
+    Devuelve None si no hay HTML (status != 200 o no está en caché offline).
+    """
+    entry = _cached_entry(url)
+    if _usable(entry):
+        return entry.html
+    if CACHE_ONLY:
+        return None
+    GOODREADS_LIMITER.acquire()
+    r = SESSION.get(url, headers=_revalidation_headers(entry), timeout=30)
+    return _store_response(url, entry, r.status_code, r.text, r.headers)
+
+
+async def cached_get_async(client: httpx.AsyncClient, url: str) -> Optional[str]:
+    """Versión async de cached_get."""
+    entry = _cached_entry(url)
+    if _usable(entry):
+        return entry.html
+    if CACHE_ONLY:
+        return None
+    await GOODREADS_LIMITER.acquire_async()
+    r = await client.get(url, headers=_revalidation_headers(entry))
+    return _store_response(url, entry, r.status_code, r.text, r.headers)
+
+
+def cached_rendered(url: str) -> Optional[str]:
+    """HTML renderizado por navegador guardado en caché (si se puede usar)."""
+    entry = _cached_entry(url + RENDERED_SUFFIX)
+    return entry.html if _usable(entry) else None
+
+
+def store_rendered(url: str, html: Optional[str]) -> None:
+    if html and HTML_CACHE is not None:
+        HTML_CACHE.put(url + RENDERED_SUFFIX, html)
+
+
+def count_fetch(tier: str) -> None:
+    with _FETCH_STATS_LOCK:
+        FETCH_STATS[tier] += 1
+
+
+def print_fetch_stats() -> None:
+    """Resumen de qué nivel sirvió cada libro y cuántos navegadores nos ahorramos."""
+    with _FETCH_STATS_LOCK:
+        stats = dict(FETCH_STATS)
+    print("Libros por nivel:", stats)
+    print("Lanzamientos de navegador evitados:",
+          stats.get("requests", 0) + stats.get("cache", 0))
+    if HTML_CACHE is not None:
+        print("Caché HTML:", dict(HTML_CACHE.stats))
+    with _FETCH_STATS_LOCK:
+        loads = dict(PAGE_LOAD_STATS)
+    n = loads.get("pages", 0)
+    if n:
+        print(f"Cargas con Playwright ({'ligeras' if LIGHT_LOAD else 'completas'}): {n} páginas, "
+              f"{loads['ms'] / n:.0f} ms/página, {loads['bytes'] / n / 1024:.0f} KiB/página, "
+              f"{loads['requests'] / n:.1f} peticiones/página, {loads['blocked'] / n:.1f} bloqueadas/página")
+
+
+def fetch_book_html_requests(book_id: int) -> Optional[str]:
+    """
+    Descarga la página con la SESSION compartida (sin JavaScript).
+    Devuelve None si la petición falla.
+    """
     try:
-        driver.get(f"{GOOD_READS_BASE_URL}{book_id}")
-        boton = driver.find_element(
-            By.XPATH,
-            "//button[@aria-label='Book details and editions']")
-        boton.click()
-        time.sleep(2.0)
-        html = driver.page_source
+        return cached_get(f"{GOOD_READS_BASE_URL}{book_id}")
+    except requests.RequestException as e:
+        print(f"ERROR AL CARGAR LIBRO {book_id} CON REQUESTS:", e)
+        return None
+
+
+def fetch_book_html(book_id: int) -> Optional[str]:
+    """
+    Descarga por niveles:
+    1) Prueba Requests con la SESSION compartida.
+    2) Si falla o el HTML no trae los datos (has_book_data), busca el HTML
+       renderizado en la caché y, si no está, usa Selenium o Playwright
+       según SELENIUM (salvo en modo offline).
+    """
+    url = f"{GOOD_READS_BASE_URL}{book_id}"
+    html = fetch_book_html_requests(book_id)
+    if has_book_data(html):
+        count_fetch("requests")
         return html
-    finally:
-        driver.quit()
+
+    html = cached_rendered(url)
+    if html:
+        count_fetch("cache")
+    elif CACHE_ONLY:
+        count_fetch("failed")
+    else:
+        if SELENIUM:
+            html = fetch_book_html_selenium(book_id)
+            tier = "selenium"
+        else:
+            html = fetch_book_html_playwright(book_id)
+            tier = "playwright"
+        count_fetch(tier if html else "failed")
+        store_rendered(url, html)
+    return html
 
 
 def get_book(book_id: int) -> BookData:
     """
     Orquestador:
-    1) Prueba Requests (salvo que prefer_selenium=True).
-    2) Si falla/no hay HTML, usa Selenium.
-    3) Parsea básicos + detalles y hace limpiezas al final.
+    1) Descarga el HTML por niveles (fetch_book_html).
+    2) Parsea básicos + detalles y hace limpiezas al final.
     """
-    if SELENIUM:
-        html = fetch_book_html_selenium(book_id)
-    else:
-        html = fetch_book_html_playwright(book_id)
-
+    html = fetch_book_html(book_id)
     bd = parse_basic(html, book_id)
 
     return bd
 
 
-def parse_reviews_from_html(html: str) -> List[Dict]:
+def parse_reviews_from_html(doc: Union[str, ParsedPage]) -> List[Dict]:
     """
     Extrae reseñas individuales desde el HTML de la página del libro.
-    Goodreads tiene varios layouts, por eso probamos distintos selectores.
+    Goodreads tiene varios layouts, por eso probamos distintos selectores
+    (REVIEW_SELECTORS). Acepta el HTML o la ParsedPage del libro, así la
+    página 1 no se vuelve a parsear.
     Devuelve: lista de dicts con {user, date, rating, text}.
     """
-    soup = BeautifulSoup(html, "lxml")
     reviews = []
 
-    # Bloques de reseña: probamos dos variantes comunes
-    candidates = soup.select(
-        '[data-testid="review"]') or soup.select(".ReviewCard")
-
-    for c in candidates:
+    for c in as_page(doc).review_cards():
         text_el = c.select_one(
             '[data-testid="reviewText"]') or c.select_one(".ReviewText__content")
         text = text_el.get_text(" ", strip=True) if text_el else None
@@ -282,71 +794,649 @@ def parse_reviews_from_html(html: str) -> List[Dict]:
     return reviews
 
 
-def get_reviews(book_id: int, max_pages: int = 3, delay: float = 1.0) -> List[Dict]:
+def fetch_reviews_page(book_id: int, page: int) -> Optional[List[Dict]]:
     """
-    Descarga reseñas de varias páginas (?page=2, ?page=3, ...).
-    - max_pages: cuántas páginas intentar como máximo.
-    - delay: pausa entre peticiones para no saturar el servidor.
-    Heurística: si una página no trae resultados (y no es la primera), se detiene.
+    Descarga y parsea una página de reseñas respetando el límite global de
+    peticiones a Goodreads. Devuelve None si la petición falla.
     """
-    out = []
+    html = cached_get(f"{GOOD_READS_BASE_URL}{book_id}?page={page}")
+    if html is None:
+        return None
+    return parse_reviews_from_html(html)
 
-    for page in range(1, max_pages + 1):
-        url = f"{GOOD_READS_BASE_URL}{book_id}?page={page}"
-        r = SESSION.get(url, timeout=30)
-        if r.status_code != 200:
-            break  # si falla la petición, paramos
-        out.extend(parse_reviews_from_html(r.text))
-        time.sleep(delay)
 
+def merge_review_pages(pages: List[Optional[List[Dict]]]) -> List[Dict]:
+    """
+    Junta las páginas de reseñas en orden.
+    Heurística: si una página falla, o no hay resultados tras la primera, se detiene.
+    """
+    out = []
+    for page, reviews in enumerate(pages, start=1):
+        if reviews is None:
+            break  # si falla la petición, paramos
+        out.extend(reviews)
         if page > 1 and len(out) == 0:
             break
-
     return out
 
 
+def get_reviews(book_id: int, max_pages: int = 3,
+                first_page: Optional[ParsedPage] = None) -> List[Dict]:
+    """
+    Descarga reseñas de varias páginas (?page=2, ?page=3, ...) a la vez.
+    - max_pages: cuántas páginas intentar como máximo.
+    - first_page: página del libro ya descargada; la página 1 de reseñas es ese
+      mismo HTML, así que se reutiliza en vez de volver a pedirla.
+    No hay pausas fijas: el ritmo lo marca GOODREADS_LIMITER, compartido por
+    todos los hilos, así que el tiempo total depende del límite y no de la
+    suma de esperas.
+    """
+    first = 2 if first_page is not None else 1
+    futs = [REVIEWS_EXECUTOR.submit(fetch_reviews_page, book_id, page)
+            for page in range(first, max_pages + 1)]
+
+    pages = [parse_reviews_from_html(first_page)] if first_page is not None else []
+    pages.extend(fut.result() for fut in futs)
+    return merge_review_pages(pages)
+
+
 def process_one(book_id: int, with_reviews=True) -> BookData:
     """
     Descarga y parsea un único libro.
     Si with_reviews=True, también intenta traer sus reseñas.
     """
-    bd = get_book(book_id)
+    doc = as_page(fetch_book_html(book_id))
+    bd = parse_basic(doc, book_id)
     if with_reviews:
         try:
-            bd.comments = get_reviews(book_id, max_pages=3)  # mejor esfuerzo
+            bd.comments = get_reviews(
+                book_id, max_pages=3, first_page=doc)  # mejor esfuerzo
         except Exception as e:
             bd.comments = []  # si falla, no rompemos el flujo
     return bd
 
 
-def process_many(book_ids: List[int], max_workers: int = 8, with_reviews=True) -> List[BookData]:
+def process_many(book_ids: Iterable[int], max_workers: int = 8, with_reviews=True,
+                 sink: Optional[Callable[[BookData], None]] = None,
+                 on_error: Optional[Callable[[int, Exception], None]] = None) -> List[BookData]:
     """
     Procesa muchos libros en paralelo usando un pool de hilos (ThreadPoolExecutor).
-    - book_ids: lista de IDs de libros de Goodreads.
+    - book_ids: IDs de libros de Goodreads (puede ser un generador: solo se
+      mantienen en vuelo unos pocos por hilo, no toda la lista).
     - max_workers: cuántos hilos simultáneos (más hilos = más rápido, pero más carga).
     - with_reviews: si también se descargan reseñas por cada libro.
+    - sink: si se pasa, cada libro se entrega en cuanto termina (desde este
+      hilo) y no se acumula en memoria; la lista devuelta queda vacía.
+    - on_error: se llama con (book_id, excepción) cuando un libro falla.
     """
     results = []
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futs = {ex.submit(process_one, bid, with_reviews): bid for bid in book_ids}
+    if SELENIUM:
+        # Resolvemos el binario de ChromeDriver una vez, antes de lanzar los hilos
+        resolve_chromedriver_path()
+    ids = iter(book_ids)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            futs = {}
+
+            def submit_next() -> None:
+                bid = next(ids, None)
+                if bid is not None:
+                    futs[ex.submit(process_one, bid, with_reviews)] = bid
+
+            for _ in range(max_workers * 2):
+                submit_next()
+
+            while futs:
+                done, _ = wait(futs, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    bid = futs.pop(fut)
+                    submit_next()
+                    try:
+                        resultado = fut.result()
+                        if sink is not None:
+                            sink(resultado)
+                        else:
+                            results.append(resultado)
+                    except Exception as e:
+                        print("Error procesando libro",
+                              f"{GOOD_READS_BASE_URL}{bid}")
+                        if on_error is not None:
+                            on_error(bid, e)
+    finally:
+        close_browsers()
+        print_fetch_stats()
+
+    return results
+
+
+# ---------------------------------------------------------------------
+# Motor en dos etapas: hilos de descarga -> procesos de parseo
+# ---------------------------------------------------------------------
+
+
+# Marca que deja cada hilo de descarga en la cola al terminar
+_PIPELINE_DONE = object()
+
+
+class StageStats:
+    """
+    Contadores de una etapa del motor pipeline (se actualizan desde varios hilos).
+    - busy: segundos de trabajo sumados de todos los libros.
+    - blocked: segundos esperando a la etapa siguiente (contrapresión).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ok = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self._start = time.perf_counter()
+        self._end = self._start
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            if ok:
+                self.ok += 1
+            else:
+                self.errors += 1
+            self.busy += seconds
+            self._end = time.perf_counter()
+
+    def add_blocked(self, seconds: float) -> None:
+        with self._lock:
+            self.blocked += seconds
+
+    def report(self) -> str:
+        with self._lock:
+            wall = max(self._end - self._start, 1e-9)
+            done = self.ok + self.errors
+            per_item = (self.busy / done * 1000) if done else 0.0
+            return (f"{self.name}: {self.ok} ok, {self.errors} errores, "
+                    f"{self.ok / wall:.2f} libros/s, {per_item:.0f} ms/libro, "
+                    f"{self.blocked:.1f} s bloqueado")
+
+
+def fetch_raw_book(book_id: int, with_reviews=True,
+                   max_pages: int = 3) -> Tuple[str, Optional[List[Optional[str]]]]:
+    """
+    Etapa de E/S del motor pipeline: solo descarga, no parsea.
+    Devuelve el HTML del libro y el de las páginas de reseñas 2..max_pages
+    (None en una página si su petición falla; None en toda la lista si las
+    reseñas fallan, como en process_one).
+    """
+    html = fetch_book_html(book_id)
+    if not html:
+        raise ValueError(f"Sin HTML para el libro {book_id}")
+    if not with_reviews:
+        return html, []
+    futs = [REVIEWS_EXECUTOR.submit(cached_get, f"{GOOD_READS_BASE_URL}{book_id}?page={page}")
+            for page in range(2, max_pages + 1)]
+    try:
+        return html, [fut.result() for fut in futs]
+    except Exception:
+        return html, None
+
+
+def parse_raw_book(book_id: int, html: str, review_pages: Optional[List[Optional[str]]],
+                   with_reviews=True) -> Tuple[BookData, float]:
+    """
+    Etapa de CPU del motor pipeline (se ejecuta en otro proceso, por eso es
+    una función de módulo). Parsea el libro y sus reseñas igual que
+    process_one y devuelve también los segundos que ha tardado.
+    """
+    t0 = time.perf_counter()
+    doc = as_page(html)
+    bd = parse_basic(doc, book_id)
+    if with_reviews:
+        try:
+            if review_pages is None:
+                bd.comments = []
+            else:
+                pages = [parse_reviews_from_html(doc)]
+                pages.extend(parse_reviews_from_html(h) if h is not None else None
+                             for h in review_pages)
+                bd.comments = merge_review_pages(pages)
+        except Exception:
+            bd.comments = []
+    return bd, time.perf_counter() - t0
+
+
+def process_many_pipeline(book_ids: Iterable[int], fetch_workers: int = 8,
+                          parse_workers: Optional[int] = PIPELINE_PARSE_WORKERS,
+                          queue_size: int = PIPELINE_QUEUE_SIZE, with_reviews=True,
+                          sink: Optional[Callable[[BookData], None]] = None,
+                          on_error: Optional[Callable[[int, Exception], None]] = None) -> List[BookData]:
+    """
+    Alternativa a process_many que separa la descarga del parseo:
+    - fetch_workers hilos descargan el HTML crudo (libro + reseñas) y lo dejan
+      en una cola de tamaño queue_size. Si la cola está llena, esperan
+      (contrapresión): nunca hay más HTML en memoria del que se puede parsear.
+    - Un ProcessPoolExecutor con parse_workers procesos lo convierte en
+      BookData, así el parseo (CPU) no compite por el GIL con las descargas.
+      Como mucho hay parse_workers * 2 libros enviados a los procesos.
+    - sink / on_error: igual que en process_many.
+    Al final imprime los libros/s de cada etapa y cuánto esperó cada una.
+    """
+    results: List[BookData] = []
+    if SELENIUM:
+        resolve_chromedriver_path()
+    workers = parse_workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    raw_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    ids = iter(book_ids)
+    ids_lock = threading.Lock()
+    fetcher_errors: List[BaseException] = []
+    fetch_stats = StageStats("descarga")
+    parse_stats = StageStats("parseo")
+    queue_peak = 0
+
+    def put(item) -> None:
+        t0 = time.perf_counter()
+        while not stop.is_set():
+            try:
+                raw_queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        fetch_stats.add_blocked(time.perf_counter() - t0)
+
+    def fetcher() -> None:
+        try:
+            while not stop.is_set():
+                with ids_lock:
+                    bid = next(ids, None)
+                if bid is None:
+                    break
+                t0 = time.perf_counter()
+                try:
+                    raw = fetch_raw_book(bid, with_reviews)
+                    fetch_stats.record(time.perf_counter() - t0)
+                    put((bid, raw, None))
+                except Exception as e:
+                    fetch_stats.record(time.perf_counter() - t0, ok=False)
+                    put((bid, None, e))
+        except BaseException as e:
+            fetcher_errors.append(e)
+        finally:
+            put(_PIPELINE_DONE)
 
-        for fut in as_completed(futs):
-            bid = futs[fut]
+    def fail(bid: int, e: Exception) -> None:
+        print("Error procesando libro", f"{GOOD_READS_BASE_URL}{bid}", e)
+        if on_error is not None:
+            on_error(bid, e)
+
+    threads = [threading.Thread(target=fetcher, name=f"fetch-{i}", daemon=True)
+               for i in range(fetch_workers)]
+    try:
+        # "spawn": los procesos hijos no heredan los hilos ni los navegadores
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            for t in threads:
+                t.start()
+            futs = {}
+            alive = len(threads)
+
+            while alive or futs:
+                if alive and len(futs) < max_in_flight:
+                    queue_peak = max(queue_peak, raw_queue.qsize())
+                    t0 = time.perf_counter()
+                    try:
+                        item = raw_queue.get(timeout=0.05 if futs else None)
+                    except queue.Empty:
+                        item = None
+                    parse_stats.add_blocked(time.perf_counter() - t0)
+                    if item is _PIPELINE_DONE:
+                        alive -= 1
+                    elif item is not None:
+                        bid, raw, err = item
+                        if err is not None:
+                            fail(bid, err)
+                        else:
+                            futs[pool.submit(parse_raw_book, bid, *raw, with_reviews)] = bid
+                    done = [fut for fut in futs if fut.done()]
+                else:
+                    done, _ = wait(futs, return_when=FIRST_COMPLETED)
+
+                for fut in done:
+                    bid = futs.pop(fut)
+                    try:
+                        resultado, seconds = fut.result()
+                        parse_stats.record(seconds)
+                    except Exception as e:
+                        parse_stats.record(0.0, ok=False)
+                        fail(bid, e)
+                        continue
+                    if sink is not None:
+                        sink(resultado)
+                    else:
+                        results.append(resultado)
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+        close_browsers()
+        print_fetch_stats()
+        print(fetch_stats.report())
+        print(parse_stats.report())
+        print(f"Cola de HTML: máximo {queue_peak}/{queue_size}")
+
+    if fetcher_errors:
+        raise fetcher_errors[0]
+    return results
+
+
+# ---------------------------------------------------------------------
+# Motor asíncrono (async Playwright + httpx)
+# ---------------------------------------------------------------------
+
+
+async def load_book_page_async(page: AsyncPage, url: str) -> str:
+    """Versión async de load_book_page (la página es nueva y se cierra después)."""
+    traffic = PageTraffic()
+    hosts = script_hosts()
+
+    async def route(r) -> None:
+        if should_block(r.request.resource_type, r.request.url, hosts):
+            traffic.blocked += 1
+            await r.abort()
+        else:
+            await r.continue_()
+
+    page.on("response", traffic.on_response)
+    if LIGHT_LOAD:
+        await page.route("**/*", route)
+    traffic.start()
+
+    await page.goto(url, wait_until="domcontentloaded" if LIGHT_LOAD else "networkidle")
+
+    boton = page.locator(
+        "//button[@aria-label='Book details and editions']")
+    await boton.click()
+
+    if LIGHT_LOAD:
+        try:
+            await page.wait_for_selector(".EditionDetails", state="attached",
+                                         timeout=PLAYWRIGHT_DETAILS_TIMEOUT_MS)
+        except AsyncPlaywrightTimeoutError:
+            print(f"Sin .EditionDetails tras {PLAYWRIGHT_DETAILS_TIMEOUT_MS} ms: {url}")
+    else:
+        await page.wait_for_timeout(500)
+
+    html = await page.content()
+    traffic.stop()
+    record_page_load(url, traffic)
+    return html
+
+
+async def fetch_reviews_page_async(client: httpx.AsyncClient, book_id: int,
+                                   page: int) -> Optional[List[Dict]]:
+    """Versión async de fetch_reviews_page."""
+    html = await cached_get_async(client, f"{GOOD_READS_BASE_URL}{book_id}?page={page}")
+    if html is None:
+        return None
+    return await asyncio.to_thread(parse_reviews_from_html, html)
+
+
+async def get_reviews_async(client: httpx.AsyncClient, book_id: int,
+                            max_pages: int = 3,
+                            first_page: Optional[ParsedPage] = None) -> List[Dict]:
+    """
+    Versión async de get_reviews (mismo limitador y heurística de parada).
+    El parseo se hace en un hilo para no bloquear el event loop.
+    """
+    first = 2 if first_page is not None else 1
+    coros = [fetch_reviews_page_async(client, book_id, page)
+             for page in range(first, max_pages + 1)]
+    if first_page is not None:
+        coros.insert(0, asyncio.to_thread(parse_reviews_from_html, first_page))
+    return merge_review_pages(list(await asyncio.gather(*coros)))
+
+
+async def process_one_async(book_id: int, context: Optional[AsyncBrowserContext],
+                            client: httpx.AsyncClient, with_reviews=True) -> BookData:
+    """
+    Descarga y parsea un único libro: primero por HTTP y, si el HTML no trae
+    los datos, con una página nueva del contexto compartido.
+    """
+    url = f"{GOOD_READS_BASE_URL}{book_id}"
+    html = None
+    try:
+        html = await cached_get_async(client, url)
+    except httpx.HTTPError as e:
+        print(f"ERROR AL CARGAR LIBRO {book_id} CON HTTPX:", e)
+
+    if has_book_data(html):
+        count_fetch("requests")
+    elif (rendered := cached_rendered(url)):
+        html = rendered
+        count_fetch("cache")
+    elif CACHE_ONLY or context is None:
+        count_fetch("failed")
+        html = None
+    else:
+        print(f"PlayWright (async) Scrapeando: {url}")
+        await GOODREADS_LIMITER.acquire_async()
+        page = await context.new_page()
+        try:
+            html = await load_book_page_async(page, url)
+        except Exception:
+            count_fetch("failed")
+            raise
+        finally:
+            await page.close()
+        count_fetch("playwright")
+        store_rendered(url, html)
+
+    doc = as_page(html)
+    bd = await asyncio.to_thread(parse_basic, doc, book_id)
+    if with_reviews:
+        try:
+            bd.comments = await get_reviews_async(
+                client, book_id, max_pages=3, first_page=doc)
+        except Exception:
+            bd.comments = []
+    return bd
+
+
+async def process_many_async(book_ids: Iterable[int], max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+                             with_reviews=True,
+                             sink: Optional[Callable[[BookData], None]] = None,
+                             on_error: Optional[Callable[[int, Exception], None]] = None) -> List[BookData]:
+    """
+    Alternativa a process_many sin hilos: un único Chromium con muchas páginas
+    a la vez y un cliente HTTP async para las reseñas.
+    - max_concurrency: libros en vuelo como máximo (semáforo). Solo se crea
+      una tarea por libro cuando hay hueco, así que la memoria no crece con
+      el número de IDs.
+    - sink / on_error: igual que en process_many.
+    """
+    results: List[BookData] = []
+    sem = asyncio.Semaphore(max_concurrency)
+    limits = httpx.Limits(max_connections=max_concurrency)
+
+    async with async_playwright() as p, httpx.AsyncClient(
+            headers=dict(SESSION.headers), timeout=30, limits=limits) as client:
+        # En modo offline no hace falta navegador: todo sale de la caché
+        browser = None
+        context = None
+        if not CACHE_ONLY:
+            browser = await p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            context = await browser.new_context(user_agent=USER_AGENT)
+
+        async def run_one(bid: int) -> None:
             try:
-                resultado = fut.result()
-                results.append(resultado)
+                bd = await process_one_async(bid, context, client, with_reviews)
+                if sink is not None:
+                    sink(bd)
+                else:
+                    results.append(bd)
             except Exception as e:
                 print("Error procesando libro",
-                      f"{GOOD_READS_BASE_URL}{bid}")
+                      f"{GOOD_READS_BASE_URL}{bid}", e)
+                if on_error is not None:
+                    on_error(bid, e)
+            finally:
+                sem.release()
+
+        tasks = set()
+        for bid in book_ids:
+            await sem.acquire()
+            task = asyncio.create_task(run_one(bid))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
 
+        if browser is not None:
+            await browser.close()
+
+    print_fetch_stats()
     return results
 
 
+def parse_id_spec(spec: str) -> Iterator[int]:
+    """'50:80' -> 50..79 (como range); '51' -> 51."""
+    if ":" in spec:
+        start, end = spec.split(":", 1)
+        return iter(range(int(start), int(end)))
+    return iter([int(spec)])
+
+
+def iter_book_ids(specs: Optional[List[str]] = None,
+                  ids_file: Optional[Path] = None) -> Iterator[int]:
+    """
+    IDs a procesar, de forma perezosa (sirve para millones de IDs):
+    - ids_file: un ID por línea (se ignoran líneas vacías y las que empiezan por #).
+    - specs: IDs sueltos o rangos 'inicio:fin'.
+    - si no se pasa nada, BOOKS_IDS de setting.py.
+    """
+    if ids_file is not None:
+        with open(ids_file, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield int(line)
+    elif specs:
+        for spec in specs:
+            yield from parse_id_spec(spec)
+    else:
+        yield from BOOKS_IDS
+
+
+def crawl(book_ids: Iterable[int], manifest: CrawlManifest,
+          run_batch: Callable[[Iterable[int]], None]) -> None:
+    """
+    Crawl reanudable:
+    1) Procesa los IDs que el manifiesto no tiene como hechos.
+    2) Reintenta los fallidos esperando su backoff (exponencial) hasta
+       agotar los intentos.
+    - run_batch(ids): procesa un iterable de IDs (process_many o el motor async)
+      avisando al manifiesto de cada éxito/fallo.
+    """
+    run_batch(manifest.pending(book_ids))
+    while manifest.retryable():
+        wait_s = manifest.next_retry_in()
+        if wait_s > 0:
+            print(f"Reintentando {len(manifest.retryable())} libros en {wait_s:.0f} s")
+            time.sleep(wait_s)
+        run_batch(manifest.pending(manifest.retryable()))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Scraping de libros de Goodreads -> landing/")
+    parser.add_argument(
+        "--engine", choices=["threads", "async", "pipeline"], default="threads",
+        help="threads: ThreadPoolExecutor + Selenium/Playwright; async: async Playwright + httpx; "
+             "pipeline: hilos de descarga + procesos de parseo")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Hilos para el motor threads (hilos de descarga con pipeline)")
+    parser.add_argument("--parse-workers", type=int, default=PIPELINE_PARSE_WORKERS,
+                        help="Procesos de parseo para el motor pipeline (por defecto, núcleos de la CPU)")
+    parser.add_argument("--queue-size", type=int, default=PIPELINE_QUEUE_SIZE,
+                        help="HTML descargado pendiente de parsear como máximo (motor pipeline)")
+    parser.add_argument("--concurrency", type=int, default=ASYNC_MAX_CONCURRENCY,
+                        help="Libros en vuelo para el motor async")
+    parser.add_argument("--no-reviews", action="store_true",
+                        help="No descargar reseñas")
+    parser.add_argument("--offline", action="store_true",
+                        help="Solo caché en disco: no hace ninguna petición de red")
+    parser.add_argument("--full-page-load", action="store_true",
+                        help="Playwright carga imágenes, fuentes y scripts de terceros (networkidle + 500 ms)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="No leer ni escribir la caché en disco del HTML")
+    parser.add_argument("--batch-size", type=int, default=50,
+                        help="Libros por lote antes de hacer fsync del JSONL de landing")
+    parser.add_argument("--ids", nargs="+", metavar="ID|INICIO:FIN",
+                        help="IDs o rangos (fin excluido), p. ej. --ids 50:80 101")
+    parser.add_argument("--ids-file", type=Path,
+                        help="Fichero con un ID de Goodreads por línea")
+    parser.add_argument("--manifest", type=Path, default=CRAWL_MANIFEST_URL,
+                        help="Manifiesto del crawl (IDs hechos / fallidos / intentos)")
+    parser.add_argument("--max-retries", type=int, default=CRAWL_MAX_RETRIES,
+                        help="Intentos máximos por libro")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Empieza de cero: borra el manifiesto y vacía el JSONL de landing")
+    parser.add_argument("--no-parquet", action="store_true", default=not LANDING_PARQUET,
+                        help="No compactar el JSONL en landing/goodreads_books.parquet al terminar")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    sample_ids = BOOKS_IDS
-    books = process_many(sample_ids, max_workers=4, with_reviews=True)
-    df = pd.DataFrame(books)
+    args = parse_args()
+    configure_cache(enabled=not args.no_cache, offline=args.offline)
+    LIGHT_LOAD = not args.full_page_load
+    book_ids = iter_book_ids(args.ids, args.ids_file)
+    if args.fresh and args.manifest.exists():
+        args.manifest.unlink()
 
+    # Cada libro se añade al JSONL en cuanto termina: si el proceso muere
+    # solo se pierde el último lote sin fsync. El manifiesto solo marca un
+    # libro como hecho cuando su línea del JSONL ya es durable.
     os.makedirs(LANDING_DIR, exist_ok=True)
-    df.to_json(GOOD_READS_JSON_URL, orient="records",
-               force_ascii=False, indent=2)
+    landed: List[int] = []
+
+    def commit_landed() -> None:
+        for bid in landed:
+            manifest.mark_done(bid)
+        landed.clear()
+
+    with CrawlManifest(args.manifest, max_retries=args.max_retries,
+                       backoff=CRAWL_BACKOFF_SECONDS) as manifest, \
+            JsonlWriter(GOOD_READS_JSONL_URL, batch_size=args.batch_size,
+                        append=not args.fresh, on_flush=commit_landed) as writer:
+        def sink(bd: BookData) -> None:
+            writer.write(book_to_record(bd))
+            landed.append(bd.id)
+
+        def on_error(bid: int, e: Exception) -> None:
+            manifest.mark_failed(bid, e)
+
+        def run_batch(ids: Iterable[int]) -> None:
+            if args.engine == "async":
+                asyncio.run(process_many_async(
+                    ids, max_concurrency=args.concurrency,
+                    with_reviews=not args.no_reviews, sink=sink, on_error=on_error))
+            elif args.engine == "pipeline":
+                process_many_pipeline(
+                    ids, fetch_workers=args.workers, parse_workers=args.parse_workers,
+                    queue_size=args.queue_size, with_reviews=not args.no_reviews,
+                    sink=sink, on_error=on_error)
+            else:
+                process_many(ids, max_workers=args.workers,
+                             with_reviews=not args.no_reviews, sink=sink, on_error=on_error)
+            writer.flush()
+
+        crawl(book_ids, manifest, run_batch)
+        print(f"{writer.written} libros escritos en {GOOD_READS_JSONL_URL}")
+        print("Manifiesto:", manifest.summary())
+
+    # El JSONL es el diario del crawl (reanudable); el Parquet compactado es
+    # lo que leen bronze y el enriquecimiento
+    if not args.no_parquet and GOOD_READS_JSONL_URL.exists():
+        rows = jsonl_to_parquet(GOOD_READS_JSONL_URL, GOOD_READS_PARQUET_URL)
+        print(f"{rows} libros compactados en {GOOD_READS_PARQUET_URL}")
@@ -5,7 +5,7 @@ import os
 load_dotenv()  # carga variables desde .env automáticamente
 
 
-BOOKS_IDS = [id_book for id_book in range(50, 80)]
+BOOKS_IDS = [id_book for id_book in range(50, 80)]  # Por defecto si no se pasa --ids / --ids-file
 BASE_DIR = Path(__file__).resolve().parents[1]
 GOOD_READS_BASE_URL = os.getenv("GOOD_READS_BASE_URL")
 USER_AGENT = os.getenv("USER_AGENT")
@@ -16,7 +16,48 @@ DOCS_DIR = BASE_DIR/"docs"
 DIM_BOOK_URL = STANDARD_DIR/"dim_book.parquet"
 BOOKS_DETAIL_URL = STANDARD_DIR/"book_source_detail.parquet"
 GOOD_READS_JSON_URL = LANDING_DIR/"goodreads_books.json"
+GOOD_READS_JSONL_URL = LANDING_DIR/"goodreads_books.jsonl"
+CRAWL_MANIFEST_URL = LANDING_DIR/"goodreads_crawl_manifest.jsonl"
+GOOD_READS_PARQUET_URL = LANDING_DIR/"goodreads_books.parquet"
 GOOGLE_CSV_URL = LANDING_DIR/"googlebooks_books.csv"
+GOOGLE_PARQUET_URL = LANDING_DIR/"googlebooks_books.parquet"
+HTML_FIXTURES_DIR = BASE_DIR/"fixtures"/"goodreads"
+CACHE_DIR = BASE_DIR/".cache"
+HTML_CACHE_DIR = CACHE_DIR/"html"
+GOOGLE_CACHE_URL = CACHE_DIR/"googlebooks.sqlite"
 SCHEMA_URL = DOCS_DIR/"schema.md"
 QUALITY_JSON_URL = DOCS_DIR/"quality_metrics.json"
+LANDING_PARQUET = True  # Scraper y enriquecimiento dejan el landing en Parquet tipado (False = solo JSONL / CSV)
+GOLD_STREAM_BATCH_SIZE = 10000  # Filas por lote con integrate_pipeline.py --stream
 SELENIUM = False  # Cambia False si quieres playwright
+PLAYWRIGHT_POOL_SIZE = 4  # Navegadores Chromium vivos a la vez en modo Playwright
+PLAYWRIGHT_RECYCLE_PAGES = 50  # Se relanza cada navegador tras N páginas
+PLAYWRIGHT_LIGHT_LOAD = True  # Aborta imágenes/fuentes/vídeo/scripts de terceros y espera a .EditionDetails
+PLAYWRIGHT_SCRIPT_HOSTS = ("goodreads.com", "gr-assets.com")  # Scripts que sí se cargan en modo ligero
+PLAYWRIGHT_DETAILS_TIMEOUT_MS = 10000  # Espera máxima a .EditionDetails tras pulsar el botón
+SELENIUM_RECYCLE_PAGES = 50  # Se reinicia el ChromeDriver de cada hilo tras N páginas
+ASYNC_MAX_CONCURRENCY = 100  # Libros en vuelo a la vez con --engine async
+PIPELINE_QUEUE_SIZE = 32  # HTML descargado esperando a ser parseado con --engine pipeline
+PIPELINE_PARSE_WORKERS = None  # Procesos de parseo con --engine pipeline (None = núcleos de la CPU)
+GOODREADS_RATE_LIMIT = 2.0  # Peticiones por segundo a Goodreads (todas las hebras juntas)
+GOODREADS_RATE_BURST = 4  # Peticiones que pueden salir seguidas antes de aplicar el límite
+REVIEW_FETCH_WORKERS = 8  # Hilos para descargar páginas de reseñas en paralelo
+HTML_CACHE_TTL_HOURS = 24 * 7  # Pasado este tiempo el HTML en caché se revalida (ETag/Last-Modified)
+CRAWL_MAX_RETRIES = 3  # Intentos por libro antes de darlo por perdido
+CRAWL_BACKOFF_SECONDS = 30  # Espera tras el primer fallo (se dobla en cada reintento)
+GOOGLE_BOOKS_QPS = 5.0  # Peticiones por segundo a Google Books (todas las hebras juntas)
+GOOGLE_BOOKS_BURST = 5  # Peticiones que pueden salir seguidas antes de aplicar el límite
+GOOGLE_BOOKS_WORKERS = 8  # Hilos que consultan Google Books a la vez
+GOOGLE_BOOKS_MAX_RETRIES = 5  # Reintentos ante 429/5xx o errores de conexión
+GOOGLE_BOOKS_BACKOFF = 0.5  # Backoff base en segundos (0.5, 1, 2, 4...)
+GOOGLE_BOOKS_TITLE_CANDIDATES = 5  # Candidatos que se piden en las búsquedas por título + autor
+GOOGLE_BOOKS_MIN_MATCH_SCORE = 0.6  # Puntuación mínima (0..1) para aceptar un candidato
+GOOGLE_BOOKS_PARTIAL_RESPONSE = True  # Pide solo GOOGLE_BOOKS_FIELDS (parámetro fields de la API)
+GOOGLE_BOOKS_FIELDS = (  # Campos que usa fetch_book_from_google
+    "totalItems,items(id,"
+    "volumeInfo(title,subtitle,authors,description,publisher,publishedDate,pageCount,categories,"
+    "language,imageLinks(thumbnail,smallThumbnail),averageRating,ratingsCount,industryIdentifiers),"
+    "saleInfo(listPrice))"
+)
+GOOGLE_CACHE_TTL_DAYS = 30  # Días que vale una respuesta de Google Books con resultados
+GOOGLE_CACHE_NEGATIVE_TTL_DAYS = 3  # Días que vale una respuesta sin resultados
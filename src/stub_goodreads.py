@@ -0,0 +1,247 @@
+"""
+Servidor local que reproduce páginas de libro de Goodreads ya capturadas, para
+medir el scraper sin tocar goodreads.com:
+
+- GET /book/show/<id> sirve la página del libro y /book/show/<id>?page=N la
+  de reseñas. Se buscan, por este orden, en la caché HTML del scraper
+  (HTML_CACHE_DIR, con las URLs de --origin) y en las fixtures
+  (<id>.html y <id>_page<N>.html en HTML_FIXTURES_DIR). Si no hay página de
+  reseñas se sirve la del libro (mismo layout).
+- Con --cycle, un ID que no está capturado recibe la fixture que le toca
+  (id % nº de fixtures); así se pueden pedir miles de IDs con pocas páginas.
+- El botón "Book details and editions" se comporta como en la web: el bloque
+  .EditionDetails se oculta al cargar y aparece --click-delay-ms después del
+  clic. Los <script src> externos se quitan para que la página no dependa de
+  la red (el JSON de __NEXT_DATA__ es inline y se conserva).
+
+    python src/stub_goodreads.py --port 8090 --cycle
+    GOOD_READS_BASE_URL=http://127.0.0.1:8090/book/show/ python src/scrape_goodreads.py --ids 1:200 --no-cache
+"""
+import argparse
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from setting import HTML_CACHE_DIR, HTML_FIXTURES_DIR
+from utils.utils_cache import HtmlCache
+
+BOOK_PATH_RE = re.compile(r"^/book/show/(\d+)")
+FIXTURE_RE = re.compile(r"^(\d+)(?:_page(\d+))?\.html$")
+EXTERNAL_SCRIPT_RE = re.compile(
+    r"<script\b[^>]*\bsrc\s*=[^>]*>\s*</script>", re.IGNORECASE)
+DEFAULT_ORIGIN = "https://www.goodreads.com/book/show/"
+
+# Oculta .EditionDetails al cargar y lo devuelve tras pulsar el botón de
+# detalles (que se crea si la página capturada no lo trae)
+DETAILS_BUTTON_JS = """<script>
+(function () {
+  var hidden = [];
+  document.querySelectorAll(".EditionDetails").forEach(function (el) {
+    var slot = document.createComment("EditionDetails");
+    el.replaceWith(slot);
+    hidden.push([slot, el]);
+  });
+  var btn = document.querySelector("button[aria-label='Book details and editions']");
+  if (!btn) {
+    btn = document.createElement("button");
+    btn.setAttribute("aria-label", "Book details and editions");
+    btn.textContent = "Book details & editions";
+    document.body.prepend(btn);
+  }
+  btn.addEventListener("click", function () {
+    setTimeout(function () {
+      hidden.forEach(function (p) { p[0].replaceWith(p[1]); });
+      hidden = [];
+    }, %(delay)d);
+  });
+})();
+</script>"""
+
+
+def prepare_page(html: str, click_delay_ms: int) -> str:
+    """HTML capturado -> HTML servido: sin scripts externos y con el botón de detalles."""
+    html = EXTERNAL_SCRIPT_RE.sub("", html)
+    script = DETAILS_BUTTON_JS % {"delay": click_delay_ms}
+    idx = html.lower().rfind("</body>")
+    if idx == -1:
+        return html + script
+    return html[:idx] + script + html[idx:]
+
+
+class GoodreadsReplay:
+    """
+    Servidor HTTP (un hilo por petición) con las páginas capturadas.
+    - fixtures_dir / cache_dir / origin: de dónde salen las páginas.
+    - cycle: servir una fixture a los IDs no capturados.
+    - latency_ms: retardo de cada respuesta.
+    - click_delay_ms: cuánto tarda en aparecer .EditionDetails tras el clic.
+    - stats: peticiones, códigos y de dónde salió cada página.
+    """
+
+    def __init__(self, fixtures_dir: Path = HTML_FIXTURES_DIR,
+                 cache_dir: Optional[Path] = HTML_CACHE_DIR,
+                 origin: str = DEFAULT_ORIGIN, host: str = "127.0.0.1",
+                 port: int = 0, cycle: bool = False,
+                 latency_ms: float = 0.0, click_delay_ms: int = 100):
+        self.origin = origin
+        self.cycle = cycle
+        self.latency_ms = latency_ms
+        self.click_delay_ms = click_delay_ms
+        self.cache = HtmlCache(cache_dir, ttl=0) if cache_dir else None
+        self.fixtures: Dict[Tuple[int, int], Path] = {}
+        if fixtures_dir and Path(fixtures_dir).is_dir():
+            for path in Path(fixtures_dir).glob("*.html"):
+                m = FIXTURE_RE.match(path.name)
+                if m:
+                    self.fixtures[(int(m.group(1)), int(m.group(2) or 1))] = path
+        self.book_fixtures: List[int] = sorted(
+            bid for bid, page in self.fixtures if page == 1)
+        self.stats: Counter = Counter()
+        self._pages: Dict[Tuple[int, int], Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _ReplayHandler)
+        self._server.daemon_threads = True
+        self._server.replay = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Valor para GOOD_READS_BASE_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/book/show/"
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _captured(self, book_id: int, page: int) -> Optional[str]:
+        if self.cache is not None:
+            url = f"{self.origin}{book_id}" + (f"?page={page}" if page > 1 else "")
+            for key in (url + "#rendered", url):
+                entry = self.cache.get(key)
+                if entry is not None and entry.html:
+                    self.count("cache")
+                    return entry.html
+        path = self.fixtures.get((book_id, page))
+        if path is not None:
+            self.count("fixture")
+            return path.read_text(encoding="utf-8")
+        return None
+
+    def page(self, book_id: int, page: int = 1) -> Optional[str]:
+        """HTML servido para un libro / página de reseñas (None si no hay)."""
+        html = self._prepared(book_id, page)
+        if html is None and self.cycle and self.book_fixtures:
+            html = self._prepared(
+                self.book_fixtures[book_id % len(self.book_fixtures)], page)
+        return html
+
+    def _prepared(self, book_id: int, page: int) -> Optional[str]:
+        # Memoizado por página capturada (no por ID pedido): con --cycle miles
+        # de IDs comparten unas pocas páginas en memoria
+        key = (book_id, page)
+        with self._lock:
+            if key in self._pages:
+                return self._pages[key]
+        html = self._captured(book_id, page)
+        if html is None and page > 1:
+            html = self._captured(book_id, 1)
+        if html is not None:
+            html = prepare_page(html, self.click_delay_ms)
+        with self._lock:
+            self._pages[key] = html
+        return html
+
+    def start(self) -> "GoodreadsReplay":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="goodreads-replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "GoodreadsReplay":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # cabeceras y cuerpo salen sin esperar al ACK
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        replay: GoodreadsReplay = self.server.replay
+        replay.count("requests")
+        parsed = urlparse(self.path)
+        m = BOOK_PATH_RE.match(parsed.path)
+        html = None
+        if m:
+            try:
+                page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+            except ValueError:
+                page = 1
+            html = replay.page(int(m.group(1)), page)
+        if replay.latency_ms:
+            time.sleep(replay.latency_ms / 1000)
+
+        code = 200 if html is not None else 404
+        replay.count(str(code))
+        payload = (html or "<html><body>Not Found</body></html>").encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--fixtures", type=Path, default=HTML_FIXTURES_DIR)
+    parser.add_argument("--cache-dir", type=Path, default=HTML_CACHE_DIR,
+                        help="Caché HTML del scraper de la que sacar páginas")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Servir solo fixtures")
+    parser.add_argument("--origin", default=DEFAULT_ORIGIN,
+                        help="GOOD_READS_BASE_URL con el que se llenó la caché")
+    parser.add_argument("--cycle", action="store_true",
+                        help="Servir una fixture a los IDs que no están capturados")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--click-delay-ms", type=int, default=100)
+    args = parser.parse_args()
+
+    replay = GoodreadsReplay(args.fixtures, None if args.no_cache else args.cache_dir,
+                             origin=args.origin, host=args.host, port=args.port,
+                             cycle=args.cycle, latency_ms=args.latency_ms,
+                             click_delay_ms=args.click_delay_ms)
+    print(f"{len(replay.book_fixtures)} fixtures de libro. "
+          f"GOOD_READS_BASE_URL={replay.base_url} (Ctrl+C para parar)", flush=True)
+    replay.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        replay.stop()
+        print("Replay:", dict(replay.stats))
+
+
+if __name__ == "__main__":
+    main()
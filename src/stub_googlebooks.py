@@ -0,0 +1,376 @@
+"""
+Servidor local que imita el endpoint /books/v1/volumes de Google Books para
+medir y probar el enriquecimiento sin tocar la API real (ni su cuota).
+
+- Responde con las respuestas grabadas en la caché SQLite del
+  enriquecimiento (GOOGLE_CACHE_URL, o --recorded), usando la query q exacta.
+- Con --synthesize inventa un volumen plausible para las consultas que no
+  están grabadas (sirve para pruebas de carga con cientos de miles de ISBN);
+  sin él, esas consultas devuelven una respuesta sin resultados.
+- Simula la red y la API: latencia (--latency-ms ± --jitter-ms), errores 5xx
+  (--error-rate) y límite de peticiones por segundo con 429 + Retry-After (--qps).
+
+    python src/stub_googlebooks.py --port 8089 --latency-ms 120 --qps 10 --synthesize
+    GOOGLE_BOOKS_API_URL=http://127.0.0.1:8089/books/v1/volumes python src/enrich_googlebooks.py --no-cache
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from setting import GOOGLE_CACHE_URL
+from utils.utils_cache import ResponseCache
+from utils.utils_http import RateLimiter
+
+EMPTY_RESPONSE = {"kind": "books#volumes", "totalItems": 0}
+VOLUMES_PATH = "/books/v1/volumes"
+
+
+def load_recorded(path: Path) -> Dict[str, Dict]:
+    """Respuestas grabadas {q: respuesta} de la caché SQLite (vacío si no existe)."""
+    if not Path(path).exists():
+        return {}
+    cache = ResponseCache(path, ttl=0, negative_ttl=0)
+    try:
+        return dict(cache.items())
+    finally:
+        cache.close()
+
+
+def _synthetic_item(query: str, title: str, author: str, isbn: str,
+                    published: str) -> Dict:
+    volume_id = f"stub{zlib.crc32((query + title + published).encode()):010d}"
+    link = f"http://books.google.com/books?id={volume_id}"
+    return {
+        "kind": "books#volume",
+        "id": volume_id,
+        "etag": f"{zlib.crc32(volume_id.encode()):08x}",
+        "selfLink": f"https://www.googleapis.com/books/v1/volumes/{volume_id}",
+        "volumeInfo": {
+            "title": title,
+            "authors": [author],
+            "publisher": "Editorial Sintética",
+            "publishedDate": published,
+            "description": ("Volumen generado por stub_googlebooks. " * 12).strip(),
+            "industryIdentifiers": [{"type": "ISBN_13", "identifier": isbn},
+                                    {"type": "ISBN_10", "identifier": isbn[-10:]}],
+            "readingModes": {"text": False, "image": True},
+            "pageCount": 200,
+            "printType": "BOOK",
+            "categories": ["Fiction"],
+            "maturityRating": "NOT_MATURE",
+            "allowAnonLogging": False,
+            "contentVersion": "0.1.1.0.preview.1",
+            "panelizationSummary": {"containsEpubBubbles": False,
+                                    "containsImageBubbles": False},
+            "imageLinks": {"smallThumbnail": f"{link}&printsec=frontcover&img=1&zoom=5&source=gbs_api",
+                           "thumbnail": f"{link}&printsec=frontcover&img=1&zoom=1&source=gbs_api"},
+            "language": "en",
+            "previewLink": f"{link}&printsec=frontcover&dq={query}&hl=&cd=1&source=gbs_api",
+            "infoLink": f"{link}&dq={query}&hl=&source=gbs_api",
+            "canonicalVolumeLink": f"https://books.google.com/books/about/?id={volume_id}",
+        },
+        "saleInfo": {"country": "US", "saleability": "NOT_FOR_SALE", "isEbook": False},
+        "accessInfo": {
+            "country": "US", "viewability": "PARTIAL", "embeddable": True,
+            "publicDomain": False, "textToSpeechPermission": "ALLOWED",
+            "epub": {"isAvailable": False},
+            "pdf": {"isAvailable": True,
+                    "acsTokenLink": f"http://books.google.com/books/download/{volume_id}-sample-pdf.acsm"},
+            "webReaderLink": f"http://play.google.com/books/reader?id={volume_id}&hl=&source=gbs_api",
+            "accessViewStatus": "SAMPLE", "quoteSharingAllowed": False,
+        },
+        "searchInfo": {"textSnippet": ("Fragmento de búsqueda del volumen. " * 4).strip()},
+    }
+
+
+def synthesize_volume(query: str, max_results: Optional[int] = None) -> Dict:
+    """
+    Respuesta inventada pero con la forma (y un tamaño parecido) de la real
+    para una consulta isbn: o intitle:, incluidos los bloques que el
+    enriquecimiento no usa (accessInfo, searchInfo, enlaces...).
+    En las búsquedas por título con maxResults > 1 devuelve, como la API,
+    candidatos parecidos delante del bueno (una guía de lectura de otro
+    autor primero, una edición antigua después).
+    """
+    m = re.match(r"isbn:(\d+)", query)
+    if m:
+        isbn = m.group(1)
+        items = [_synthetic_item(query, f"Libro {isbn}", "Autor Sintético", isbn, "2001-01-01")]
+    else:
+        m = re.match(r"intitle:(.*?)(?:\+inauthor:(.*))?$", query)
+        title = m.group(1) if m else query
+        author = (m.group(2) if m else None) or "Autor Sintético"
+        isbn = f"979{zlib.crc32(query.encode()) % 10 ** 10:010d}"
+        good = _synthetic_item(query, title, author, isbn, "2001-01-01")
+        if (max_results or 1) > 1:
+            items = [
+                _synthetic_item(query, f"Study Guide for {title}", "Otro Autor",
+                                f"978{zlib.crc32(b'guide' + query.encode()) % 10 ** 10:010d}",
+                                "2015-06-01"),
+                good,
+                _synthetic_item(query, title, author,
+                                f"978{zlib.crc32(b'old' + query.encode()) % 10 ** 10:010d}",
+                                "1987-01-01"),
+            ][:max_results]
+        else:
+            items = [good]
+    return {"kind": "books#volumes", "totalItems": len(items), "items": items}
+
+
+FieldTree = Dict[str, Optional["FieldTree"]]
+
+
+def parse_fields(expr: str) -> FieldTree:
+    """
+    Parsea la sintaxis del parámetro fields de las APIs de Google:
+    'totalItems,items(id,volumeInfo(title,authors)),saleInfo/listPrice'
+    -> {'totalItems': None, 'items': {'id': None, 'volumeInfo': {...}}, ...}
+    (None = el campo entero).
+    """
+    pos = 0
+
+    def merge(tree: FieldTree, name: str, sub: Optional[FieldTree]) -> None:
+        if name not in tree:
+            tree[name] = sub
+        elif tree[name] is None or sub is None:
+            tree[name] = None  # si se pide el campo entero, gana
+        else:
+            for k, v in sub.items():
+                merge(tree[name], k, v)
+
+    def parse_name() -> str:
+        nonlocal pos
+        start = pos
+        while pos < len(expr) and expr[pos] not in ",()/":
+            pos += 1
+        return expr[start:pos].strip()
+
+    def parse_item() -> Tuple[str, Optional[FieldTree]]:
+        nonlocal pos
+        name = parse_name()
+        if pos < len(expr) and expr[pos] == "/":
+            pos += 1
+            child, sub = parse_item()
+            return name, {child: sub}
+        if pos < len(expr) and expr[pos] == "(":
+            pos += 1
+            sub = parse_list()
+            if pos >= len(expr) or expr[pos] != ")":
+                raise ValueError(f"fields mal formado: {expr!r}")
+            pos += 1
+            return name, sub
+        return name, None
+
+    def parse_list() -> FieldTree:
+        nonlocal pos
+        tree: FieldTree = {}
+        while True:
+            name, sub = parse_item()
+            if name:
+                merge(tree, name, sub)
+            if pos < len(expr) and expr[pos] == ",":
+                pos += 1
+                continue
+            return tree
+
+    tree = parse_list()
+    if pos != len(expr):
+        raise ValueError(f"fields mal formado: {expr!r}")
+    return tree
+
+
+def project_fields(obj, tree: Optional[FieldTree]):
+    """Deja en obj solo los campos de tree (las listas se proyectan elemento a elemento)."""
+    if tree is None:
+        return obj
+    if isinstance(obj, list):
+        return [project_fields(x, tree) for x in obj]
+    if isinstance(obj, dict):
+        return {k: project_fields(obj[k], sub) for k, sub in tree.items() if k in obj}
+    return obj
+
+
+class GoogleBooksStub:
+    """
+    Servidor HTTP (un hilo por petición) que sirve /books/v1/volumes?q=...
+    - responses: respuestas grabadas {q: respuesta}.
+    - latency_ms / jitter_ms: retardo de cada respuesta (uniforme ± jitter).
+    - error_rate: fracción de peticiones que devuelven 500/503.
+    - qps / burst: por encima de ese ritmo responde 429 con Retry-After.
+    - Respeta el parámetro fields (respuesta parcial) como la API real.
+    - stats: peticiones, códigos devueltos y de dónde salió cada respuesta.
+    Se usa con `with GoogleBooksStub(...) as stub:` o start() / stop().
+    """
+
+    def __init__(self, responses: Optional[Dict[str, Dict]] = None,
+                 host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, qps: Optional[float] = None,
+                 burst: int = 1, retry_after: int = 1,
+                 synthesize: bool = False, seed: Optional[int] = None):
+        self.responses = responses or {}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.limiter = RateLimiter(qps, burst=burst) if qps else None
+        self.retry_after = retry_after
+        self.synthesize = synthesize
+        self.stats: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{VOLUMES_PATH}"
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += n
+
+    def _roll(self) -> Tuple[float, float]:
+        with self._lock:
+            return self._random.random(), self._random.uniform(-1, 1)
+
+    def respond(self, query: str, fields: Optional[str] = None,
+                max_results: Optional[int] = None) -> Tuple[int, Dict, Dict[str, str]]:
+        """(código, cuerpo JSON, cabeceras extra) para una consulta."""
+        if fields:
+            code, body, headers = self.respond(query, max_results=max_results)
+            if code != 200:
+                return code, body, headers
+            try:
+                return code, project_fields(body, parse_fields(fields)), headers
+            except ValueError as e:
+                return 400, {"error": {"code": 400, "message": str(e)}}, {}
+        self.count("requests")
+        error_roll, jitter = self._roll()
+        delay = max(0.0, self.latency_ms + jitter * self.jitter_ms) / 1000
+        if delay:
+            time.sleep(delay)
+
+        if self.limiter is not None and not self.limiter.try_acquire():
+            return 429, {"error": {"code": 429, "message": "Rate Limit Exceeded"}}, \
+                {"Retry-After": str(self.retry_after)}
+        if error_roll < self.error_rate:
+            code = 503 if error_roll < self.error_rate / 2 else 500
+            return code, {"error": {"code": code, "message": "Backend Error"}}, {}
+
+        if query in self.responses:
+            self.count("recorded")
+            body = self.responses[query]
+            if max_results and body.get("items"):
+                body = {**body, "items": body["items"][:max_results]}
+            return 200, body, {}
+        if self.synthesize:
+            self.count("synthesized")
+            return 200, synthesize_volume(query, max_results), {}
+        self.count("empty")
+        return 200, EMPTY_RESPONSE, {}
+
+    def start(self) -> "GoogleBooksStub":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="googlebooks-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "GoogleBooksStub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como la API real
+    disable_nagle_algorithm = True  # cabeceras y cuerpo salen sin esperar al ACK
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        stub: GoogleBooksStub = self.server.stub
+        parsed = urlparse(self.path)
+        if parsed.path.rstrip("/") != VOLUMES_PATH:
+            self._send(404, {"error": {"code": 404, "message": "Not Found"}}, {})
+            return
+        params = parse_qs(parsed.query)
+        query = params.get("q", [""])[0]
+        fields = params.get("fields", [None])[0]
+        try:
+            max_results = int(params.get("maxResults", ["0"])[0]) or None
+        except ValueError:
+            max_results = None
+        code, body, headers = stub.respond(query, fields, max_results)
+        stub.count(str(code))
+        self._send(code, body, headers)
+
+    def _send(self, code: int, body: Dict, headers: Dict[str, str]) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.stub.count("bytes", len(payload))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--recorded", type=Path, default=GOOGLE_CACHE_URL,
+                        help="Caché SQLite con las respuestas grabadas")
+    parser.add_argument("--synthesize", action="store_true",
+                        help="Inventa un volumen para las consultas no grabadas")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fracción de peticiones que devuelven 500/503")
+    parser.add_argument("--qps", type=float, default=None,
+                        help="Peticiones por segundo antes de responder 429")
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    responses = load_recorded(args.recorded)
+    stub = GoogleBooksStub(responses, host=args.host, port=args.port,
+                           latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate, qps=args.qps, burst=args.burst,
+                           synthesize=args.synthesize, seed=args.seed)
+    print(f"{len(responses)} respuestas grabadas. Sirviendo en {stub.url} (Ctrl+C para parar)")
+    stub.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+        print("Stub:", dict(stub.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from playwright.sync_api import Page, sync_playwright
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+from webdriver_manager.chrome import ChromeDriverManager
+
+
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=1920,1080",
+]
+
+# Tipos de recurso que no hacen falta para leer el HTML de un libro
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+
+def is_first_party(url: str, hosts: Iterable[str]) -> bool:
+    """True si el host de url es uno de hosts o un subdominio suyo."""
+    host = (urlparse(url).hostname or "").lower()
+    return any(host == h or host.endswith("." + h) for h in hosts)
+
+
+def should_block(resource_type: str, url: str, script_hosts: Iterable[str]) -> bool:
+    """
+    Decide si una petición de la página se aborta: imágenes, fuentes y
+    vídeo/audio siempre; scripts solo si no vienen de script_hosts (analítica,
+    anuncios...). El CSS y los scripts propios se dejan pasar porque el botón
+    de detalles los necesita.
+    """
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    return resource_type == "script" and not is_first_party(url, script_hosts)
+
+
+class PageTraffic:
+    """
+    Tráfico de una carga de página con Playwright (para comparar modos):
+    - requests / bytes: respuestas recibidas y sus bytes según Content-Length
+      (las respuestas sin esa cabecera cuentan como 0).
+    - blocked: peticiones abortadas antes de salir.
+    - ms: milisegundos desde start() hasta stop().
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = 0
+        self.ms = 0.0
+        self._t0 = None
+
+    def start(self) -> None:
+        self._t0 = time.perf_counter()
+
+    def stop(self) -> None:
+        if self._t0 is not None:
+            self.ms = (time.perf_counter() - self._t0) * 1000
+
+    def on_response(self, response) -> None:
+        self.requests += 1
+        try:
+            self.bytes += int(response.headers.get("content-length", 0))
+        except ValueError:
+            pass
+
+
+class PlaywrightPool:
+    """
+    Pool de navegadores Chromium de larga duración para Playwright.
+
+    La API síncrona de Playwright obliga a usar cada navegador desde el hilo
+    que lo creó, así que cada navegador vive en su propio hilo y los trabajos
+    (una función que recibe la `page`) se le envían por una cola.
+    - size: cuántos navegadores vivos a la vez.
+    - recycle_after: tras N páginas se cierra y se vuelve a lanzar el navegador
+      (evita que Chromium acumule memoria). Si una página falla se descarta
+      el contexto y, si el navegador se ha caído, también el navegador.
+    """
+
+    def __init__(self, size: int, recycle_after: int, user_agent: Optional[str] = None):
+        self.size = max(1, size)
+        self.recycle_after = max(1, recycle_after)
+        self.user_agent = user_agent
+        self._jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El pool de Playwright ya está cerrado")
+            if self._threads:
+                return
+            for i in range(self.size):
+                t = threading.Thread(
+                    target=self._worker, name=f"playwright-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def run(self, fn: Callable[[Page], Any]) -> Any:
+        """
+        Ejecuta fn(page) en el primer navegador libre y devuelve su resultado
+        (o relanza la excepción que haya lanzado fn).
+        """
+        self._start()
+        fut: Future = Future()
+        self._jobs.put((fn, fut))
+        return fut.result()
+
+    def close(self) -> None:
+        """Cierra todos los navegadores (espera a que terminen sus trabajos)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._jobs.put(None)
+        for t in threads:
+            t.join()
+
+    def _worker(self) -> None:
+        pw = None
+        browser = None
+        context = None
+        page = None
+        served = 0
+
+        def drop_context():
+            nonlocal context, page
+            try:
+                if context is not None:
+                    context.close()
+            except Exception:
+                pass
+            context = None
+            page = None
+
+        def drop_browser():
+            nonlocal browser, served
+            drop_context()
+            try:
+                if browser is not None:
+                    browser.close()
+            except Exception:
+                pass
+            browser = None
+            served = 0
+
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            fn, fut = job
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                if pw is None:
+                    pw = sync_playwright().start()
+                if browser is None or not browser.is_connected():
+                    drop_browser()
+                    browser = pw.chromium.launch(
+                        headless=True, args=CHROMIUM_ARGS)
+                if page is None:
+                    context = browser.new_context(user_agent=self.user_agent)
+                    page = context.new_page()
+                result = fn(page)
+            except Exception as e:
+                fut.set_exception(e)
+                # Página en estado desconocido: empezamos de cero con otro contexto
+                drop_context()
+                if browser is not None and not browser.is_connected():
+                    drop_browser()
+                continue
+
+            fut.set_result(result)
+            served += 1
+            if served >= self.recycle_after:
+                drop_browser()
+
+        drop_browser()
+        if pw is not None:
+            try:
+                pw.stop()
+            except Exception:
+                pass
+
+
+_CHROMEDRIVER_PATH: Optional[str] = None
+_CHROMEDRIVER_LOCK = threading.Lock()
+
+
+def resolve_chromedriver_path() -> str:
+    """
+    Resuelve (y descarga si hace falta) el binario de ChromeDriver una sola vez
+    por proceso. ChromeDriverManager().install() consulta la red y el disco,
+    así que no queremos repetirlo por cada navegador.
+    """
+    global _CHROMEDRIVER_PATH
+    with _CHROMEDRIVER_LOCK:
+        if _CHROMEDRIVER_PATH is None:
+            _CHROMEDRIVER_PATH = ChromeDriverManager().install()
+        return _CHROMEDRIVER_PATH
+
+
+class SeleniumDriverCache:
+    """
+    Un driver de Selenium por hilo, reutilizado entre libros.
+    - factory: función que crea un driver nuevo (p. ej. make_headless_chrome).
+    - recycle_after: tras N páginas se cierra el driver y se crea otro.
+    Antes de cada uso se comprueba que el driver sigue vivo; si no responde
+    o la función lanzada falla, se descarta y se arranca uno nuevo.
+    """
+
+    def __init__(self, factory: Callable[[], WebDriver], recycle_after: int):
+        self.factory = factory
+        self.recycle_after = max(1, recycle_after)
+        self._local = threading.local()
+        self._drivers: List[WebDriver] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_alive(driver: WebDriver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def _discard(self) -> None:
+        driver = getattr(self._local, "driver", None)
+        self._local.driver = None
+        self._local.served = 0
+        if driver is None:
+            return
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _get(self) -> WebDriver:
+        driver = getattr(self._local, "driver", None)
+        if driver is not None and (
+            self._local.served >= self.recycle_after or not self._is_alive(driver)
+        ):
+            self._discard()
+            driver = None
+        if driver is None:
+            driver = self.factory()
+            self._local.driver = driver
+            self._local.served = 0
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def run(self, fn: Callable[[WebDriver], Any]) -> Any:
+        """Ejecuta fn(driver) con el driver del hilo actual."""
+        driver = self._get()
+        try:
+            result = fn(driver)
+        except Exception:
+            self._discard()
+            raise
+        self._local.served += 1
+        return result
+
+    def close(self) -> None:
+        """Cierra los drivers de todos los hilos."""
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
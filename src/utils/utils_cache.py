@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    html: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class HtmlCache:
+    """
+    Caché en disco del HTML descargado, direccionada por el hash de la URL:
+    <root>/<sha[:2]>/<sha>.json.gz con la URL, el HTML y las cabeceras de
+    validación (ETag / Last-Modified) en un único fichero comprimido.
+    - ttl: segundos que una entrada se considera fresca; pasado ese tiempo
+      se revalida con If-None-Match / If-Modified-Since (si hay cabeceras).
+    - stats: contadores de hits (entradas frescas), stale (caducadas),
+      misses, revalidaciones y escrituras.
+    """
+
+    def __init__(self, root: Path, ttl: float):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / key[:2] / f"{key}.json.gz"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Devuelve la entrada (fresca o no) o None si no está en caché."""
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            self._count("misses")
+            return None
+        # Solo es un acierto si se puede servir sin red; la caducada aún
+        # sirve para revalidar (o en modo offline), pero cuenta aparte
+        self._count("hits" if self.is_fresh(entry) else "stale")
+        return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.fetched_at < self.ttl
+
+    def put(self, url: str, html: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> CacheEntry:
+        entry = CacheEntry(url=url, html=html, fetched_at=time.time(),
+                           etag=etag, last_modified=last_modified)
+        self._write(entry)
+        self._count("stored")
+        return entry
+
+    def touch(self, entry: CacheEntry) -> None:
+        """Marca como fresca una entrada revalidada (respuesta 304)."""
+        entry.fetched_at = time.time()
+        self._write(entry)
+        self._count("revalidated")
+
+    def _write(self, entry: CacheEntry) -> None:
+        path = self._path(entry.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escritura atómica: nunca dejamos un fichero a medias si el proceso muere
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(asdict(entry), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+# Separa la consulta de su variante en la clave (no aparece en una q)
+VARIANT_SEP = "\t"
+
+
+class ResponseCache:
+    """
+    Caché SQLite de respuestas JSON de una API, con la clave exacta de la
+    consulta (p. ej. el parámetro q de Google Books). Se guarda la respuesta
+    cruda, así que cambiar cómo se interpreta no obliga a volver a pedirla.
+    - variant: el resto de parámetros que cambian la respuesta (nº de
+      resultados, proyección de campos...). Forma parte de la clave, así que
+      una respuesta pedida con otros parámetros no se sirve.
+    - ttl: segundos que vale una respuesta con resultados.
+    - negative_ttl: segundos que vale una respuesta sin resultados (caché
+      negativa: no se repiten cada día las búsquedas que no encuentran nada).
+    - stats: hits, negative_hits, expired, misses y stored.
+    Una sola conexión compartida por todos los hilos, protegida con un lock.
+    """
+
+    def __init__(self, path: Path, ttl: float, negative_ttl: float):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " query TEXT PRIMARY KEY,"
+            " url TEXT,"
+            " body TEXT NOT NULL,"
+            " empty INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL)")
+        self._conn.commit()
+
+    @staticmethod
+    def _key(query: str, variant: str) -> str:
+        return f"{query}{VARIANT_SEP}{variant}" if variant else query
+
+    def get(self, query: str, variant: str = "") -> Optional[Tuple[Dict, str]]:
+        """Devuelve (respuesta, url) si está en caché y no ha caducado; si no, None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, body, empty, fetched_at FROM responses WHERE query = ?",
+                (self._key(query, variant),)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            url, body, empty, fetched_at = row
+            ttl = self.negative_ttl if empty else self.ttl
+            if time.time() - fetched_at >= ttl:
+                self.stats["expired"] += 1
+                return None
+            self.stats["negative_hits" if empty else "hits"] += 1
+        return json.loads(body), url
+
+    def put(self, query: str, data: Dict, url: Optional[str] = None,
+            variant: str = "") -> None:
+        empty = not data.get("items")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (query, url, body, empty, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self._key(query, variant), url, json.dumps(data, ensure_ascii=False),
+                 int(empty), time.time()))
+            self._conn.commit()
+            self.stats["stored"] += 1
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """Todas las respuestas guardadas (query sin variante, respuesta), caducadas o no."""
+        with self._lock:
+            rows = self._conn.execute("SELECT query, body FROM responses").fetchall()
+        for key, body in rows:
+            yield key.split(VARIANT_SEP, 1)[0], json.loads(body)
+
+    def report(self) -> str:
+        """Resumen de la tasa de aciertos (las negativas cuentan como acierto)."""
+        with self._lock:
+            stats = dict(self.stats)
+        served = stats.get("hits", 0) + stats.get("negative_hits", 0)
+        total = served + stats.get("misses", 0) + stats.get("expired", 0)
+        rate = served / total * 100 if total else 0.0
+        return f"{rate:.1f}% aciertos ({served}/{total}) {stats}"
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+from typing import Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Respuestas que merece la pena reintentar (cuota superada y errores del servidor)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """
+    Token bucket compartido por todos los hilos (y por el event loop del motor async).
+    - rate: peticiones por segundo que se permiten de media.
+    - burst: cuántas peticiones pueden salir seguidas si el cubo está lleno.
+    Cada petición reserva un token; si no quedan, espera justo lo necesario
+    hasta que se repone, en lugar de dormir un tiempo fijo por llamada.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate debe ser > 0")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens +
+                           (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self) -> float:
+        """Reserva un token y devuelve cuántos segundos hay que esperar para usarlo."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def try_acquire(self) -> bool:
+        """Como acquire, pero sin esperar: False (sin gastar token) si el cubo está vacío."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class LimitedRetry(Retry):
+    """
+    Retry de urllib3 que, tras el backoff, pide un token al RateLimiter antes
+    de cada reintento: los reintentos cuentan para la cuota igual que la
+    primera petición (justo cuando el servidor ya está respondiendo 429).
+    """
+
+    limiter: Optional[RateLimiter] = None
+
+    def new(self, **kw) -> "LimitedRetry":
+        # urllib3 crea un Retry nuevo en cada intento; el limiter tiene que pasar
+        retry = super().new(**kw)
+        retry.limiter = self.limiter
+        return retry
+
+    def sleep(self, response=None) -> None:
+        super().sleep(response)
+        if self.limiter is not None:
+            self.limiter.acquire()
+
+
+def make_session(pool_size: int = 10, retries: int = 5, backoff: float = 0.5,
+                 statuses: Iterable[int] = RETRY_STATUSES,
+                 limiter: Optional[RateLimiter] = None) -> requests.Session:
+    """
+    Session de requests con un pool de pool_size conexiones (keep-alive) y
+    reintentos con backoff exponencial (backoff * 2^n, respetando Retry-After)
+    en errores de conexión y en los códigos de statuses.
+    - limiter: si se pasa, cada reintento gasta un token (la primera petición
+      la sigue limitando quien llama).
+    Si se agotan los reintentos se devuelve la última respuesta, así que
+    raise_for_status() sigue funcionando como siempre.
+    """
+    retry = LimitedRetry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=tuple(statuses),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    retry.limiter = limiter
+    adapter = HTTPAdapter(pool_connections=pool_size,
+                          pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
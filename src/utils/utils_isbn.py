@@ -1,7 +1,8 @@
 import re
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
 import numpy as np
+import pandas as pd
 
 
 def clean_isbn13(x: Any) -> Optional[str]:
@@ -58,3 +59,228 @@ def isbn13_valid_or_false(x: Any) -> bool:
     if x is None or (isinstance(x, float) and np.isnan(x)):
         return False
     return is_valid_isbn13(str(x))
+
+
+def _strip_float_suffix(s: str) -> Optional[str]:
+    # "0618510825.0" -> "0618510825"; otros decimales no son un ISBN
+    if "." in s:
+        return s[:-2] if s.endswith(".0") else None
+    return s
+
+
+def clean_isbn10(x: Any) -> Optional[str]:
+    """
+    Limpia un ISBN10 igual que clean_isbn13 (quita separadores y el ".0"),
+    conservando la X del dígito de control. Devuelve 10 caracteres
+    (9 dígitos + dígito o X) o None.
+    """
+    if x is None or (isinstance(x, float) and np.isnan(x)):
+        return None
+    s = _strip_float_suffix(str(x).strip())
+    if s is None:
+        return None
+    chars = re.sub(r"[^0-9X]", "", s.upper())
+    if len(chars) != 10 or "X" in chars[:9]:
+        return None
+    return chars
+
+
+def is_valid_isbn10(x: Any) -> bool:
+    chars = clean_isbn10(x)
+    if chars is None:
+        return False
+    # Suma ponderada 10..1 (X = 10) múltiplo de 11
+    total = sum((10 - i) * (10 if c == "X" else int(c)) for i, c in enumerate(chars))
+    return total % 11 == 0
+
+
+def isbn10_to_isbn13(x: Any) -> Optional[str]:
+    """ISBN10 válido -> ISBN13 con prefijo 978 (None si no es válido)."""
+    if not is_valid_isbn10(x):
+        return None
+    first12 = "978" + clean_isbn10(x)[:9]
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(first12))
+    return first12 + str((10 - total % 10) % 10)
+
+
+def isbn_valid_or_false(x: Any) -> bool:
+    """Columna isbn: vale un ISBN10 o un ISBN13 (Google Books trae de los dos)."""
+    return is_valid_isbn10(x) or is_valid_isbn13(x)
+
+
+# ---------------------------------------------------------------------
+# Versiones por lote (columna entera) con NumPy
+# ---------------------------------------------------------------------
+
+# Pesos del dígito de control
+ISBN13_WEIGHTS = np.array([1, 3] * 6, dtype=np.int64)
+ISBN10_WEIGHTS = np.arange(10, 0, -1, dtype=np.int64)
+
+# Los textos más largos (raros) se limpian con la función por valor para que
+# la matriz de caracteres no crezca con una sola fila enorme
+_BATCH_MAX_CHARS = 32
+
+
+def _as_array(values: Any) -> np.ndarray:
+    if isinstance(values, (pd.Series, pd.Index)):
+        return values.to_numpy(dtype=object)
+    return np.asarray(values, dtype=object)
+
+
+def _numeric_digits(values: Any, width: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Columna numérica (int, Int64, float) -> (filas con exactamente `width`
+    dígitos, matriz uint8 de esos dígitos). None si la columna no es numérica.
+    Es lo mismo que str() + clean_*: el valor tiene que ser entero (un float
+    solo pierde el ".0") y el signo no cuenta.
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_bool_dtype(s) or not pd.api.types.is_numeric_dtype(s):
+        return None
+    v = np.abs(s.astype("float64").to_numpy(na_value=np.nan))
+    with np.errstate(invalid="ignore"):
+        ok = (v >= 10 ** (width - 1)) & (v < 10 ** width) & (v == np.floor(v))
+    ints = v[ok].astype(np.int64)
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return ok, ((ints[:, None] // powers) % 10).astype(np.uint8)
+
+
+def _char_matrix(values: np.ndarray, keep_x: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Textos -> (matriz de códigos Unicode uint32 (n, ancho), mascara de
+    caracteres que se quedan, filas que hay que limpiar por valor).
+    Aplica el strip y la regla del ".0" de clean_isbn13 sobre toda la matriz.
+    """
+    text = pd.Series(values, dtype=object)
+    text = np.char.strip(text.where(text.notna(), "").astype(str).to_numpy(dtype=str))
+    lengths = np.char.str_len(text)
+    slow = lengths > _BATCH_MAX_CHARS
+    text = np.where(slow, "", text).astype(f"<U{max(int(lengths[~slow].max(initial=1)), 1)}")
+    chars = text.view(np.uint32).reshape(len(text), -1)
+    lengths = np.where(slow, 0, lengths)
+
+    rows = np.arange(len(text))
+    has_dot = (chars == ord(".")).any(axis=1)
+    ends_float = has_dot & (lengths >= 2)
+    ends_float &= chars[rows, np.maximum(lengths - 2, 0)] == ord(".")
+    ends_float &= chars[rows, np.maximum(lengths - 1, 0)] == ord("0")
+    # ".0" final fuera; con otro decimal la fila no es un ISBN
+    chars[ends_float, np.maximum(lengths - 1, 0)[ends_float]] = 0
+    chars[has_dot & ~ends_float] = 0
+
+    keep = (chars >= ord("0")) & (chars <= ord("9"))
+    if keep_x:
+        keep |= (chars == ord("X")) | (chars == ord("x"))
+    return chars, keep, slow
+
+
+def _digit_rows(values: Any, width: int, keep_x: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Columna -> (filas limpias, matriz (filas, width) uint8 con sus dígitos
+    (X = 10), filas a limpiar con la función por valor).
+    """
+    numeric = _numeric_digits(values, width)
+    if numeric is not None:
+        ok, digits = numeric
+        return ok, digits, np.zeros(len(ok), dtype=bool)
+
+    arr = _as_array(values)
+    if len(arr) == 0:
+        return (np.zeros(0, dtype=bool), np.zeros((0, width), dtype=np.uint8),
+                np.zeros(0, dtype=bool))
+    chars, keep, slow = _char_matrix(arr, keep_x)
+    ok = keep.sum(axis=1) == width
+    # Los caracteres que quedan, en orden, forman la matriz (filas, width)
+    picked = chars[ok][keep[ok]].reshape(-1, width)
+    digits = np.where((picked == ord("X")) | (picked == ord("x")), 10, picked - ord("0"))
+    digits = digits.astype(np.uint8)
+    if keep_x:
+        # La X solo vale como dígito de control
+        x_inside = (digits[:, :-1] == 10).any(axis=1)
+        ok[np.flatnonzero(ok)[x_inside]] = False
+        digits = digits[~x_inside]
+    return ok, digits, slow
+
+
+def _to_strings(ok: np.ndarray, digits: np.ndarray) -> np.ndarray:
+    out = np.full(len(ok), None, dtype=object)
+    if len(digits):
+        codes = np.where(digits == 10, ord("X"), digits + ord("0")).astype(np.uint8)
+        out[ok] = codes.view(f"S{digits.shape[1]}").ravel().astype(str).tolist()
+    return out
+
+
+def _isbn13_check(first12: np.ndarray) -> np.ndarray:
+    return (10 - (first12.astype(np.int64) @ ISBN13_WEIGHTS) % 10) % 10
+
+
+def _isbn13_rows(values: Any, strings: bool) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    ok, digits, slow = _digit_rows(values, 13, keep_x=False)
+    cleaned = _to_strings(ok, digits) if strings else None
+    valid = np.zeros(len(ok), dtype=bool)
+    valid[ok] = _isbn13_check(digits[:, :12]) == digits[:, 12]
+    if slow.any():
+        arr = _as_array(values)
+        if strings:
+            cleaned[slow] = [clean_isbn13(x) for x in arr[slow]]
+        valid[slow] = [is_valid_isbn13(x) for x in arr[slow]]
+    return cleaned, valid
+
+
+def _isbn10_rows(values: Any, strings: bool) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    ok, digits, slow = _digit_rows(values, 10, keep_x=True)
+    cleaned = _to_strings(ok, digits) if strings else None
+    valid = np.zeros(len(ok), dtype=bool)
+    valid[ok] = (digits.astype(np.int64) @ ISBN10_WEIGHTS) % 11 == 0
+    if slow.any():
+        arr = _as_array(values)
+        if strings:
+            cleaned[slow] = [clean_isbn10(x) for x in arr[slow]]
+        valid[slow] = [is_valid_isbn10(x) for x in arr[slow]]
+    return cleaned, valid
+
+
+def validate_isbn13_batch(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    clean_isbn13 + is_valid_isbn13 sobre una columna entera.
+    Devuelve (array object con el ISBN13 limpio o None, máscara de válidos).
+    """
+    return _isbn13_rows(values, strings=True)
+
+
+def validate_isbn10_batch(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    clean_isbn10 + is_valid_isbn10 sobre una columna entera.
+    Devuelve (array object con el ISBN10 limpio o None, máscara de válidos).
+    """
+    return _isbn10_rows(values, strings=True)
+
+
+def isbn13_batch_valid(values: Any) -> np.ndarray:
+    """Solo la máscara de validate_isbn13_batch (sin construir los textos)."""
+    return _isbn13_rows(values, strings=False)[1]
+
+
+def isbn10_batch_valid(values: Any) -> np.ndarray:
+    """Solo la máscara de validate_isbn10_batch (sin construir los textos)."""
+    return _isbn10_rows(values, strings=False)[1]
+
+
+def isbn10_to_isbn13_batch(values: Any) -> np.ndarray:
+    """isbn10_to_isbn13 sobre una columna entera (None donde el ISBN10 no es válido)."""
+    ok, digits, slow = _digit_rows(values, 10, keep_x=True)
+    valid = np.zeros(len(ok), dtype=bool)
+    valid[ok] = (digits.astype(np.int64) @ ISBN10_WEIGHTS) % 11 == 0
+    digits = digits[valid[ok]]
+    first12 = np.hstack([np.tile(np.array([9, 7, 8], dtype=np.uint8), (len(digits), 1)),
+                         digits[:, :9]])
+    isbn13 = np.hstack([first12, _isbn13_check(first12).astype(np.uint8)[:, None]])
+    out = _to_strings(valid, isbn13)
+    if slow.any():
+        out[slow] = [isbn10_to_isbn13(x) for x in _as_array(values)[slow]]
+    return out
+
+
+def isbn_batch_valid(values: Any) -> np.ndarray:
+    """isbn_valid_or_false sobre una columna entera."""
+    return isbn10_batch_valid(values) | isbn13_batch_valid(values)
@@ -0,0 +1,367 @@
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from models.Book import BookData
+from utils.utils_normalization import safe_eval
+
+
+def book_to_record(bd: BookData) -> Dict[str, Any]:
+    """BookData -> dict serializable (los sets, como authors, pasan a lista)."""
+    record = asdict(bd)
+    for key, value in record.items():
+        if isinstance(value, (set, frozenset)):
+            record[key] = list(value)
+    return record
+
+
+class JsonlWriter:
+    """
+    Escribe registros en un fichero JSONL (un JSON por línea) a medida que llegan.
+    Cada `batch_size` registros hace flush + fsync, así que si el proceso muere
+    como mucho se pierde el último lote.
+    - append: si es False se vacía el fichero al abrirlo.
+    - on_flush: se llama tras cada fsync (lo escrito hasta ahí ya es durable).
+    No es thread-safe: escribir siempre desde el mismo hilo.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 50, append: bool = False,
+                 on_flush: Optional[Callable[[], None]] = None):
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self.on_flush = on_flush
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a" if append else "w", encoding="utf-8")
+        self._pending = 0
+        self.written = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(record, ensure_ascii=False, default=str))
+        self._f.write("\n")
+        self._pending += 1
+        self.written += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._pending = 0
+        if self.on_flush is not None:
+            self.on_flush()
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self.flush()
+            self._f.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------
+# Landing en Parquet: mismos campos que BookData, con tipos de verdad
+# (listas, structs y mapas) en vez de listas/dicts convertidos a texto
+# ---------------------------------------------------------------------
+
+COMMENT_TYPE = pa.struct([
+    ("user", pa.string()),
+    ("date", pa.string()),
+    ("rating", pa.float64()),
+    ("text", pa.string()),
+])
+
+BOOK_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("url", pa.string()),
+    ("title", pa.string()),
+    ("authors", pa.list_(pa.string())),
+    ("rating_value", pa.float64()),
+    ("desc", pa.string()),
+    ("pub_info", pa.string()),
+    ("cover", pa.string()),
+    ("format", pa.string()),
+    ("num_pages", pa.int64()),
+    ("publication_date", pa.string()),
+    ("publisher", pa.string()),
+    ("isbn", pa.string()),
+    ("isbn13", pa.int64()),
+    ("language", pa.string()),
+    ("review_count_by_lang", pa.map_(pa.string(), pa.int64())),
+    ("genres", pa.list_(pa.string())),
+    ("rating_count", pa.int64()),
+    ("review_count", pa.int64()),
+    ("comments", pa.list_(COMMENT_TYPE)),
+    ("price", pa.float64()),
+    ("current", pa.string()),
+])
+BOOK_COLUMNS: List[str] = BOOK_SCHEMA.names
+
+# El scraper guarda el ID numérico de Goodreads; Google usa IDs de volumen
+# alfanuméricos y añade la clave/huella del enriquecimiento incremental
+GOODREADS_SCHEMA = BOOK_SCHEMA.set(0, pa.field("id", pa.int64()))
+GOOGLE_SCHEMA = (BOOK_SCHEMA
+                 .append(pa.field("_gr_key", pa.string()))
+                 .append(pa.field("_gr_hash", pa.string())))
+
+
+def _is_nested(t: pa.DataType) -> bool:
+    return pa.types.is_list(t) or pa.types.is_map(t) or pa.types.is_struct(t)
+
+
+NESTED_COLUMNS: List[str] = [f.name for f in BOOK_SCHEMA if _is_nested(f.type)]
+
+# Columnas de texto del CSV de Google: se leen como str para que pandas no
+# las convierta en números (el isbn "0385326505" perdería el cero) y para que
+# todos los trozos de una lectura por lotes tengan el mismo tipo
+CSV_TEXT_DTYPES: Dict[str, Any] = {
+    f.name: str for f in GOOGLE_SCHEMA if pa.types.is_string(f.type)}
+
+
+def _to_arrow_value(value: Any, t: pa.DataType) -> Any:
+    """
+    Valor de un registro -> valor que acepta Arrow para el tipo t: NaN de
+    pandas y textos vacíos a null, sets a lista y números que llegan como
+    texto (isbn13 de Google, precio de Goodreads) convertidos. Lo que no se
+    puede convertir queda a null, como haría bronze al tiparlo.
+    """
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    try:
+        if pa.types.is_integer(t):
+            return None if value == "" else int(float(value))
+        if pa.types.is_floating(t):
+            return None if value == "" else float(value)
+    except (TypeError, ValueError):
+        return None
+    if pa.types.is_string(t) and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+def records_to_table(records: Iterable[Dict[str, Any]], schema: pa.Schema) -> pa.Table:
+    """Registros (dicts de BookData) -> tabla Arrow con el esquema dado (columnas que falten, a null)."""
+    fields = [(f.name, f.type) for f in schema]
+    rows = [{name: _to_arrow_value(record.get(name), t) for name, t in fields}
+            for record in records]
+    return pa.Table.from_pylist(rows, schema=schema)
+
+
+def frame_to_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    """
+    DataFrame -> tabla Arrow con el esquema dado, columna a columna. Si una
+    columna no encaja tal cual (p. ej. toda NaN en una columna de texto) se
+    convierte valor a valor como en records_to_table.
+    """
+    arrays = []
+    for f in schema:
+        if f.name not in df.columns:
+            arrays.append(pa.nulls(len(df), f.type))
+            continue
+        col = df[f.name]
+        try:
+            arrays.append(pa.array(col, type=f.type, from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(pa.array([_to_arrow_value(v, f.type) for v in col], type=f.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# Filas por row group del landing en Parquet: la lectura por lotes
+# (iter_landing_batches) descomprime de row group en row group
+LANDING_ROW_GROUP_SIZE = 5000
+
+
+def write_landing_parquet(records: Iterable[Dict[str, Any]], path: Path,
+                          schema: pa.Schema) -> int:
+    """
+    Escribe un fichero de landing en Parquet (zstd, row groups de
+    LANDING_ROW_GROUP_SIZE filas). Se escribe a un temporal y se renombra,
+    así que un lector nunca ve un fichero a medias.
+    Devuelve el número de filas.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = records_to_table(records, schema)
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp, compression="zstd", row_group_size=LANDING_ROW_GROUP_SIZE)
+    os.replace(tmp, path)
+    return table.num_rows
+
+
+def read_landing_parquet(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lee un landing en Parquet leyendo solo `columns` (las que existan en el
+    fichero). Las columnas anidadas salen como list/dict de Python, igual
+    que al leer el JSON, así que no hace falta ningún safe_eval después.
+    """
+    names = pq.read_schema(path).names
+    if columns is not None:
+        names = [c for c in columns if c in names]
+    return _table_to_frame(pq.read_table(path, columns=names))
+
+
+def _table_to_frame(table: pa.Table) -> pd.DataFrame:
+    df = table.to_pandas(maps_as_pydicts="strict")
+    # Arrow entrega las listas como arrays de NumPy; el resto del pipeline
+    # (merge, validaciones) espera listas de Python
+    for f in table.schema:
+        if pa.types.is_list(f.type):
+            df[f.name] = [v.tolist() if v is not None else None for v in df[f.name]]
+    return df
+
+
+def jsonl_to_parquet(jsonl_path: Path, parquet_path: Path,
+                     schema: pa.Schema = GOODREADS_SCHEMA) -> int:
+    """
+    Compacta el JSONL del scraper en Parquet (si un libro aparece varias
+    veces, gana la última línea). El JSONL se conserva: es el diario que
+    permite reanudar un crawl.
+    """
+    latest: Dict[Any, Dict[str, Any]] = {}
+    with open(jsonl_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                latest.pop(record.get("id"), None)
+                latest[record.get("id")] = record
+    return write_landing_parquet(latest.values(), parquet_path, schema)
+
+
+def goodreads_landing_path(jsonl_path: Path, json_path: Path,
+                           parquet_path: Optional[Path] = None) -> Path:
+    """
+    Prefiere el Parquet compactado si está al día con el JSONL; si no, el
+    JSONL en streaming; si tampoco existe, el JSON de array clásico.
+    """
+    jsonl_path = Path(jsonl_path)
+    if parquet_path is not None and Path(parquet_path).exists():
+        if not jsonl_path.exists() or \
+                Path(parquet_path).stat().st_mtime >= jsonl_path.stat().st_mtime:
+            return Path(parquet_path)
+    return jsonl_path if jsonl_path.exists() else Path(json_path)
+
+
+def read_goodreads_landing(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lee el landing de Goodreads en formato Parquet, JSONL o JSON (según la
+    extensión). `columns` solo se aplica al leer Parquet.
+    En JSONL un libro puede aparecer dos veces si un crawl se reanudó justo
+    tras escribirlo; nos quedamos con la última versión.
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return read_landing_parquet(path, columns)
+    if path.suffix == ".jsonl":
+        if path.stat().st_size == 0:
+            return pd.DataFrame()
+        df = pd.read_json(path, lines=True)
+        if "id" in df.columns:
+            df = df.drop_duplicates(subset="id", keep="last").reset_index(drop=True)
+        return df
+    return pd.read_json(path)
+
+
+def google_landing_path(parquet_path: Path, csv_path: Path) -> Path:
+    """
+    El enriquecimiento más reciente: el Parquet si no es más antiguo que el
+    CSV clásico (un --no-parquet posterior deja el CSV por delante); si no
+    existe, el CSV.
+    """
+    parquet_path, csv_path = Path(parquet_path), Path(csv_path)
+    if parquet_path.exists():
+        if not csv_path.exists() or \
+                parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+            return parquet_path
+    return csv_path
+
+
+def read_google_landing(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lee el landing de Google Books en Parquet o CSV (según la extensión),
+    solo con `columns` si se indican. En el CSV las listas y dicts vienen
+    como texto y se convierten aquí, una sola vez.
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return read_landing_parquet(path, columns)
+    df = pd.read_csv(path, usecols=lambda c: columns is None or c in columns,
+                     dtype=CSV_TEXT_DTYPES)
+    return _decode_nested(df)
+
+
+def _decode_nested(df: pd.DataFrame) -> pd.DataFrame:
+    for col in NESTED_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].apply(safe_eval)
+    return df
+
+
+def _select(df: pd.DataFrame, columns: Optional[List[str]]) -> pd.DataFrame:
+    if columns is None:
+        return df
+    return df[[c for c in columns if c in df.columns]]
+
+
+def _iter_jsonl_batches(path: Path, batch_size: int,
+                        columns: Optional[List[str]]) -> Iterator[pd.DataFrame]:
+    # Primera pasada: última línea de cada libro (como drop_duplicates keep="last"
+    # en read_goodreads_landing). Segunda pasada: solo esas líneas, por lotes.
+    last_line: Dict[Any, int] = {}
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f):
+            if line.strip():
+                last_line[json.loads(line).get("id")] = lineno
+    batch: List[Dict[str, Any]] = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if last_line.get(record.get("id")) != lineno:
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield _select(pd.DataFrame(batch), columns)
+                batch = []
+    if batch:
+        yield _select(pd.DataFrame(batch), columns)
+
+
+def iter_landing_batches(path: Path, batch_size: int,
+                         columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Recorre un fichero de landing (Parquet, JSONL, JSON o CSV) en lotes de
+    como mucho batch_size filas, con los mismos tipos que read_*_landing.
+    Parquet, JSONL y CSV se leen por trozos; el JSON de array clásico no se
+    puede trocear y se carga entero.
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        pf = pq.ParquetFile(path)
+        names = pf.schema_arrow.names
+        if columns is not None:
+            names = [c for c in columns if c in names]
+        for rb in pf.iter_batches(batch_size=batch_size, columns=names):
+            yield _table_to_frame(pa.Table.from_batches([rb]))
+    elif path.suffix == ".jsonl":
+        if path.stat().st_size > 0:
+            yield from _iter_jsonl_batches(path, batch_size, columns)
+    elif path.suffix == ".csv":
+        for chunk in pd.read_csv(path, chunksize=batch_size, dtype=CSV_TEXT_DTYPES,
+                                 usecols=lambda c: columns is None or c in columns):
+            yield _decode_nested(chunk)
+    else:
+        df = _select(pd.read_json(path), columns)
+        for start in range(0, len(df), batch_size):
+            yield df.iloc[start:start + batch_size].reset_index(drop=True)
@@ -0,0 +1,105 @@
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from utils.utils_landing import JsonlWriter
+
+
+class CrawlManifest:
+    """
+    Manifiesto de un crawl guardado en disco como log JSONL (solo se añaden líneas):
+    {"id", "status": "done" | "failed", "attempts", "next_retry", "error", "ts"}.
+    Al abrirlo se reproduce el log, así un crawl de millones de IDs se puede
+    parar y reanudar sin repetir lo ya hecho.
+    - max_retries: intentos máximos por ID antes de darlo por perdido.
+    - backoff: espera base tras un fallo; se dobla en cada intento (hasta backoff_max).
+    """
+
+    def __init__(self, path: Path, max_retries: int = 3, backoff: float = 30.0,
+                 backoff_max: float = 3600.0, batch_size: int = 50):
+        self.path = Path(path)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.done: set = set()
+        # id -> {"attempts": n, "next_retry": ts}
+        self.failed: Dict[Any, Dict[str, float]] = {}
+        self._load()
+        self._writer = JsonlWriter(self.path, batch_size=batch_size, append=True)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # última línea a medias si el proceso murió escribiendo
+                book_id = event["id"]
+                if event["status"] == "done":
+                    self.done.add(book_id)
+                    self.failed.pop(book_id, None)
+                else:
+                    self.failed[book_id] = {
+                        "attempts": event.get("attempts", 1),
+                        "next_retry": event.get("next_retry", 0.0),
+                    }
+
+    def is_done(self, book_id: Any) -> bool:
+        return book_id in self.done
+
+    def can_retry(self, book_id: Any, now: Optional[float] = None) -> bool:
+        """True si el ID no ha fallado nunca o ya ha pasado su backoff."""
+        info = self.failed.get(book_id)
+        if info is None:
+            return True
+        now = time.time() if now is None else now
+        return info["attempts"] < self.max_retries and info["next_retry"] <= now
+
+    def pending(self, book_ids: Iterable[Any]) -> Iterator[Any]:
+        """Filtra (de forma perezosa) los IDs que quedan por hacer ahora mismo."""
+        for book_id in book_ids:
+            if not self.is_done(book_id) and self.can_retry(book_id):
+                yield book_id
+
+    def retryable(self) -> List[Any]:
+        """IDs fallidos a los que aún les quedan intentos (estén o no en backoff)."""
+        return [book_id for book_id, info in self.failed.items()
+                if info["attempts"] < self.max_retries]
+
+    def next_retry_in(self) -> float:
+        """Segundos hasta que el primer ID reintentable sale de su backoff."""
+        waits = [self.failed[b]["next_retry"] - time.time() for b in self.retryable()]
+        return max(0.0, min(waits)) if waits else 0.0
+
+    def mark_done(self, book_id: Any) -> None:
+        self.done.add(book_id)
+        self.failed.pop(book_id, None)
+        self._writer.write({"id": book_id, "status": "done", "ts": time.time()})
+
+    def mark_failed(self, book_id: Any, error: Any = None) -> None:
+        attempts = self.failed.get(book_id, {}).get("attempts", 0) + 1
+        wait = min(self.backoff * 2 ** (attempts - 1), self.backoff_max)
+        next_retry = time.time() + wait
+        self.failed[book_id] = {"attempts": attempts, "next_retry": next_retry}
+        self._writer.write({"id": book_id, "status": "failed", "attempts": attempts,
+                            "next_retry": next_retry, "error": str(error) if error else None,
+                            "ts": time.time()})
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "done": len(self.done),
+            "failed_retryable": len(self.retryable()),
+            "failed_exhausted": len(self.failed) - len(self.retryable()),
+        }
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def __enter__(self) -> "CrawlManifest":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
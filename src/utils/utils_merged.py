@@ -66,9 +66,20 @@ def merge_lists(list_gr: Any, list_gb: Any) -> List[str]:
     return result
 
 
-def pick_language(lang_gr: Any, lang_gb: Any) -> Optional[str]:
-    n_gr = normalize_language(lang_gr)
-    n_gb = normalize_language(lang_gb)
+def _normalized_language(x: Any) -> Optional[str]:
+    # Idioma que ya pasó por normalize_language en silver: solo quedan los nulos
+    return None if pd.isna(x) else x
+
+
+def pick_language(lang_gr: Any, lang_gb: Any, normalized: bool = False) -> Optional[str]:
+    """
+    Idioma final entre Goodreads y Google Books. Con normalized=True los
+    valores ya vienen normalizados (columna language de silver) y no se
+    vuelven a normalizar.
+    """
+    prepare = _normalized_language if normalized else normalize_language
+    n_gr = prepare(lang_gr)
+    n_gb = prepare(lang_gb)
 
     if n_gr is None and n_gb is None:
         return None
@@ -184,9 +195,9 @@ def merge_book_rows(row_gr: pd.Series, row_gb: Optional[pd.Series]) -> Dict[str,
 
     # idioma
     merged["language"] = (
-        pick_language(row_gr.get("language"), row_gb.get("language"))
+        pick_language(row_gr.get("language"), row_gb.get("language"), normalized=True)
         if row_gb is not None
-        else normalize_language(row_gr.get("language"))
+        else _normalized_language(row_gr.get("language"))
     )
 
     # review_count_by_lang
@@ -220,7 +231,7 @@ def merge_book_rows(row_gr: pd.Series, row_gb: Optional[pd.Series]) -> Dict[str,
     merged["current"] = (
         row_gb.get("current")
         if row_gb is not None
-        else row_gr.get("review_count")
+        else row_gr.get("current")
     )
     # comments (solo Goodreads)
     merged["comments"] = row_gr.get("comments") or []
@@ -233,60 +244,71 @@ def merge_book_rows(row_gr: pd.Series, row_gb: Optional[pd.Series]) -> Dict[str,
     return merged
 
 
-def merge_books(df_gr: pd.DataFrame, df_gb: pd.DataFrame) -> pd.DataFrame:
+class GoogleBooksIndex:
     """
-    Goodreads (df_gr) es el dataset base:
-      - si hay isbn13 en Goodreads y existe en Google Books → merge por isbn13
-      - si isbn13 en Goodreads es null → intentar match por (title, author)
-      - si no se encuentra nada → se conserva solo Goodreads
+    Índice de Google Books para el merge, con las filas como dicts:
+    - por isbn13
+    - por (title_norm, author_norm), para cuando Goodreads no trae isbn13
+    Si una clave se repite, se queda la primera fila. Se puede llenar de una
+    vez o lote a lote (modo streaming); es lo único que el merge mantiene en
+    memoria.
     """
 
-    df_gr = df_gr.copy()
-    df_gb = df_gb.copy()
-    # -----------------------------
-    # Índice rápido por isbn13
-    # -----------------------------
-    df_gb_isbn = df_gb.set_index("isbn13", drop=False)
-
-    # -----------------------------
-    # Índice auxiliar por (title_norm, author_norm)
-    # para el caso en que isbn13 de Goodreads sea null
-    # -----------------------------
-    df_gb["title_norm"] = df_gb["title"].apply(_norm_text)
-    df_gb["author_norm"] = df_gb["authors"].apply(_first_author_norm)
-
-    # diccionario {(title_norm, author_norm) -> fila de Google Books}
-    # si hay duplicados, nos quedamos con la primera ocurrencia
-    gb_by_title_author: Dict[tuple, pd.Series] = {}
-    for _, row in df_gb.iterrows():
-        key = (row["title_norm"], row["author_norm"])
-        if key not in gb_by_title_author:
-            gb_by_title_author[key] = row
-
-    merged_records: List[Dict[str, Any]] = []
-
-    for _, row_gr in df_gr.iterrows():
+    def __init__(self) -> None:
+        self.by_isbn: Dict[Any, Dict[str, Any]] = {}
+        self.by_title_author: Dict[tuple, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_title_author)
+
+    def add(self, df_gb: pd.DataFrame) -> None:
+        for _, row in df_gb.iterrows():
+            record = row.to_dict()
+            isbn = record.get("isbn13")
+            if pd.notna(isbn) and isbn not in self.by_isbn:
+                self.by_isbn[isbn] = record
+            key = (_norm_text(record.get("title")),
+                   _first_author_norm(record.get("authors")))
+            if key not in self.by_title_author:
+                self.by_title_author[key] = record
+
+    def lookup(self, row_gr: pd.Series) -> Optional[Dict[str, Any]]:
         row_gb = None
         isbn = row_gr.get("isbn13")
 
         # 1) Intento por isbn13, si viene
         if pd.notna(isbn):
-            if isbn in df_gb_isbn.index:
-                gb_rows = df_gb_isbn.loc[isbn]
-                if isinstance(gb_rows, pd.DataFrame):
-                    row_gb = gb_rows.iloc[0]
-                else:
-                    row_gb = gb_rows
+            row_gb = self.by_isbn.get(isbn)
 
         # 2) Si no hay isbn13 en GR o no se encontró en GB, probamos por título+autor
         if row_gb is None:
             title_norm = _norm_text(row_gr.get("title"))
             author_norm = _first_author_norm(row_gr.get("authors"))
-            key = (title_norm, author_norm)
-            if key in gb_by_title_author:
-                row_gb = gb_by_title_author[key]
+            row_gb = self.by_title_author.get((title_norm, author_norm))
+        return row_gb
+
+
+def merge_books(df_gr: pd.DataFrame, df_gb: Optional[pd.DataFrame] = None,
+                index: Optional[GoogleBooksIndex] = None) -> pd.DataFrame:
+    """
+    Goodreads (df_gr) es el dataset base:
+      - si hay isbn13 en Goodreads y existe en Google Books → merge por isbn13
+      - si isbn13 en Goodreads es null → intentar match por (title, author)
+      - si no se encuentra nada → se conserva solo Goodreads
+    Google Books llega como DataFrame (df_gb) o como índice ya construido
+    (index), que es lo que usa el modo streaming para cada lote de Goodreads.
+    """
+
+    if index is None:
+        index = GoogleBooksIndex()
+        index.add(df_gb)
+
+    merged_records: List[Dict[str, Any]] = []
+
+    for _, row_gr in df_gr.iterrows():
+        row_gb = index.lookup(row_gr)
 
-        # 3) Merge con la lógica que ya tienes
+        # Merge con la lógica que ya tienes
         if row_gr["isbn13"] == None:
             row_gr["isbn13"] = row_gb["isbn13"]
 
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 import ast
@@ -13,7 +14,8 @@ from typing import Any, List
 import numpy as np
 import pandas as pd
 
-from const.BCP_47 import LANG_MAP_GOODREADS
+from const.BCP_47 import LANG_LOOKUP
+from utils.utils_isbn import clean_isbn13, is_valid_isbn13, validate_isbn13_batch
 
 _URL_RE = re.compile(r"^https?://", re.IGNORECASE)
 _DATE_ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")  # YYYY-MM-DD
@@ -27,6 +29,23 @@ DATE_PATTERNS = [
     "%b %d, %Y",      # Jul 16, 2005
 ]
 
+# Fecha "July 16, 2005" dentro del texto de pub_info de Goodreads
+_PUB_INFO_DATE_RE = re.compile(r"([A-Za-z]+ \d{1,2}, \d{4})")
+
+# Clases de fecha que se parsean por lotes con pd.to_datetime (regex sobre el
+# texto sin espacios alrededor -> formatos a probar, por orden). Lo que no
+# encaja en ninguna, o que pandas no entiende (p. ej. años fuera del rango de
+# datetime64[ns]), se resuelve con _try_parse_date.
+_DATE_CLASSES = [
+    (re.compile(r"^\d{4}-\d{2}-\d{2}$"), ["%Y-%m-%d"]),
+    (re.compile(r"^\d{4}-\d{2}$"), ["%Y-%m"]),
+    (re.compile(r"^\d{4}$"), ["%Y"]),
+    (re.compile(r"^[A-Za-z]+ \d{1,2}, \d{4}$"), ["%B %d, %Y", "%b %d, %Y"]),
+]
+
+# Textos de fecha distintos que se recuerdan ya parseados
+DATE_CACHE_SIZE = 100_000
+
 
 def safe_eval(x):
     """Convierte strings 'list-like' o 'dict-like' a Python real."""
@@ -92,12 +111,34 @@ def normalize_columns_snake_case(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def _bcp47_case(tag: str) -> str:
+    """
+    Mayúsculas canónicas de una etiqueta BCP-47: idioma en minúsculas,
+    escritura (4 letras) capitalizada y región (2 letras o 3 dígitos) en
+    mayúsculas. Tras un singleton (p. ej. "x-") todo queda en minúsculas.
+    """
+    parts = tag.split("-")
+    out = [parts[0]]
+    for i, part in enumerate(parts[1:], start=1):
+        if len(parts[i - 1]) == 1:
+            out.extend(parts[i:])
+            break
+        if len(part) == 4 and part.isalpha():
+            out.append(part.title())
+        elif (len(part) == 2 and part.isalpha()) or (len(part) == 3 and part.isdigit()):
+            out.append(part.upper())
+        else:
+            out.append(part)
+    return "-".join(out)
+
+
 def normalize_language(value: Any) -> str | None:
     """
-    Normaliza idioma a BCP-47 (minúsculas, códigos estándar si se reconocen).
+    Normaliza idioma a BCP-47 (códigos estándar si se reconocen).
     - 'English' -> 'en'
     - 'en' -> 'en'
-    - 'en-US' se queda 'en-us' (puedes dejarlo en minúsculas o respetar mayúsculas de región).
+    - 'en-us' / 'en_US' -> 'en-US' (región en mayúsculas)
+    Lo que no se reconoce ni parece una etiqueta BCP-47 se deja en minúsculas.
     """
     if value is None or (isinstance(value, float) and np.isnan(value)):
         return None
@@ -106,24 +147,26 @@ def normalize_language(value: Any) -> str | None:
         return None
 
     lower = s.lower()
-    if lower in LANG_MAP_GOODREADS:
-        return LANG_MAP_GOODREADS[lower]
+    if lower in LANG_LOOKUP:
+        return LANG_LOOKUP[lower]
 
+    tag = lower.replace("_", "-")
+    if _LANG_RE.match(tag):
+        return _bcp47_case(tag)
     return lower
 
 
-def generate_stable_book_id(isbn13, title, publisher, publication_date):
+def normalize_language_column(s: pd.Series) -> pd.Series:
     """
-    Genera un ID estable de libro:
-    - Si isbn13 existe y es válido (13 dígitos) → usar isbn13
-    - Si no, generar un hash estable con (title + publisher + publication_date)
+    normalize_language una vez por valor distinto de la columna. Devuelve
+    una columna categórica: pocos idiomas repetidos en muchas filas.
     """
+    codes, uniques = pd.factorize(s)
+    normalized = np.append(np.array([normalize_language(v) for v in uniques], dtype=object), None)
+    return pd.Series(pd.Categorical(normalized[codes]), index=s.index)
 
-    if pd.notna(isbn13):
-        isbn_str = re.sub(r"\D", "", str(isbn13))
-        if len(isbn_str) == 13:
-            return isbn_str
 
+def _book_hash(title, publisher, publication_date) -> str:
     def clean(x):
         if x is None or (isinstance(x, float) and pd.isna(x)):
             return ""
@@ -138,6 +181,29 @@ def generate_stable_book_id(isbn13, title, publisher, publication_date):
     return hashlib.sha1(key.encode("utf-8")).hexdigest()
 
 
+def generate_stable_book_id(isbn13, title, publisher, publication_date):
+    """
+    Genera un ID estable de libro:
+    - Si isbn13 es un ISBN-13 válido (clean_isbn13 + dígito de control) → usar
+      el isbn13 limpio, llegue como str, int o float ("….0")
+    - Si no, generar un hash estable con (title + publisher + publication_date)
+    """
+
+    isbn_str = clean_isbn13(isbn13)
+    if isbn_str is not None and is_valid_isbn13(isbn_str):
+        return isbn_str
+    return _book_hash(title, publisher, publication_date)
+
+
+def generate_stable_book_ids(isbn13, title, publisher, publication_date) -> List[str]:
+    """generate_stable_book_id sobre columnas enteras (validate_isbn13_batch para el isbn13)."""
+    cleaned, valid = validate_isbn13_batch(isbn13)
+    return [
+        isbn if ok else _book_hash(t, p, d)
+        for isbn, ok, t, p, d in zip(cleaned, valid, title, publisher, publication_date)
+    ]
+
+
 def is_non_empty_string(x: Any) -> bool:
     return isinstance(x, str) and x.strip() != ""
 
@@ -230,6 +296,7 @@ def _first_author_norm(x: Any) -> str:
     return _norm_text(str(x))
 
 
+@lru_cache(maxsize=DATE_CACHE_SIZE)
 def _try_parse_date(raw: str) -> Optional[datetime]:
     raw = raw.strip()
     for pattern in DATE_PATTERNS:
@@ -246,7 +313,7 @@ def normalize_pub_info_to_date(pub_info):
 
     pub_info = pub_info.strip()
 
-    m = re.search(r"([A-Za-z]+ \d{1,2}, \d{4})", pub_info)
+    m = _PUB_INFO_DATE_RE.search(pub_info)
     if not m:
         return None
 
@@ -283,6 +350,75 @@ def normalize_gb_date(gb_date: Optional[str]) -> Optional[str]:
         return dt.strftime("%Y-%m-%d")    # YYYY-MM-DD
 
 
+def _unique_strings(s: pd.Series):
+    """
+    Columna -> (códigos de pd.factorize, valores distintos como Series de
+    str). Lo que no es str cuenta como nulo. Las fechas se repiten mucho
+    entre ediciones: todo el trabajo se hace una vez por valor distinto.
+    """
+    if pd.api.types.infer_dtype(s, skipna=True) != "string":
+        types = s.map(type)
+        s = s.where(types.map({t: issubclass(t, str) for t in types.unique()}).astype(bool))
+    codes, uniques = pd.factorize(s)
+    return codes, pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+
+
+def _from_uniques(codes: np.ndarray, results: pd.Series, index: pd.Index) -> pd.Series:
+    # El código -1 (nulo) apunta al None añadido al final
+    values = np.append(results.to_numpy(dtype=object), None)
+    return pd.Series(values[codes], index=index, dtype=object)
+
+
+def _parse_date_classes(raw: pd.Series) -> pd.Series:
+    """Textos ya sin espacios -> datetime64 por clase de formato (NaT si no se resuelven)."""
+    parsed = pd.Series(pd.NaT, index=raw.index, dtype="datetime64[ns]")
+    for pattern, formats in _DATE_CLASSES:
+        pending = raw[raw.str.match(pattern) & parsed.isna()]
+        for fmt in formats:
+            if pending.empty:
+                break
+            dt = pd.to_datetime(pending, format=fmt, errors="coerce")
+            parsed[dt.index[dt.notna()]] = dt[dt.notna()]
+            pending = pending[dt.isna()]
+    return parsed
+
+
+def normalize_gb_date_column(s: pd.Series) -> pd.Series:
+    """
+    normalize_gb_date sobre una columna entera (None en los nulos): se parsea
+    cada valor distinto una sola vez, por grupos de formato.
+    """
+    codes, raw = _unique_strings(s)
+    parsed = _parse_date_classes(raw.str.strip())
+
+    # Misma granularidad que normalize_gb_date: la marca la longitud original
+    lengths = raw.str.len()
+    results = pd.Series(np.full(len(raw), None, dtype=object), index=raw.index)
+    ok = parsed.notna()
+    results[ok] = np.select(
+        [lengths[ok] == 4, lengths[ok] == 7],
+        [parsed[ok].dt.strftime("%Y"), parsed[ok].dt.strftime("%Y-%m")],
+        parsed[ok].dt.strftime("%Y-%m-%d"),
+    )
+    results[~ok] = [normalize_gb_date(x) for x in raw[~ok]]
+    return _from_uniques(codes, results, s.index)
+
+
+def normalize_pub_info_column(s: pd.Series) -> pd.Series:
+    """normalize_pub_info_to_date sobre una columna entera (None en los nulos)."""
+    codes, raw = _unique_strings(s)
+    found = raw.str.extract(_PUB_INFO_DATE_RE, expand=False).dropna()
+    parsed = _parse_date_classes(found)
+
+    results = pd.Series(np.full(len(raw), None, dtype=object), index=raw.index)
+    ok = parsed.notna()
+    results[ok.index[ok]] = parsed[ok].dt.strftime("%Y-%m-%d")
+    for i, date_str in found[~ok].items():
+        dt = _try_parse_date(date_str)
+        results[i] = dt.strftime("%Y-%m-%d") if dt else None
+    return _from_uniques(codes, results, s.index)
+
+
 def pick_publication_date(gr_pub_info: Optional[str],
                           gr_pub_date: Optional[str],
                           gb_pub_date: Optional[str]) -> Optional[str]:
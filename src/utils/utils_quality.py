@@ -2,15 +2,17 @@
 
 from __future__ import annotations
 
-from typing import Callable, Dict, Any, Iterable, Tuple
+from typing import Callable, Dict, Any, Iterable, Optional, Tuple
 import re
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 
-from utils.utils_isbn import isbn13_valid_or_false
-from utils.utils_normalization import _authors_valid, _genres_valid, _review_lang_valid, is_non_empty_string, is_positive_number, is_valid_language_bcp47, is_valid_url, normalize_currency_code, normalize_gb_date, normalize_language, normalize_price, normalize_pub_info_to_date
+from utils.utils_isbn import isbn13_batch_valid, isbn13_valid_or_false, isbn_batch_valid, isbn_valid_or_false
+from utils.utils_normalization import _LANG_RE, _URL_RE, _authors_valid, _genres_valid, _review_lang_valid, is_non_empty_string, is_positive_number, is_valid_language_bcp47, is_valid_url, normalize_currency_code, normalize_gb_date_column, normalize_language_column, normalize_price, normalize_pub_info_column
 
 
 def check_required_columns(
@@ -45,9 +47,166 @@ def _rating_valid(x: Any) -> bool:
     return 0.0 <= v <= 5.0
 
 
+# ---------------------------------------------------------------------
+# Reglas vectorizadas: misma semántica que la función por fila equivalente,
+# pero sobre la columna entera. Devuelven una máscara booleana (sin nulos)
+# con el índice de la columna; si no pueden con la columna (p. ej. .str
+# sobre una columna numérica) lanzan y apply_validation_rules usa la
+# función por fila.
+# ---------------------------------------------------------------------
+
+# Con False, apply_validation_rules usa siempre la función por fila
+VECTORIZED_RULES = True
+
+
+def _to_series(values: pa.Array, index: pd.Index) -> pd.Series:
+    return pd.Series(values.fill_null(False).to_numpy(zero_copy_only=False), index=index)
+
+
+def _type_mask(s: pd.Series, check: Callable[[type], bool]) -> pd.Series:
+    # check se evalúa una vez por tipo distinto, no por fila
+    types = s.map(type)
+    return types.map({t: check(t) for t in types.unique()}).astype(bool)
+
+
+def _arrow_strings(s: pd.Series) -> pa.Array:
+    """Columna -> texto en Arrow; lo que no es str (nulos, números, listas...) pasa a null."""
+    if pd.api.types.infer_dtype(s, skipna=True) != "string":
+        is_str = _type_mask(s, lambda t: issubclass(t, str))
+        if not is_str.any():
+            return pa.nulls(len(s), pa.string())
+        s = s.where(is_str)
+    return pa.array(s, type=pa.string(), from_pandas=True)
+
+
+def _non_empty(strings: pa.Array) -> pa.Array:
+    return pc.not_equal(pc.utf8_trim_whitespace(strings), "")
+
+
+def non_empty_string_mask(s: pd.Series) -> pd.Series:
+    """is_non_empty_string por columna."""
+    return _to_series(_non_empty(_arrow_strings(s)), s.index)
+
+
+def regex_mask(s: pd.Series, pattern: re.Pattern) -> pd.Series:
+    """pattern.match sobre el texto sin espacios alrededor; los no-str son False."""
+    stripped = pc.utf8_trim_whitespace(_arrow_strings(s))
+    matched = pc.match_substring_regex(stripped, pattern.pattern,
+                                       ignore_case=bool(pattern.flags & re.IGNORECASE))
+    return _to_series(matched, s.index)
+
+
+def url_mask(s: pd.Series) -> pd.Series:
+    return regex_mask(s, _URL_RE)
+
+
+def language_bcp47_mask(s: pd.Series) -> pd.Series:
+    return regex_mask(s, _LANG_RE)
+
+
+def _as_number(s: pd.Series):
+    """
+    Columna -> (valores numéricos, máscara de filas a resolver por fila).
+    Las columnas numéricas se usan tal cual; en las de objetos lo que
+    pd.to_numeric no entiende (pero no es nulo) se deja a la función por fila.
+    """
+    if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+        return s.astype("float64"), None
+    values = pd.to_numeric(s, errors="coerce")
+    unresolved = values.isna() & s.notna()
+    return values.astype("float64"), (unresolved if unresolved.any() else None)
+
+
+def _numeric_mask(s: pd.Series, check: Callable[[pd.Series], pd.Series],
+                  row_check: Callable[[Any], bool]) -> pd.Series:
+    values, unresolved = _as_number(s)
+    mask = check(values).astype(bool)  # NaN en cualquier comparación -> False
+    if unresolved is not None:
+        mask[unresolved] = s[unresolved].map(row_check).astype(bool)
+    return mask
+
+
+def positive_number_mask(s: pd.Series, allow_zero: bool = True) -> pd.Series:
+    """is_positive_number por columna."""
+    row_check = lambda x: is_positive_number(x, allow_zero=allow_zero)
+    if allow_zero:
+        return _numeric_mask(s, lambda v: v >= 0, row_check)
+    return _numeric_mask(s, lambda v: v > 0, row_check)
+
+
+def rating_mask(s: pd.Series) -> pd.Series:
+    """_rating_valid por columna: número entre 0 y 5."""
+    return _numeric_mask(s, lambda v: (v >= 0.0) & (v <= 5.0), _rating_valid)
+
+
+def _string_lists(s: pd.Series) -> Tuple[pd.Series, pa.Array]:
+    """
+    (máscara de filas lista/tupla, esas filas como list<string> de Arrow; el
+    resto a null). Si alguna lista trae elementos que no son texto Arrow
+    lanza y la regla pasa a la función por fila.
+    """
+    is_list = _type_mask(s, lambda t: issubclass(t, (list, tuple)))
+    if not is_list.any():
+        return is_list, pa.nulls(len(s), pa.list_(pa.string()))
+    return is_list, pa.array(s.where(is_list), type=pa.list_(pa.string()), from_pandas=True)
+
+
+def _lists_all_non_empty(lists: pa.Array) -> np.ndarray:
+    # Se aplanan los elementos, se marcan los que no valen y se cuentan por fila
+    elements = pc.list_flatten(lists)
+    bad = ~_non_empty(elements).fill_null(False).to_numpy(zero_copy_only=False)
+    parents = pc.list_parent_indices(lists).to_numpy()
+    return np.bincount(parents[bad], minlength=len(lists)) == 0
+
+
+def authors_mask(s: pd.Series) -> pd.Series:
+    """_authors_valid por columna: lista no vacía de strings no vacíos."""
+    is_list, lists = _string_lists(s)
+    lengths = pc.list_value_length(lists).fill_null(0).to_numpy(zero_copy_only=False)
+    return pd.Series(is_list.to_numpy() & (lengths > 0) & _lists_all_non_empty(lists),
+                     index=s.index)
+
+
+def genres_mask(s: pd.Series) -> pd.Series:
+    """_genres_valid por columna: nulo, o lista (puede ser vacía) de strings no vacíos."""
+    is_list, lists = _string_lists(s)
+    # Nulo = None o NaN float (pd.NA no cuenta, como en _genres_valid)
+    is_null = s.isna() & _type_mask(s, lambda t: t is type(None) or issubclass(t, float))
+    return pd.Series(is_null.to_numpy() | (is_list.to_numpy() & _lists_all_non_empty(lists)),
+                     index=s.index)
+
+
+def isbn13_mask(s: pd.Series) -> pd.Series:
+    """isbn13_valid_or_false por columna (dígito de control con NumPy)."""
+    return pd.Series(isbn13_batch_valid(s), index=s.index)
+
+
+def isbn_mask(s: pd.Series) -> pd.Series:
+    """isbn_valid_or_false por columna: ISBN10 o ISBN13 válido."""
+    return pd.Series(isbn_batch_valid(s), index=s.index)
+
+
+def notna_mask(s: pd.Series) -> pd.Series:
+    return s.notna()
+
+
+def price_flag(df: pd.DataFrame) -> Any:
+    """q_gb_price_not_null: precio >= 0 o sin precio (False si no hay columna price)."""
+    if "price" not in df.columns:
+        return False
+    if VECTORIZED_RULES:
+        try:
+            return (positive_number_mask(df["price"]) | df["price"].isna()).to_numpy(dtype=bool)
+        except Exception:
+            pass
+    return df["price"].apply(
+        lambda x: is_positive_number(x, allow_zero=True) or pd.isna(x)
+    )
+
+
 def apply_validation_rules(
     df: pd.DataFrame,
-    rules: Dict[str, Tuple[str, Callable[[Any], bool]]],
+    rules: Dict[str, Tuple],
     prefix: str,
 ) -> pd.DataFrame:
     """
@@ -55,27 +214,49 @@ def apply_validation_rules(
 
     rules: dict con
         key   -> nombre lógico del flag (sin prefijo),
-        value -> (nombre_columna, funcion_validadora)
+        value -> (nombre_columna, funcion_validadora) o
+                 (nombre_columna, funcion_validadora, regla_vectorizada)
+
+    La regla vectorizada recibe la columna entera y devuelve la máscara; la
+    función por fila solo se usa si no hay regla vectorizada o si esta falla.
 
     prefix: se antepone al nombre lógico del flag, por ejemplo 'q_gr_'.
     """
-    df = df.copy()
-    for flag_name, (col, func) in rules.items():
+    # Copia superficial: se añaden columnas sin duplicar los datos
+    df = df.copy(deep=False)
+    for flag_name, rule in rules.items():
+        col, func = rule[0], rule[1]
+        vectorized: Optional[Callable[[pd.Series], pd.Series]] = rule[2] if len(rule) > 2 else None
         full_flag = f"{prefix}{flag_name}"
         if col not in df.columns:
             df[full_flag] = False
-        else:
-            df[full_flag] = df[col].apply(func)
+            continue
+        df[full_flag] = _rule_flags(df[col], func, vectorized)
 
     return df
 
+
+def _rule_flags(s: pd.Series, func: Callable[[Any], bool],
+                vectorized: Optional[Callable[[pd.Series], pd.Series]]) -> Any:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Una evaluación por categoría (más el nulo, código -1) y se reparte por códigos
+        values = pd.Series(list(s.cat.categories) + [None], dtype=object)
+        flags = np.asarray(_rule_flags(values, func, vectorized), dtype=bool)
+        return flags[s.cat.codes.to_numpy()]
+    if vectorized is not None and VECTORIZED_RULES:
+        try:
+            return vectorized(s).to_numpy(dtype=bool)
+        except Exception:
+            pass
+    return s.apply(func)
+
 # ---------------------------------------------------------------------
 # Validaciones específicas para GOODREADS
 # ---------------------------------------------------------------------
 
 
 def validate_goodreads_df(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    df = df.copy()
+    df = df.copy(deep=False)
     required_cols = [
         "url",
         "title",
@@ -90,27 +271,26 @@ def validate_goodreads_df(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any
 
     # --- reglas genéricas de validación (una sola vez) ---
     rules = {
-        "title_valid": ("title", is_non_empty_string),
-        "url_valid": ("url", is_valid_url),
-        "authors_valid": ("authors", _authors_valid),
-        "rating_valid": ("rating_value", _rating_valid),
-        "language_not_null": ("language", is_non_empty_string),
-        "rating_count_valid": ("rating_count", lambda x: is_positive_number(x, allow_zero=True)),
-        "review_count_valid": ("review_count", lambda x: is_positive_number(x, allow_zero=True)),
+        "title_valid": ("title", is_non_empty_string, non_empty_string_mask),
+        "url_valid": ("url", is_valid_url, url_mask),
+        "authors_valid": ("authors", _authors_valid, authors_mask),
+        "rating_valid": ("rating_value", _rating_valid, rating_mask),
+        "language_not_null": ("language", is_non_empty_string, non_empty_string_mask),
+        "rating_count_valid": ("rating_count", lambda x: is_positive_number(x, allow_zero=True),
+                               positive_number_mask),
+        "review_count_valid": ("review_count", lambda x: is_positive_number(x, allow_zero=True),
+                               positive_number_mask),
         "num_pages_valid": (
-            "num_pages", lambda x: is_positive_number(x, allow_zero=False)
+            "num_pages", lambda x: is_positive_number(x, allow_zero=False),
+            lambda s: positive_number_mask(s, allow_zero=False)
         ),
-        "isbn13_not_null": ("isbn13", pd.notna),
-        "isbn13_valid": ("isbn13", isbn13_valid_or_false),
+        "isbn13_not_null": ("isbn13", pd.notna, notna_mask),
+        "isbn13_valid": ("isbn13", isbn13_valid_or_false, isbn13_mask),
+        "isbn_valid": ("isbn", isbn_valid_or_false, isbn_mask),
         "review_by_lang_valid": ("review_count_by_lang", _review_lang_valid),
-        "genres_valid": ("genres", _genres_valid)
+        "genres_valid": ("genres", _genres_valid, genres_mask)
     }
-    if "price" in df.columns:
-        df["q_gb_price_not_null"] = df["price"].apply(
-            lambda x: is_positive_number(x, allow_zero=True) or pd.isna(x)
-        )
-    else:
-        df["q_gb_price_not_null"] = False
+    df["q_gb_price_not_null"] = price_flag(df)
 
     df = apply_validation_rules(df, rules, prefix="q_gr_")
 
@@ -123,6 +303,8 @@ def validate_goodreads_df(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any
         df["q_gr_isbn13_not_null"].mean())
     metrics["goodreads_pct_isbn13_valid"] = float(
         df["q_gr_isbn13_valid"].mean())
+    metrics["goodreads_pct_isbn_valid"] = float(
+        df["q_gr_isbn_valid"].mean())
 
     metrics["goodreads_pct_language_not_null"] = float(
         df["q_gr_language_not_null"].mean())
@@ -140,7 +322,7 @@ def validate_goodreads_df(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any
 # ---------------------------------------------------------------------
 
 def validate_googlebooks_df(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    df = df.copy()
+    df = df.copy(deep=False)
 
     required_cols = [
         "isbn13",
@@ -152,24 +334,21 @@ def validate_googlebooks_df(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, A
     check_required_columns(df, required_cols, dataset_name="googlebooks")
 
     rules = {
-        "title_valid": ("title", is_non_empty_string),
-        "url_valid": ("url", is_valid_url),
-        "authors_not_null": ("authors", is_non_empty_string),
-        "language_valid": ("language", is_valid_language_bcp47),
-        "isbn13_not_null": ("isbn13", pd.notna),
-        "isbn13_valid": ("isbn13", isbn13_valid_or_false),
+        "title_valid": ("title", is_non_empty_string, non_empty_string_mask),
+        "url_valid": ("url", is_valid_url, url_mask),
+        "authors_not_null": ("authors", _authors_valid, authors_mask),
+        "language_valid": ("language", is_valid_language_bcp47, language_bcp47_mask),
+        "isbn13_not_null": ("isbn13", pd.notna, notna_mask),
+        "isbn13_valid": ("isbn13", isbn13_valid_or_false, isbn13_mask),
+        "isbn_valid": ("isbn", isbn_valid_or_false, isbn_mask),
         "num_pages_valid": (
-            "num_pages", lambda x: is_positive_number(x, allow_zero=False)
+            "num_pages", lambda x: is_positive_number(x, allow_zero=False),
+            lambda s: positive_number_mask(s, allow_zero=False)
         ),
     }
 
     df = apply_validation_rules(df, rules, prefix="q_gb_")
-    if "price" in df.columns:
-        df["q_gb_price_not_null"] = df["price"].apply(
-            lambda x: is_positive_number(x, allow_zero=True) or pd.isna(x)
-        )
-    else:
-        df["q_gb_price_not_null"] = False
+    df["q_gb_price_not_null"] = price_flag(df)
     metrics: Dict[str, Any] = {}
     metrics["googlebooks_rows"] = int(len(df))
     metrics["googlebooks_pct_title_not_null"] = float(
@@ -178,6 +357,8 @@ def validate_googlebooks_df(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, A
         df["q_gb_isbn13_not_null"].mean())
     metrics["googlebooks_pct_isbn13_valid"] = float(
         df["q_gb_isbn13_valid"].mean())
+    metrics["googlebooks_pct_isbn_valid"] = float(
+        df["q_gb_isbn_valid"].mean())
 
     metrics["googlebooks_nulls"] = null_ratio(
         df, ["title", "isbn13",
@@ -187,16 +368,60 @@ def validate_googlebooks_df(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, A
     return df, metrics
 
 
+class QualityAccumulator:
+    """
+    Junta las métricas de validate_*_df de varios lotes (modo streaming) en
+    las mismas métricas que daría el dataset entero: los enteros (filas,
+    filas válidas) se suman y los porcentajes / ratios de nulos se promedian
+    ponderando por las filas de cada lote.
+    """
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self._sums: Dict[str, Any] = {}
+
+    def add(self, metrics: Dict[str, Any], rows: int) -> None:
+        if rows == 0:
+            return
+        self.rows += rows
+        self._add(self._sums, metrics, rows)
+
+    def _add(self, acc: Dict[str, Any], metrics: Dict[str, Any], rows: int) -> None:
+        for key, value in metrics.items():
+            if isinstance(value, dict):
+                self._add(acc.setdefault(key, {}), value, rows)
+            elif isinstance(value, (bool, int, np.integer)):
+                acc[key] = acc.get(key, 0) + int(value)
+            else:
+                acc[key] = acc.get(key, 0.0) + float(value) * rows
+
+    def result(self) -> Dict[str, Any]:
+        return self._result(self._sums)
+
+    def _result(self, acc: Dict[str, Any]) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for key, value in acc.items():
+            if isinstance(value, dict):
+                out[key] = self._result(value)
+            elif isinstance(value, float):
+                out[key] = value / self.rows
+            else:
+                out[key] = value
+        return out
+
+
 def safe_apply(df, col, func):
     if col in df:
         df[col] = df[col].apply(lambda x: func(x) if pd.notna(x) else None)
 
 
 def normalize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    df["publication_date"] = df["publication_date"].astype("string")
-    safe_apply(df, "publication_date", normalize_gb_date)
-    safe_apply(df, "pub_info", normalize_pub_info_to_date)
+    # Fechas por columna: cada texto distinto se parsea una vez
+    df["publication_date"] = normalize_gb_date_column(df["publication_date"].astype("string"))
+    if "pub_info" in df:
+        df["pub_info"] = normalize_pub_info_column(df["pub_info"])
     safe_apply(df, "current", normalize_currency_code)
     safe_apply(df, "price", normalize_price)
-    safe_apply(df, "language", normalize_language)
+    if "language" in df:
+        df["language"] = normalize_language_column(df["language"])
     return df